@@ -6,11 +6,16 @@
 Authz is the endpoint to get authorization response
 """
 
+import flask
 from flask import request
 from flask_restful import Resource
 import logging
+import json
 import pickle
+import queue
+import threading
 import time
+from concurrent import futures
 from uuid import uuid4
 
 from moon_interface.authz_requests import AuthzRequest
@@ -76,6 +81,51 @@ def delete_authz_request(cache, req_id):
     cache.authz_requests.pop(req_id)
 
 
+def get_authz_decision(cache, interface_name, manager_url, timeout, pdp_id,
+                       subject_name, object_name, action_name):
+    """Run an authorization request and wait for its decision
+
+    :param cache: Cache to use
+    :param interface_name: hostname of the interface
+    :param manager_url: URL of the manager
+    :param timeout: time (in seconds) to wait for the decision
+    :param pdp_id: Keystone Project ID
+    :param subject_name: name of the subject
+    :param object_name: name of the object
+    :param action_name: name of the action
+    :return: a tuple with the response body and the HTTP status code
+    """
+    pdp_value = get_pdp_from_cache(cache, pdp_id)
+    if not pdp_id:
+        pdp_value = get_pdp_from_manager(cache, pdp_id)
+        if not pdp_id:
+            return {
+               "result": False,
+               "message": "Unknown PDP ID."}, 403
+    authz_request = create_authz_request(
+        cache=cache,
+        pdp_id=pdp_id,
+        interface_name=interface_name,
+        manager_url=manager_url,
+        subject_name=subject_name,
+        object_name=object_name,
+        action_name=action_name)
+    cpt = 0
+    while True:
+        if cpt > timeout*10:
+            delete_authz_request(cache, authz_request.request_id)
+            return {"result": False,
+                    "message": "Authz request had timed out."}, 500
+        if authz_request.is_authz():
+            if authz_request.final_result == "Grant":
+                delete_authz_request(cache, authz_request.request_id)
+                return {"result": True, "message": ""}, 200
+            delete_authz_request(cache, authz_request.request_id)
+            return {"result": False, "message": ""}, 401
+        cpt += 1
+        time.sleep(0.1)
+
+
 class Authz(Resource):
     """
     Endpoint for authz requests
@@ -119,35 +169,15 @@ class Authz(Resource):
         }
         :internal_api: authz
         """
-        pdp_value = get_pdp_from_cache(self.CACHE, pdp_id)
-        if not pdp_id:
-            pdp_value = get_pdp_from_manager(self.CACHE, pdp_id)
-            if not pdp_id:
-                return {
-                   "result": False,
-                   "message": "Unknown PDP ID."}, 403
-        authz_request = create_authz_request(
+        return get_authz_decision(
             cache=self.CACHE,
-            pdp_id=pdp_id,
             interface_name=self.INTERFACE_NAME,
             manager_url=self.MANAGER_URL,
+            timeout=self.TIMEOUT,
+            pdp_id=pdp_id,
             subject_name=subject_name,
             object_name=object_name,
             action_name=action_name)
-        cpt = 0
-        while True:
-            if cpt > self.TIMEOUT*10:
-                delete_authz_request(self.CACHE, authz_request.request_id)
-                return {"result": False,
-                        "message": "Authz request had timed out."}, 500
-            if authz_request.is_authz():
-                if authz_request.final_result == "Grant":
-                    delete_authz_request(self.CACHE, authz_request.request_id)
-                    return {"result": True, "message": ""}, 200
-                delete_authz_request(self.CACHE, authz_request.request_id)
-                return {"result": False, "message": ""}, 401
-            cpt += 1
-            time.sleep(0.1)
 
     def patch(self, uuid=None, subject_name=None, object_name=None, action_name=None):
         """Get a response on an authorization request
@@ -164,3 +194,107 @@ class Authz(Resource):
             self.CACHE.authz_requests[uuid].set_result(pickle.loads(request.data))
             return "", 201
         return {"result": False, "message": "The request ID is unknown"}, 500
+
+
+class AuthzStream(Resource):
+    """
+    Endpoint for streams of authz requests
+    """
+
+    __urls__ = (
+        "/authz/stream",
+        "/authz/stream/<string:pdp_id>",
+    )
+
+    __executor = futures.ThreadPoolExecutor(max_workers=32)
+    # Note: maximum number of decisions of a stream waiting or being made, the input is not read above
+    MAX_PENDING = 64
+
+    def __init__(self, **kwargs):
+        self.CACHE = kwargs.get("cache")
+        self.INTERFACE_NAME = kwargs.get("interface_name", "interface")
+        self.MANAGER_URL = kwargs.get("manager_url", "http://manager:8080")
+        self.TIMEOUT = 5
+
+    def __decide(self, pdp_id, line):
+        _id = None
+        try:
+            data = json.loads(line.decode("utf-8"))
+            _id = data.get("id")
+            result, code = get_authz_decision(
+                cache=self.CACHE,
+                interface_name=self.INTERFACE_NAME,
+                manager_url=self.MANAGER_URL,
+                timeout=self.TIMEOUT,
+                pdp_id=data.get("pdp_id", pdp_id),
+                subject_name=data.get("subject_name"),
+                object_name=data.get("object_name"),
+                action_name=data.get("action_name"))
+            answer = {"id": _id, "result": result["result"]}
+            if result.get("message"):
+                answer["message"] = result["message"]
+        except Exception as e:
+            logger.error("Error in stream request {}: {}".format(_id, e))
+            answer = {"id": _id, "result": False, "message": str(e)}
+        return json.dumps(answer, separators=(",", ":")) + "\n"
+
+    def post(self, pdp_id=None):
+        """Get responses on a stream of authorization requests
+
+        Each line of the request body is a JSON document, each line of the
+        response is the decision for one of them, sent as soon as it is
+        made (the id given in the request is sent back). At most
+        MAX_PENDING requests of a stream are waiting for their decision.
+
+        :param pdp_id: uuid of the PDP (may be overridden in each line)
+        :request body: newline delimited JSON documents like
+            {"id": "1", "subject_name": "user", "object_name": "vm1", "action_name": "boot"}
+        :return: newline delimited JSON documents like
+            {"id":"1","result":true}
+        :internal_api: authz
+        """
+        stream = request.stream
+
+        def generate():
+            answers = queue.Queue()
+            slots = threading.BoundedSemaphore(self.MAX_PENDING)
+            closed = threading.Event()
+            counts = {"submitted": 0}
+
+            def send(future):
+                answers.put(future.result())
+                slots.release()
+
+            def read():
+                # Note: the input is read in its own thread so that the decisions are sent as soon as they are made
+                try:
+                    for line in stream:
+                        if not line.strip():
+                            continue
+                        slots.acquire()
+                        if closed.is_set():
+                            slots.release()
+                            break
+                        counts["submitted"] += 1
+                        self.__executor.submit(self.__decide, pdp_id, line).add_done_callback(send)
+                except Exception as e:
+                    logger.error("Error while reading the stream: {}".format(e))
+                finally:
+                    answers.put(None)
+
+            threading.Thread(target=read, daemon=True).start()
+            reading = True
+            sent = 0
+            try:
+                while reading or sent < counts["submitted"]:
+                    answer = answers.get()
+                    if answer is None:
+                        reading = False
+                        continue
+                    sent += 1
+                    yield answer
+            finally:
+                closed.set()
+
+        return flask.Response(flask.stream_with_context(generate()),
+                              mimetype="application/x-ndjson")
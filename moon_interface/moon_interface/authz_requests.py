@@ -6,16 +6,16 @@
 import logging
 import itertools
 import pickle
-import requests
 from python_moonutilities import exceptions
 from python_moonutilities.context import Context
 from python_moonutilities.cache import Cache
+from moon_interface.balancer import AuthzBalancer
 
 logger = logging.getLogger("moon.interface.authz_requests")
 
 
 CACHE = Cache()
-CACHE.update()
+BALANCER = AuthzBalancer()
 
 
 class AuthzRequest:
@@ -38,45 +38,11 @@ class AuthzRequest:
 
     def run(self):
         self.context.delete_cache()
-        req = None
         try:
-            req = requests.post("http://{}:{}/authz".format(
-                self.container_chaining[0]["hostip"],
-                self.container_chaining[0]["port"],
-            ), data=pickle.dumps(self.context))
-            if req.status_code != 200:
-                raise exceptions.AuthzException(
-                    "Receive bad response from Authz function "
-                    "(with IP address - {})".format(
-                        req.status_code
-                    ))
-        except requests.exceptions.ConnectionError:
-            logger.error("Cannot connect to {}".format(
-                "http://{}:{}/authz".format(
-                    self.container_chaining[0]["hostip"],
-                    self.container_chaining[0]["port"]
-                )))
-        except ValueError:
-            try:
-                req = requests.post("http://{}:{}/authz".format(
-                    self.container_chaining[0]["hostname"],
-                    self.container_chaining[0]["port"],
-                ), data=pickle.dumps(self.context))
-                if req.status_code != 200:
-                    raise exceptions.AuthzException(
-                        "Receive bad response from Authz function "
-                        "(with hostname - {})".format(
-                            req.status_code
-                        ))
-            except requests.exceptions.ConnectionError:
-                logger.error("Cannot connect to {}".format(
-                    "http://{}:{}/authz".format(
-                        self.container_chaining[0]["hostname"],
-                        self.container_chaining[0]["port"]
-                    )))
-                raise exceptions.AuthzException(
-                    "Cannot connect to Authz function")
-        self.context.set_cache(CACHE)
+            replicas = self.container_chaining[0].get("replicas", [self.container_chaining[0], ])
+            req = BALANCER.post(replicas, pickle.dumps(self.context))
+        finally:
+            self.context.set_cache(CACHE)
         if req and len(self.container_chaining) == 1:
             self.result = pickle.loads(req.content)
 
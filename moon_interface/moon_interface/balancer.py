@@ -0,0 +1,163 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+
+import itertools
+import logging
+import threading
+import time
+from concurrent import futures
+import requests
+from python_moonutilities import exceptions
+
+logger = logging.getLogger("moon.interface.balancer")
+
+
+class AuthzBalancer:
+    """Spread authorization requests over the replicas of an Authz function
+
+    The replica with the least outstanding requests is chosen, in turn
+    among the replicas equally loaded, replicas which fail several times
+    in a row are put aside for a while and, if hedge_delay is set, a
+    second replica is asked when the first one is too slow to answer.
+    """
+
+    def __init__(self, max_failures=3, cooldown=10, hedge_delay=None, timeout=None):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.__lock = threading.Lock()
+        self.__outstanding = {}
+        self.__failures = {}
+        self.__down_until = {}
+        self.__turn = itertools.count()
+        self.__executor = futures.ThreadPoolExecutor(max_workers=16)
+
+    def configure(self, max_failures=None, cooldown=None, hedge_delay=None, timeout=None):
+        if max_failures is not None:
+            self.max_failures = max_failures
+        if cooldown is not None:
+            self.cooldown = cooldown
+        if hedge_delay is not None:
+            self.hedge_delay = hedge_delay
+        if timeout is not None:
+            self.timeout = timeout
+
+    @staticmethod
+    def get_key(replica):
+        return "{}:{}".format(replica["container_id"], replica["port"])
+
+    def outstanding(self, replica):
+        return self.__outstanding.get(self.get_key(replica), 0)
+
+    def is_healthy(self, replica):
+        return self.__down_until.get(self.get_key(replica), 0) <= time.time()
+
+    def choose(self, replicas, exclude=()):
+        """Return the replica with the least outstanding requests
+
+        The replicas equally loaded are chosen in turn.
+
+        :param replicas: list of replicas (see Cache.container_chaining)
+        :param exclude: keys of replicas that must not be chosen
+        :return: a replica or None
+        """
+        candidates = [_r for _r in replicas if self.get_key(_r) not in exclude]
+        if not candidates:
+            return None
+        healthy = [_r for _r in candidates if self.is_healthy(_r)]
+        if not healthy:
+            # Note: every replica is put aside, better try one than none
+            healthy = candidates
+        with self.__lock:
+            turn = next(self.__turn)
+            return min(enumerate(healthy), key=lambda _item: (
+                self.__outstanding.get(self.get_key(_item[1]), 0),
+                self.__failures.get(self.get_key(_item[1]), 0),
+                (_item[0] - turn) % len(healthy)))[1]
+
+    def mark_success(self, replica):
+        with self.__lock:
+            key = self.get_key(replica)
+            self.__failures[key] = 0
+            self.__down_until.pop(key, None)
+
+    def mark_failure(self, replica):
+        with self.__lock:
+            key = self.get_key(replica)
+            self.__failures[key] = self.__failures.get(key, 0) + 1
+            if self.__failures[key] >= self.max_failures:
+                logger.warning("Replica {} is put aside for {}s".format(key, self.cooldown))
+                self.__down_until[key] = time.time() + self.cooldown
+
+    def __post(self, url, data):
+        req = requests.post(url, data=data, timeout=self.timeout)
+        if req.status_code != 200:
+            raise exceptions.AuthzException(
+                "Receive bad response from Authz function "
+                "(with {} - {})".format(url, req.status_code))
+        return req
+
+    def send(self, replica, data):
+        """Send the request to one replica and track its health
+
+        :param replica: the replica to contact
+        :param data: the pickled context
+        :return: the response of the Authz function
+        """
+        key = self.get_key(replica)
+        with self.__lock:
+            self.__outstanding[key] = self.__outstanding.get(key, 0) + 1
+        try:
+            try:
+                req = self.__post("http://{}:{}/authz".format(
+                    replica["hostip"], replica["port"]), data)
+            except requests.exceptions.InvalidURL:
+                req = self.__post("http://{}:{}/authz".format(
+                    replica["hostname"], replica["port"]), data)
+        except (requests.exceptions.RequestException, exceptions.AuthzException) as e:
+            logger.error("Cannot connect to {} ({})".format(key, e))
+            self.mark_failure(replica)
+            raise exceptions.AuthzException("Cannot connect to Authz function")
+        else:
+            self.mark_success(replica)
+            return req
+        finally:
+            with self.__lock:
+                self.__outstanding[key] -= 1
+
+    def post(self, replicas, data):
+        """Send the request to the best replica, hedging if configured
+
+        :param replicas: list of replicas serving the same meta rule
+        :param data: the pickled context
+        :return: the response of the first replica which answered correctly
+        """
+        first = self.choose(replicas)
+        if not first:
+            raise exceptions.AuthzException("No Authz function available")
+        if not self.hedge_delay or len(replicas) < 2:
+            try:
+                return self.send(first, data)
+            except exceptions.AuthzException:
+                second = self.choose(replicas, exclude=(self.get_key(first), ))
+                if not second:
+                    raise
+                return self.send(second, data)
+        pending = {self.__executor.submit(self.send, first, data)}
+        done, _ = futures.wait(pending, timeout=self.hedge_delay)
+        if not done or next(iter(done)).exception():
+            second = self.choose(replicas, exclude=(self.get_key(first), ))
+            if second:
+                logger.debug("Hedging the request to {}".format(self.get_key(second)))
+                pending.add(self.__executor.submit(self.send, second, data))
+        error = None
+        while pending:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                if not future.exception():
+                    return future.result()
+                error = future.exception()
+        raise error
@@ -8,9 +8,10 @@ from flask_restful import Resource, Api
 import logging
 from moon_interface import __version__
 from moon_interface.api.generic import Status, API
-from moon_interface.api.authz import Authz
-from moon_interface.authz_requests import CACHE
+from moon_interface.api.authz import Authz, AuthzStream
+from moon_interface.authz_requests import CACHE, BALANCER
 from python_moonutilities import configuration, exceptions
+from python_moonutilities.resources import Ready
 
 logger = logging.getLogger("moon.interface.http_server")
 
@@ -97,6 +98,7 @@ class HTTPServer(Server):
         self.manager_hostname = conf["components/manager"].get("hostname",
                                                                "manager")
         self.manager_port = conf["components/manager"].get("port", 80)
+        BALANCER.configure(**kwargs.get("balancer", {}))
         self.api = Api(self.app)
         self.__set_route()
         self.__hook_errors()
@@ -121,15 +123,19 @@ class HTTPServer(Server):
 
         for api in __API__:
             self.api.add_resource(api, *api.__urls__)
-        self.api.add_resource(Authz, *Authz.__urls__,
-                              resource_class_kwargs={
-                                  "cache": CACHE,
-                                  "interface_name": self.host,
-                                  "manager_url": "http://{}:{}".format(
-                                      self.manager_hostname,
-                                      self.manager_port),
-                              }
-                              )
+        self.api.add_resource(Ready, *Ready.__urls__,
+                              resource_class_kwargs={"cache": CACHE})
+        for api in (Authz, AuthzStream):
+            self.api.add_resource(api, *api.__urls__,
+                                  resource_class_kwargs={
+                                      "cache": CACHE,
+                                      "interface_name": self.host,
+                                      "manager_url": "http://{}:{}".format(
+                                          self.manager_hostname,
+                                          self.manager_port),
+                                  }
+                                  )
 
     def run(self):
+        CACHE.warm_up()
         self.app.run(host=self._host, port=self._port)  # nosec
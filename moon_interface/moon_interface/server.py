@@ -18,17 +18,19 @@ def create_server():
         hostname = conf.get("hostname", "pipeline")
         port = conf.get("port", 80)
         bind = conf.get("bind", "127.0.0.1")
+        balancer = conf.get("balancer", {})
     except exceptions.ConsulComponentNotFound:
         hostname = "interface"
         bind = "127.0.0.1"
         port = 80
+        balancer = {}
         configuration.add_component(uuid="pipeline",
                                     name=hostname,
                                     port=port,
                                     bind=bind)
     logger.info("Starting server with IP {} on port {} bind to {}".format(
         hostname, port, bind))
-    return HTTPServer(host=bind, port=port)
+    return HTTPServer(host=bind, port=port, balancer=balancer)
 
 
 def run():
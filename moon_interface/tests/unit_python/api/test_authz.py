@@ -21,3 +21,45 @@ def test_authz_true(context):
     assert "result" in data
     assert data['result'] == True
 
+
+def test_authz_stream(context):
+    import moon_interface.server
+    server = moon_interface.server.create_server()
+    client = server.app.test_client()
+    lines = []
+    for _id in ("c1", "c2"):
+        lines.append(json.dumps({
+            "id": _id,
+            "subject_name": context["subject_name"],
+            "object_name": context["object_name"],
+            "action_name": context["action_name"],
+        }))
+    req = client.post("/authz/stream/{}".format(context["pdp_id"]),
+                      data="\n".join(lines) + "\n")
+    assert req.status_code == 200
+    answers = [json.loads(line) for line in req.data.decode("utf-8").splitlines()]
+    assert sorted(answer["id"] for answer in answers) == ["c1", "c2"]
+    for answer in answers:
+        assert answer["result"] == True
+
+
+def test_authz_stream_bounded(context, monkeypatch):
+    import moon_interface.server
+    from moon_interface.api.authz import AuthzStream
+    monkeypatch.setattr(AuthzStream, "MAX_PENDING", 1)
+    server = moon_interface.server.create_server()
+    client = server.app.test_client()
+    lines = []
+    for _id in range(5):
+        lines.append(json.dumps({
+            "id": _id,
+            "subject_name": context["subject_name"],
+            "object_name": context["object_name"],
+            "action_name": context["action_name"],
+        }))
+    req = client.post("/authz/stream/{}".format(context["pdp_id"]),
+                      data="\n".join(lines) + "\n")
+    assert req.status_code == 200
+    answers = [json.loads(line) for line in req.data.decode("utf-8").splitlines()]
+    # Note: with one pending request the decisions are sent in the order of the requests
+    assert [answer["id"] for answer in answers] == list(range(5))
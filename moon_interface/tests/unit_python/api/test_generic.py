@@ -0,0 +1,17 @@
+import json
+
+
+def get_json(data):
+    return json.loads(data.decode("utf-8"))
+
+
+def test_ready():
+    import moon_interface.server
+    from moon_interface.authz_requests import CACHE
+    server = moon_interface.server.create_server()
+    client = server.app.test_client()
+    CACHE.update()
+    req = client.get("/ready")
+    assert req.status_code == 200
+    data = get_json(req.data)
+    assert data["ready"] == True
@@ -207,7 +207,7 @@ def get_pickled_context():
     from python_moonutilities.cache import Cache
     CACHE = Cache()
     CACHE.update()
-    _context = Context(context(), CACHE)
+    _context = Context(CONTEXT, CACHE)
     _context.increment_index()
     _context.pdp_set['effect'] = 'grant'
     _context.pdp_set[os.environ['META_RULE_ID']]['effect'] = 'grant'
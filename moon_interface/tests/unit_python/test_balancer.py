@@ -0,0 +1,55 @@
+import pickle
+import pytest
+
+
+def get_replicas():
+    return [
+        {"container_id": "authz-economic", "hostname": "authz-economic",
+         "hostip": "127.0.0.1", "port": 8081},
+        {"container_id": "authz-paltry", "hostname": "authz-paltry",
+         "hostip": "127.0.0.1", "port": 8084},
+    ]
+
+
+def test_choose_least_outstanding():
+    from moon_interface.balancer import AuthzBalancer
+    balancer = AuthzBalancer()
+    replicas = get_replicas()
+    # Note: the replicas equally loaded are chosen in turn
+    chosen = [balancer.choose(replicas) for _ in range(4)]
+    assert chosen.count(replicas[0]) == 2
+    assert chosen.count(replicas[1]) == 2
+    assert chosen[0] != chosen[1]
+    assert balancer.choose(replicas, exclude=("authz-economic:8081", )) == replicas[1]
+
+
+def test_failing_replica_is_put_aside(set_consul_and_db):
+    from moon_interface.balancer import AuthzBalancer
+    from python_moonutilities import exceptions
+    set_consul_and_db.register_uri('POST', 'http://127.0.0.1:8084/authz', status_code=500)
+    balancer = AuthzBalancer(max_failures=2, cooldown=60)
+    replicas = get_replicas()
+    for _ in range(2):
+        with pytest.raises(exceptions.AuthzException):
+            balancer.send(replicas[1], b"")
+    assert not balancer.is_healthy(replicas[1])
+    assert balancer.is_healthy(replicas[0])
+    assert balancer.choose(replicas) == replicas[0]
+
+
+def test_post_falls_back_on_other_replica(set_consul_and_db):
+    from moon_interface.balancer import AuthzBalancer
+    set_consul_and_db.register_uri('POST', 'http://127.0.0.1:8084/authz', status_code=500)
+    balancer = AuthzBalancer()
+    replicas = list(reversed(get_replicas()))
+    req = balancer.post(replicas, b"")
+    assert req.status_code == 200
+    assert pickle.loads(req.content)
+
+
+def test_post_with_hedging(set_consul_and_db):
+    from moon_interface.balancer import AuthzBalancer
+    set_consul_and_db.register_uri('POST', 'http://127.0.0.1:8084/authz', status_code=500)
+    balancer = AuthzBalancer(hedge_delay=0.01)
+    req = balancer.post(list(reversed(get_replicas())), b"")
+    assert req.status_code == 200
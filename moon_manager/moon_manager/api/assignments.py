@@ -12,12 +12,25 @@ from flask_restful import Resource
 import logging
 from python_moonutilities.security_functions import check_auth
 from python_moondb.core import PolicyManager
+from moon_manager.api.filters import get_filters, paginate, project
 
 __version__ = "4.3.2"
 
 logger = logging.getLogger("moon.manager.api." + __name__)
 
 
+def get_assignments(perimeter_key):
+    """Get the assignments of a bulk request body with the keys of PolicyManager
+
+    :param perimeter_key: subject_id, object_id or action_id
+    :return: list of {perimeter_key, "category_id", "data_id"}
+    """
+    return [{perimeter_key: item.get("id"),
+             "category_id": item.get("category_id"),
+             "data_id": item.get("data_id")}
+            for item in request.json.get("assignments", [])]
+
+
 class SubjectAssignments(Resource):
     """
     Endpoint for subject assignment requests
@@ -49,17 +62,21 @@ class SubjectAssignments(Resource):
                 "assignments": "Assignments list (list of data_id)",
             }
         }
+        :query: id, fields, limit, marker (see moon_manager.api.filters)
         :internal_api: get_subject_assignments
         """
         try:
+            filters = get_filters()
             data = PolicyManager.get_subject_assignments(
                 user_id=user_id, policy_id=uuid,
-                subject_id=perimeter_id, category_id=category_id)
+                subject_id=perimeter_id, category_id=category_id, **filters)
+            response = {}
+            response["subject_assignments"] = project(paginate(response, filters, data))
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"subject_assignments": data}
+        return response
 
     @check_auth
     def post(self, uuid=None, perimeter_id=None, category_id=None,
@@ -128,6 +145,74 @@ class SubjectAssignments(Resource):
         return {"result": True}
 
 
+class SubjectAssignmentsBulk(Resource):
+    """
+    Endpoint for adding or deleting many subject assignments at once
+    """
+
+    __urls__ = (
+        "/policies/<string:uuid>/subject_assignments/bulk",
+        "/policies/<string:uuid>/subject_assignments/bulk/",
+    )
+
+    @check_auth
+    def post(self, uuid=None, user_id=None):
+        """Create several subject assignments in one transaction
+
+        :param uuid: uuid of the policy
+        :param user_id: user ID who do the request
+        :request body: {
+            "assignments": [
+                {
+                    "id": "UUID of the subject",
+                    "category_id": "UUID of the category",
+                    "data_id": "UUID of the scope"
+                },
+            ]
+        }
+        :return: {
+            "subject_assignments": [
+                {"id": "ID of the assignment", "added": "False if already assigned"},
+            ]
+        }
+        :internal_api: add_subject_assignments
+        """
+        try:
+            data = PolicyManager.add_subject_assignments(
+                user_id=user_id, policy_id=uuid,
+                assignments=get_assignments("subject_id"))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"subject_assignments": data}
+
+    @check_auth
+    def delete(self, uuid=None, user_id=None):
+        """Delete several subject assignments in one transaction
+
+        :param uuid: uuid of the policy
+        :param user_id: user ID who do the request
+        :request body: same as post
+        :return: {
+            "result": True,
+            "subject_assignments": [
+                {"deleted": "False if not assigned"},
+            ]
+        }
+        :internal_api: delete_subject_assignments
+        """
+        try:
+            data = PolicyManager.delete_subject_assignments(
+                user_id=user_id, policy_id=uuid,
+                assignments=get_assignments("subject_id"))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"result": True, "subject_assignments": data}
+
+
 class ObjectAssignments(Resource):
     """
     Endpoint for object assignment requests
@@ -159,17 +244,21 @@ class ObjectAssignments(Resource):
                 "assignments": "Assignments list (list of data_id)",
             }
         }
+        :query: id, fields, limit, marker (see moon_manager.api.filters)
         :internal_api: get_object_assignments
         """
         try:
+            filters = get_filters()
             data = PolicyManager.get_object_assignments(
                 user_id=user_id, policy_id=uuid,
-                object_id=perimeter_id, category_id=category_id)
+                object_id=perimeter_id, category_id=category_id, **filters)
+            response = {}
+            response["object_assignments"] = project(paginate(response, filters, data))
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"object_assignments": data}
+        return response
 
     @check_auth
     def post(self, uuid=None, perimeter_id=None, category_id=None,
@@ -238,6 +327,74 @@ class ObjectAssignments(Resource):
         return {"result": True}
 
 
+class ObjectAssignmentsBulk(Resource):
+    """
+    Endpoint for adding or deleting many object assignments at once
+    """
+
+    __urls__ = (
+        "/policies/<string:uuid>/object_assignments/bulk",
+        "/policies/<string:uuid>/object_assignments/bulk/",
+    )
+
+    @check_auth
+    def post(self, uuid=None, user_id=None):
+        """Create several object assignments in one transaction
+
+        :param uuid: uuid of the policy
+        :param user_id: user ID who do the request
+        :request body: {
+            "assignments": [
+                {
+                    "id": "UUID of the object",
+                    "category_id": "UUID of the category",
+                    "data_id": "UUID of the scope"
+                },
+            ]
+        }
+        :return: {
+            "object_assignments": [
+                {"id": "ID of the assignment", "added": "False if already assigned"},
+            ]
+        }
+        :internal_api: add_object_assignments
+        """
+        try:
+            data = PolicyManager.add_object_assignments(
+                user_id=user_id, policy_id=uuid,
+                assignments=get_assignments("object_id"))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"object_assignments": data}
+
+    @check_auth
+    def delete(self, uuid=None, user_id=None):
+        """Delete several object assignments in one transaction
+
+        :param uuid: uuid of the policy
+        :param user_id: user ID who do the request
+        :request body: same as post
+        :return: {
+            "result": True,
+            "object_assignments": [
+                {"deleted": "False if not assigned"},
+            ]
+        }
+        :internal_api: delete_object_assignments
+        """
+        try:
+            data = PolicyManager.delete_object_assignments(
+                user_id=user_id, policy_id=uuid,
+                assignments=get_assignments("object_id"))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"result": True, "object_assignments": data}
+
+
 class ActionAssignments(Resource):
     """
     Endpoint for action assignment requests
@@ -269,17 +426,21 @@ class ActionAssignments(Resource):
                 "assignments": "Assignments list (list of data_id)",
             }
         }
+        :query: id, fields, limit, marker (see moon_manager.api.filters)
         :internal_api: get_action_assignments
         """
         try:
+            filters = get_filters()
             data = PolicyManager.get_action_assignments(
                 user_id=user_id, policy_id=uuid,
-                action_id=perimeter_id, category_id=category_id)
+                action_id=perimeter_id, category_id=category_id, **filters)
+            response = {}
+            response["action_assignments"] = project(paginate(response, filters, data))
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"action_assignments": data}
+        return response
 
     @check_auth
     def post(self, uuid=None, perimeter_id=None, category_id=None,
@@ -346,3 +507,71 @@ class ActionAssignments(Resource):
             return {"result": False,
                     "error": str(e)}, 500
         return {"result": True}
+
+
+class ActionAssignmentsBulk(Resource):
+    """
+    Endpoint for adding or deleting many action assignments at once
+    """
+
+    __urls__ = (
+        "/policies/<string:uuid>/action_assignments/bulk",
+        "/policies/<string:uuid>/action_assignments/bulk/",
+    )
+
+    @check_auth
+    def post(self, uuid=None, user_id=None):
+        """Create several action assignments in one transaction
+
+        :param uuid: uuid of the policy
+        :param user_id: user ID who do the request
+        :request body: {
+            "assignments": [
+                {
+                    "id": "UUID of the action",
+                    "category_id": "UUID of the category",
+                    "data_id": "UUID of the scope"
+                },
+            ]
+        }
+        :return: {
+            "action_assignments": [
+                {"id": "ID of the assignment", "added": "False if already assigned"},
+            ]
+        }
+        :internal_api: add_action_assignments
+        """
+        try:
+            data = PolicyManager.add_action_assignments(
+                user_id=user_id, policy_id=uuid,
+                assignments=get_assignments("action_id"))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"action_assignments": data}
+
+    @check_auth
+    def delete(self, uuid=None, user_id=None):
+        """Delete several action assignments in one transaction
+
+        :param uuid: uuid of the policy
+        :param user_id: user ID who do the request
+        :request body: same as post
+        :return: {
+            "result": True,
+            "action_assignments": [
+                {"deleted": "False if not assigned"},
+            ]
+        }
+        :internal_api: delete_action_assignments
+        """
+        try:
+            data = PolicyManager.delete_action_assignments(
+                user_id=user_id, policy_id=uuid,
+                assignments=get_assignments("action_id"))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"result": True, "action_assignments": data}
@@ -0,0 +1,86 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+"""
+Query parameters shared by the list endpoints
+
+* name=<name>: only return the element with that name
+* id=<id1>,<id2>: only return the elements with those IDs
+* fields=<field1>,<field2>: only return those fields of each element
+* limit=<n>&marker=<id>: return at most n elements with an ID greater
+  than marker, the response gives the marker of the next page in "next"
+"""
+
+from flask import request
+
+
+def __get_list(key):
+    values = []
+    for value in request.args.getlist(key):
+        values.extend(filter(None, value.split(",")))
+    return values
+
+
+def get_filters(name=False):
+    """Get the keyword arguments of the PolicyManager.get_* functions
+
+    One more element than asked is requested so that paginate() can tell
+    if there is a next page.
+
+    :param name: True if the endpoint accepts the name filter
+    :return: a dictionary of filters
+    """
+    filters = {}
+    if name and "name" in request.args:
+        filters["name"] = request.args["name"]
+    ids = __get_list("id")
+    if ids:
+        filters["ids"] = ids
+    if request.args.get("limit"):
+        limit = int(request.args["limit"])
+        if limit < 1:
+            raise ValueError("limit must be a positive integer")
+        filters["limit"] = limit + 1
+    if request.args.get("marker"):
+        filters["marker"] = request.args["marker"]
+    return filters
+
+
+def paginate(response, filters, items, key="id"):
+    """Remove the extra element read by get_filters and set the next marker
+
+    :param response: the response dictionary
+    :param filters: the filters given by get_filters
+    :param items: a dictionary ID => element or a list of elements
+    :param key: attribute holding the ID of the elements of a list
+    :return: the items of the page
+    """
+    if "limit" not in filters:
+        return items
+    limit = filters["limit"] - 1
+    response["next"] = None
+    if len(items) > limit:
+        if isinstance(items, dict):
+            items = dict(list(items.items())[:limit])
+            response["next"] = list(items.keys())[-1]
+        else:
+            items = items[:limit]
+            response["next"] = items[-1][key]
+    return items
+
+
+def project(items):
+    """Only keep the fields given in the fields query parameter
+
+    :param items: a dictionary ID => element or a list of elements
+    :return: the projected items
+    """
+    fields = __get_list("fields")
+    if not fields:
+        return items
+    if isinstance(items, dict):
+        return {_id: {_key: _value for _key, _value in _item.items() if _key in fields}
+                for _id, _item in items.items()}
+    return [{_key: _value for _key, _value in _item.items() if _key in fields}
+            for _item in items]
@@ -0,0 +1,199 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+"""
+Jobs run the calls to the orchestrator in the background
+
+The PDP endpoints return as soon as the database is written, the pods
+are created or deleted by a job whose status is stored in the database
+so that every worker of the manager can report it.
+
+The jobs of a PDP run one after the other in the order they were
+submitted: those of the process are queued and a job also waits for the
+unfinished jobs of that PDP submitted before it by the other workers.
+
+"""
+
+from flask_restful import Resource
+import collections
+import logging
+import threading
+import time
+from concurrent import futures
+from python_moonutilities.security_functions import check_auth
+from python_moonutilities import configuration
+from python_moondb.core import PDPManager
+
+__version__ = "4.3.2"
+
+logger = logging.getLogger("moon.manager.api." + __name__)
+
+__executor = None
+__lock = threading.Lock()
+# Note: the jobs waiting for the running job of their PDP in this process, by PDP ID
+__queues = {}
+__last_purge = 0
+
+UNFINISHED = ("pending", "running")
+
+
+def get_executor():
+    """Get the thread pool of the jobs
+
+    The pool is created on first use so that each worker process started
+    by gunicorn gets its own threads.
+    """
+    global __executor
+    with __lock:
+        if not __executor:
+            __executor = futures.ThreadPoolExecutor(max_workers=get_job_option("job_workers", 4))
+        return __executor
+
+
+def get_job_option(key, default):
+    conf = configuration.get_configuration("components/manager")
+    return conf["components/manager"].get(key, default)
+
+
+def __wait_for_previous_jobs(job_id, pdp_id, created):
+    """Wait until the jobs of the PDP submitted before by the other workers are finished"""
+    timeout = time.time() + get_job_option("job_wait", 300)
+    while time.time() < timeout:
+        previous = [_job_id for _job_id, job in PDPManager.get_jobs(user_id="admin").items()
+                    if job["pdp_id"] == pdp_id and job["status"] in UNFINISHED and
+                    (job["created"], _job_id) < (created, job_id)]
+        if not previous:
+            return
+        logger.info("Job {} waits for the jobs {} of the PDP {}".format(job_id, previous, pdp_id))
+        time.sleep(1)
+    logger.warning("Job {} does not wait any more for the previous jobs of the PDP {}".format(job_id, pdp_id))
+
+
+def __run(job_id, pdp_id, created, func, args, kwargs):
+    try:
+        __wait_for_previous_jobs(job_id, pdp_id, created)
+        PDPManager.update_job(user_id="admin", job_id=job_id,
+                              value={"status": "running", "updated": time.time()})
+        func(*args, **kwargs)
+    except Exception as e:
+        logger.error("Job {} failed".format(job_id), exc_info=True)
+        PDPManager.update_job(user_id="admin", job_id=job_id,
+                              value={"status": "error", "error": str(e), "updated": time.time()})
+    else:
+        PDPManager.update_job(user_id="admin", job_id=job_id,
+                              value={"status": "done", "updated": time.time()})
+
+
+def __run_queue(pdp_id, job):
+    """Run a job then the jobs of the same PDP queued in the meantime"""
+    while job:
+        try:
+            __run(*job)
+        except Exception:
+            logger.error("Cannot record the status of the job {}".format(job[0]), exc_info=True)
+        with __lock:
+            job = __queues[pdp_id].popleft() if __queues[pdp_id] else None
+            if not job:
+                del __queues[pdp_id]
+
+
+def submit(name, pdp_id, func, *args, **kwargs):
+    """Record a job and run it in the background after the previous jobs of its PDP
+
+    :param name: name of the job (add_pod, delete_pod)
+    :param pdp_id: ID of the PDP the job works for
+    :param func: function called with args and kwargs by the job
+    :return: the ID of the job
+    """
+    purge_jobs()
+    current_time = time.time()
+    job = PDPManager.add_job(user_id="admin", value={
+        "name": name,
+        "pdp_id": pdp_id,
+        "status": "pending",
+        "error": "",
+        "created": current_time,
+        "updated": current_time,
+    })
+    job_id = list(job.keys())[0]
+    job = (job_id, pdp_id, current_time, func, args, kwargs)
+    with __lock:
+        if pdp_id in __queues:
+            __queues[pdp_id].append(job)
+            return job_id
+        __queues[pdp_id] = collections.deque()
+    get_executor().submit(__run_queue, pdp_id, job)
+    return job_id
+
+
+def purge_jobs(force=False):
+    """Delete the finished jobs older than the job_retention key of the manager (default one day)
+
+    The jobs are read at most once per job_purge_interval seconds (default one hour) unless force is True.
+    """
+    global __last_purge
+    current_time = time.time()
+    with __lock:
+        if not force and __last_purge + get_job_option("job_purge_interval", 3600) > current_time:
+            return
+        __last_purge = current_time
+    retention = get_job_option("job_retention", 86400)
+    job_ids = [job_id for job_id, job in PDPManager.get_jobs(user_id="admin").items()
+               if job["status"] not in UNFINISHED and (job["updated"] or 0) + retention < current_time]
+    if job_ids:
+        logger.info("Deleting {} finished jobs".format(len(job_ids)))
+        PDPManager.delete_jobs(user_id="admin", job_ids=job_ids)
+
+
+def recover_jobs():
+    """Mark the jobs left unfinished by a previous run of the manager as failed and purge the old ones
+
+    Called once when the manager starts, before the workers run any job.
+    """
+    current_time = time.time()
+    for job_id, job in PDPManager.get_jobs(user_id="admin").items():
+        if job["status"] in UNFINISHED:
+            logger.warning("Job {} has been interrupted by a restart of the manager".format(job_id))
+            PDPManager.update_job(user_id="admin", job_id=job_id, value={
+                "status": "error", "error": "Interrupted by a restart of the manager", "updated": current_time})
+    purge_jobs(force=True)
+
+
+class Jobs(Resource):
+    """
+    Endpoint for job requests
+    """
+
+    __urls__ = (
+        "/jobs",
+        "/jobs/",
+        "/jobs/<string:uuid>",
+        "/jobs/<string:uuid>/",
+    )
+
+    @check_auth
+    def get(self, uuid=None, user_id=None):
+        """Retrieve all jobs or a specific one
+
+        :param uuid: uuid of the job
+        :param user_id: user ID who do the request
+        :return: {
+            "job_id1": {
+                "name": "add_pod or delete_pod",
+                "pdp_id": "ID of the PDP",
+                "status": "pending, running, done or error",
+                "error": "message of the error",
+                "created": "creation time",
+                "updated": "time of the last change of status",
+            }
+        }
+        :internal_api: get_jobs
+        """
+        try:
+            data = PDPManager.get_jobs(user_id=user_id, job_id=uuid)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"jobs": data}
@@ -12,6 +12,7 @@ from flask_restful import Resource
 import logging
 from python_moonutilities.security_functions import check_auth
 from python_moondb.core import ModelManager
+from moon_manager.api.versions import get_headers, not_modified
 
 __version__ = "4.3.2"
 
@@ -51,13 +52,17 @@ class MetaRules(Resource):
         :internal_api: get_meta_rules
         """
         try:
+            version = ModelManager.get_meta_rules_version(user_id=user_id)
+            response = not_modified(version)
+            if response is not None:
+                return response
             data = ModelManager.get_meta_rules(
                 user_id=user_id, meta_rule_id=meta_rule_id)
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"meta_rules": data}
+        return {"meta_rules": data}, 200, get_headers(version)
 
     @check_auth
     def post(self, meta_rule_id=None, user_id=None):
@@ -0,0 +1,48 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+"""
+Database metrics of the manager methods
+
+The statements are counted by the worker which ran them, so each worker
+of the manager gives its own metrics.
+
+"""
+
+from flask_restful import Resource
+import logging
+from python_moonutilities.security_functions import check_auth
+from python_moondb.api.metrics import metrics
+
+__version__ = "4.3.2"
+
+logger = logging.getLogger("moon.manager.api." + __name__)
+
+
+class Metrics(Resource):
+    """
+    Endpoint for database metrics requests
+    """
+
+    __urls__ = (
+        "/metrics",
+        "/metrics/",
+    )
+
+    @check_auth
+    def get(self, user_id=None):
+        """Retrieve the database metrics of the manager methods called by this worker
+
+        :param user_id: user ID who do the request
+        :return: {
+            "PolicyManager.get_subjects": {
+                "calls": "number of calls",
+                "statements": "number of statements of all the calls",
+                "duration": "time spent in the statements (in seconds)",
+                "max_statements": "largest number of statements of one call",
+            }
+        }
+        :internal_api: get_metrics
+        """
+        return {"metrics": metrics.get()}
@@ -11,6 +11,7 @@ from flask_restful import Resource
 import logging
 from python_moonutilities.security_functions import check_auth
 from python_moondb.core import ModelManager
+from moon_manager.api.versions import get_headers, not_modified
 
 __version__ = "4.3.2"
 
@@ -45,12 +46,16 @@ class Models(Resource):
         :internal_api: get_models
         """
         try:
+            version = ModelManager.get_models_version(user_id=user_id)
+            response = not_modified(version)
+            if response is not None:
+                return response
             data = ModelManager.get_models(user_id=user_id, model_id=uuid)
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"models": data}
+        return {"models": data}, 200, get_headers(version)
 
     @check_auth
     def post(self, uuid=None, user_id=None):
@@ -83,7 +88,7 @@ class Models(Resource):
 
     @check_auth
     def delete(self, uuid=None, user_id=None):
-        """Delete a model
+        """Delete a model with its policies and the meta rules no other model uses
 
         :param uuid: uuid of the model to delete
         :param user_id: user ID who do the request
@@ -16,6 +16,8 @@ from python_moonutilities.security_functions import check_auth
 from python_moondb.core import PDPManager
 from python_moondb.core import PolicyManager
 from python_moondb.core import ModelManager
+from moon_manager.api import jobs
+from moon_manager.api.versions import get_headers, not_modified
 from python_moonutilities import configuration, exceptions
 
 __version__ = "4.3.2"
@@ -49,7 +51,7 @@ def delete_pod(uuid):
                     break
 
 
-def add_pod(uuid, data):
+def add_pod(uuid, data, retries=60):
     if not data.get("keystone_project_id"):
         return
     logger.info("Add a new pod {}".format(data))
@@ -61,13 +63,15 @@ def add_pod(uuid, data):
     hostname = conf["components/orchestrator"].get("hostname", "orchestrator")
     port = conf["components/orchestrator"].get("port", 80)
     proto = conf["components/orchestrator"].get("protocol", "http")
-    while True:
+    for attempt in range(retries):
         try:
             req = requests.post(
                 "{}://{}:{}/pods".format(proto, hostname, port),
                 json=data,
                 headers={"content-type": "application/json"})
         except requests.exceptions.ConnectionError as e:
+            if attempt + 1 == retries:
+                raise
             logger.warning("add_pod: Orchestrator is not ready, standby...")
             logger.exception(e)
             time.sleep(1)
@@ -76,6 +80,16 @@ def add_pod(uuid, data):
     logger.info(req.text)
 
 
+def submit_add_pod(uuid, data):
+    """Create the pods of a PDP in a background job
+
+    :return: the ID of the job or None if the PDP is not mapped to a Keystone project
+    """
+    if not data.get("keystone_project_id"):
+        return None
+    return jobs.submit("add_pod", uuid, add_pod, uuid=uuid, data=dict(data))
+
+
 def check_keystone_pid(k_pid):
     data = PDPManager.get_pdp(user_id="admin")
     for pdp_key, pdp_value in data.items():
@@ -113,12 +127,16 @@ class PDP(Resource):
         :internal_api: get_pdp
         """
         try:
+            version = PDPManager.get_pdp_version(user_id=user_id)
+            response = not_modified(version)
+            if response is not None:
+                return response
             data = PDPManager.get_pdp(user_id=user_id, pdp_id=uuid)
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"pdps": data}
+        return {"pdps": data}, 200, get_headers(version)
 
     @check_auth
     def post(self, uuid=None, user_id=None):
@@ -133,12 +151,15 @@ class PDP(Resource):
             "description": "...",
         }
         :return: {
-            "pdp_id1": {
-                "name": "...",
-                "security_pipeline": [...],
-                "keystone_project_id": "keystone_project_id1",
-                "description": "...",
-            }
+            "pdps": {
+                "pdp_id1": {
+                    "name": "...",
+                    "security_pipeline": [...],
+                    "keystone_project_id": "keystone_project_id1",
+                    "description": "...",
+                }
+            },
+            "job_id": "ID of the job creating the pods (see /jobs) or None"
         }
         :internal_api: add_pdp
         """
@@ -154,12 +175,12 @@ class PDP(Resource):
             uuid = list(data.keys())[0]
             logger.debug("data={}".format(data))
             logger.debug("uuid={}".format(uuid))
-            add_pod(uuid=uuid, data=data[uuid])
+            job_id = submit_add_pod(uuid=uuid, data=data[uuid])
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"pdps": data}
+        return {"pdps": data, "job_id": job_id}
 
     @check_auth
     def delete(self, uuid=None, user_id=None):
@@ -169,18 +190,19 @@ class PDP(Resource):
         :param user_id: user ID who do the request
         :return: {
             "result": "True or False",
-            "message": "optional message"
+            "message": "optional message",
+            "job_id": "ID of the job deleting the pods (see /jobs)"
         }
         :internal_api: delete_pdp
         """
         try:
             data = PDPManager.delete_pdp(user_id=user_id, pdp_id=uuid)
-            delete_pod(uuid)
+            job_id = jobs.submit("delete_pod", uuid, delete_pod, uuid)
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"result": True}
+        return {"result": True, "job_id": job_id}
 
     @check_auth
     def patch(self, uuid=None, user_id=None):
@@ -189,12 +211,15 @@ class PDP(Resource):
         :param uuid: uuid of the pdp to update
         :param user_id: user ID who do the request
         :return: {
-            "pdp_id1": {
-                "name": "...",
-                "security_pipeline": [...],
-                "keystone_project_id": "keystone_project_id1",
-                "description": "...",
-            }
+            "pdps": {
+                "pdp_id1": {
+                    "name": "...",
+                    "security_pipeline": [...],
+                    "keystone_project_id": "keystone_project_id1",
+                    "description": "...",
+                }
+            },
+            "job_id": "ID of the job creating the pods (see /jobs) or None"
         }
         :internal_api: update_pdp
         """
@@ -209,10 +234,10 @@ class PDP(Resource):
                 user_id=user_id, pdp_id=uuid, value=_data)
             logger.debug("data={}".format(data))
             logger.debug("uuid={}".format(uuid))
-            add_pod(uuid=uuid, data=data[uuid])
+            job_id = submit_add_pod(uuid=uuid, data=data[uuid])
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"pdps": data}
+        return {"pdps": data, "job_id": job_id}
 
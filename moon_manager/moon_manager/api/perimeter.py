@@ -15,6 +15,7 @@ from flask_restful import Resource
 import logging
 from python_moonutilities.security_functions import check_auth
 from python_moondb.core import PolicyManager
+from moon_manager.api.filters import get_filters, paginate, project
 
 __version__ = "4.3.2"
 
@@ -50,19 +51,24 @@ class Subjects(Resource):
                     "description": "a description"
             }
         }
+        :query: name, id, fields, limit, marker (see moon_manager.api.filters)
         :internal_api: get_subjects
         """
         try:
+            filters = get_filters(name=True)
             data = PolicyManager.get_subjects(
                 user_id=user_id,
                 policy_id=uuid,
-                perimeter_id=perimeter_id
+                perimeter_id=perimeter_id,
+                **filters
             )
+            response = {}
+            response["subjects"] = project(paginate(response, filters, data))
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"subjects": data}
+        return response
 
     @check_auth
     def post(self, uuid=None, perimeter_id=None, user_id=None):
@@ -90,13 +96,12 @@ class Subjects(Resource):
         """
         try:
             if not perimeter_id:
-                data = PolicyManager.get_subjects(user_id=user_id,
-                                                  policy_id=None)
                 if 'name' in request.json:
-                    for data_id, data_value in data.items():
-                        if data_value['name'] == request.json['name']:
-                            perimeter_id = data_id
-                            break
+                    data = PolicyManager.get_subjects(user_id=user_id, policy_id=None,
+                                                      name=request.json['name'])
+                    for data_id in data:
+                        perimeter_id = data_id
+                        break
             data = PolicyManager.add_subject(
                 user_id=user_id, policy_id=uuid,
                 perimeter_id=perimeter_id, value=request.json)
@@ -132,13 +137,12 @@ class Subjects(Resource):
         """
         try:
             if not perimeter_id:
-                data = PolicyManager.get_subjects(user_id=user_id,
-                                                  policy_id=None)
                 if 'name' in request.json:
-                    for data_id, data_value in data.items():
-                        if data_value['name'] == request.json['name']:
-                            perimeter_id = data_id
-                            break
+                    data = PolicyManager.get_subjects(user_id=user_id, policy_id=None,
+                                                      name=request.json['name'])
+                    for data_id in data:
+                        perimeter_id = data_id
+                        break
             data = PolicyManager.add_subject(
                 user_id=user_id, policy_id=uuid,
                 perimeter_id=perimeter_id, value=request.json)
@@ -204,19 +208,24 @@ class Objects(Resource):
                     "description": "description of the object"
             }
         }
+        :query: name, id, fields, limit, marker (see moon_manager.api.filters)
         :internal_api: get_objects
         """
         try:
+            filters = get_filters(name=True)
             data = PolicyManager.get_objects(
                 user_id=user_id,
                 policy_id=uuid,
-                perimeter_id=perimeter_id
+                perimeter_id=perimeter_id,
+                **filters
             )
+            response = {}
+            response["objects"] = project(paginate(response, filters, data))
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"objects": data}
+        return response
 
     @check_auth
     def post(self, uuid=None, perimeter_id=None, user_id=None):
@@ -238,12 +247,12 @@ class Objects(Resource):
         :internal_api: set_object
         """
         try:
-            data = PolicyManager.get_objects(user_id=user_id, policy_id=None)
             if 'name' in request.json:
-                for data_id, data_value in data.items():
-                    if data_value['name'] == request.json['name']:
-                        perimeter_id = data_id
-                        break
+                data = PolicyManager.get_objects(user_id=user_id, policy_id=None,
+                                                 name=request.json['name'])
+                for data_id in data:
+                    perimeter_id = data_id
+                    break
             data = PolicyManager.add_object(
                 user_id=user_id, policy_id=uuid,
                 perimeter_id=perimeter_id, value=request.json)
@@ -273,12 +282,12 @@ class Objects(Resource):
         :internal_api: set_object
         """
         try:
-            data = PolicyManager.get_objects(user_id=user_id, policy_id=None)
             if 'name' in request.json:
-                for data_id, data_value in data.items():
-                    if data_value['name'] == request.json['name']:
-                        perimeter_id = data_id
-                        break
+                data = PolicyManager.get_objects(user_id=user_id, policy_id=None,
+                                                 name=request.json['name'])
+                for data_id in data:
+                    perimeter_id = data_id
+                    break
             data = PolicyManager.add_object(
                 user_id=user_id, policy_id=uuid,
                 perimeter_id=perimeter_id, value=request.json)
@@ -341,16 +350,24 @@ class Actions(Resource):
                     "description": "description of the action"
             }
         }
+        :query: name, id, fields, limit, marker (see moon_manager.api.filters)
         :internal_api: get_actions
         """
         try:
+            filters = get_filters(name=True)
             data = PolicyManager.get_actions(
-                user_id=user_id, policy_id=uuid, perimeter_id=perimeter_id)
+                user_id=user_id,
+                policy_id=uuid,
+                perimeter_id=perimeter_id,
+                **filters
+            )
+            response = {}
+            response["actions"] = project(paginate(response, filters, data))
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"actions": data}
+        return response
 
     @check_auth
     def post(self, uuid=None, perimeter_id=None, user_id=None):
@@ -372,12 +389,12 @@ class Actions(Resource):
         :internal_api: set_action
         """
         try:
-            data = PolicyManager.get_actions(user_id=user_id, policy_id=None)
             if 'name' in request.json:
-                for data_id, data_value in data.items():
-                    if data_value['name'] == request.json['name']:
-                        perimeter_id = data_id
-                        break
+                data = PolicyManager.get_actions(user_id=user_id, policy_id=None,
+                                                 name=request.json['name'])
+                for data_id in data:
+                    perimeter_id = data_id
+                    break
             data = PolicyManager.add_action(
                 user_id=user_id, policy_id=uuid,
                 perimeter_id=perimeter_id, value=request.json)
@@ -407,12 +424,12 @@ class Actions(Resource):
         :internal_api: set_action
         """
         try:
-            data = PolicyManager.get_actions(user_id=user_id, policy_id=None)
             if 'name' in request.json:
-                for data_id, data_value in data.items():
-                    if data_value['name'] == request.json['name']:
-                        perimeter_id = data_id
-                        break
+                data = PolicyManager.get_actions(user_id=user_id, policy_id=None,
+                                                 name=request.json['name'])
+                for data_id in data:
+                    perimeter_id = data_id
+                    break
             data = PolicyManager.add_action(
                 user_id=user_id, policy_id=uuid,
                 perimeter_id=perimeter_id, value=request.json)
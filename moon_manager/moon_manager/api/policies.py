@@ -12,6 +12,9 @@ from flask_restful import Resource
 import logging
 from python_moonutilities.security_functions import check_auth
 from python_moondb.core import PolicyManager
+from python_moonutilities import exceptions
+from moon_manager.api.pdp import submit_add_pod, check_keystone_pid
+from moon_manager.api.versions import get_headers, not_modified
 
 __version__ = "4.3.2"
 
@@ -47,12 +50,16 @@ class Policies(Resource):
         :internal_api: get_policies
         """
         try:
+            version = PolicyManager.get_policies_version(user_id=user_id)
+            response = not_modified(version)
+            if response is not None:
+                return response
             data = PolicyManager.get_policies(user_id=user_id, policy_id=uuid)
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"policies": data}
+        return {"policies": data}, 200, get_headers(version)
 
     @check_auth
     def post(self, uuid=None, user_id=None):
@@ -87,7 +94,7 @@ class Policies(Resource):
 
     @check_auth
     def delete(self, uuid=None, user_id=None):
-        """Delete a policy
+        """Delete a policy with its data, perimeter, assignments and rules
 
         :param uuid: uuid of the policy to delete
         :param user_id: user ID who do the request
@@ -130,3 +137,124 @@ class Policies(Resource):
                     "error": str(e)}, 500
         return {"policies": data}
 
+
+class PolicyImport(Resource):
+    """
+    Endpoint for policy import requests
+    """
+
+    __urls__ = (
+        "/policies/<string:uuid>/import",
+        "/policies/<string:uuid>/import/",
+    )
+
+    @check_auth
+    def post(self, uuid=None, user_id=None):
+        """Add data, perimeter, assignments and rules to a policy in one transaction
+
+        Data, perimeter elements and meta rule items are given by name
+        (rules may also use data IDs), elements which already exist are
+        reused.
+
+        :param uuid: uuid of the policy
+        :param user_id: user ID who do the request
+        :request body: {
+            "subject_data": {"subject_category_id1": ["admin", "dev"]},
+            "object_data": {"object_category_id1": ["vm1", "vm2"]},
+            "action_data": {"action_category_id1": ["vm-read"]},
+            "subjects": ["user1", "user2"],
+            "objects": ["vm1", "vm2"],
+            "actions": ["start", "stop"],
+            "subject_assignments": [
+                {"subject": "user1", "category_id": "subject_category_id1", "data": "admin"}
+            ],
+            "object_assignments": [
+                {"object": "vm1", "category_id": "object_category_id1", "data": "vm1"}
+            ],
+            "action_assignments": [
+                {"action": "start", "category_id": "action_category_id1", "data": "vm-read"}
+            ],
+            "rules": [
+                {
+                    "meta_rule_id": "meta_rule_id1",
+                    "rule": ["admin", "vm1", "vm-read"],
+                    "instructions": ({"decision": "grant"}, ),
+                    "enabled": True
+                }
+            ]
+        }
+        :return: {
+            "subject_data": {"subject_category_id1": {"admin": "data_id1", "dev": "data_id2"}},
+            "object_data": {...},
+            "action_data": {...},
+            "subjects": {"user1": "subject_id1", "user2": "subject_id2"},
+            "objects": {...},
+            "actions": {...},
+            "rules": "number of rules added"
+        }
+        :internal_api: import_policy
+        """
+        try:
+            data = PolicyManager.import_policy(
+                user_id=user_id, policy_id=uuid, value=request.json)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"import": data}
+
+
+class PolicyClone(Resource):
+    """
+    Endpoint for policy clone requests
+    """
+
+    __urls__ = (
+        "/policies/<string:uuid>/clone",
+        "/policies/<string:uuid>/clone/",
+    )
+
+    @check_auth
+    def post(self, uuid=None, user_id=None):
+        """Copy a policy with its data, perimeter, assignments and rules
+
+        The copy is done inside the database in one transaction, the new
+        policy gets new data IDs and shares the perimeter of the policy.
+
+        :param uuid: uuid of the policy to copy
+        :param user_id: user ID who do the request
+        :request body: {
+            "name": "name of the new policy",
+            "description": "...",
+            "pdp": {
+                "name": "...",
+                "keystone_project_id": "keystone_project_id1",
+                "description": "...",
+            }
+        }
+        :return: {
+            "policies": {"policy_id1": {...}},
+            "pdps": {"pdp_id1": {...}} (empty if no pdp was given),
+            "job_id": "ID of the job creating the pods (see /jobs) or None"
+        }
+        :internal_api: clone_policy
+        """
+        try:
+            value = dict(request.json or {})
+            pdp_value = value.pop("pdp", None)
+            if pdp_value is not None:
+                pdp_value = dict(pdp_value)
+                if not pdp_value.get("keystone_project_id"):
+                    pdp_value["keystone_project_id"] = None
+                elif check_keystone_pid(pdp_value["keystone_project_id"]):
+                    raise exceptions.PdpKeystoneMappingConflict
+            data = PolicyManager.clone_policy(
+                user_id=user_id, policy_id=uuid, value=value, pdp_value=pdp_value)
+            job_id = None
+            for pdp_id, pdp in data["pdp"].items():
+                job_id = submit_add_pod(uuid=pdp_id, data=pdp)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"policies": data["policies"], "pdps": data["pdp"], "job_id": job_id}
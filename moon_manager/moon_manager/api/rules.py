@@ -11,6 +11,8 @@ from flask_restful import Resource
 import logging
 from python_moonutilities.security_functions import check_auth
 from python_moondb.core import PolicyManager
+from moon_manager.api.filters import get_filters, paginate, project
+from moon_manager.api.versions import get_headers, not_modified
 
 __version__ = "4.3.2"
 
@@ -45,17 +47,28 @@ class Rules(Resource):
                     ["subject_data_id2", "object_data_id2", "action_data_id2"],
             ]
         }
+        :query: meta_rule_id, id, fields, limit, marker (see moon_manager.api.filters)
         :internal_api: get_rules
         """
         try:
+            version = PolicyManager.get_rules_version(user_id=user_id, policy_id=uuid)
+            response = not_modified(version)
+            if response is not None:
+                return response
+            filters = get_filters()
             data = PolicyManager.get_rules(user_id=user_id,
                                            policy_id=uuid,
-                                           rule_id=rule_id)
+                                           rule_id=rule_id,
+                                           meta_rule_id=request.args.get("meta_rule_id"),
+                                           **filters)
+            response = {"rules": data}
+            if "rules" in data:
+                data["rules"] = project(paginate(response, filters, data["rules"]))
         except Exception as e:
             logger.error(e, exc_info=True)
             return {"result": False,
                     "error": str(e)}, 500
-        return {"rules": data}
+        return response, 200, get_headers(version)
 
     @check_auth
     def post(self, uuid=None, rule_id=None, user_id=None):
@@ -138,3 +151,66 @@ class Rules(Resource):
                     "error": str(e)}, 500
         return {"result": True}
 
+
+class RulesBulk(Resource):
+    """
+    Endpoint for adding or deleting many rules at once
+    """
+
+    __urls__ = ("/policies/<string:uuid>/rules/bulk",
+                "/policies/<string:uuid>/rules/bulk/",
+                )
+
+    @check_auth
+    def post(self, uuid=None, user_id=None):
+        """Add several rules, the rules already in the policy are skipped
+
+        :param uuid: policy ID
+        :param user_id: user ID who do the request
+        :request body: {
+            "rules": [
+                {
+                    "meta_rule_id": "meta_rule_id1",
+                    "rule": ["subject_data_id1", "object_data_id1", "action_data_id1"],
+                    "instructions": ({"decision": "grant"}, ),
+                    "enabled": True
+                },
+            ]
+        }
+        :return: {
+            "rules": [
+                {"id": "rule_id1", "added": True},
+                {"id": "rule_id2", "added": False},
+            ]
+        }
+        :internal_api: add_rules
+        """
+        try:
+            data = PolicyManager.add_rules(user_id=user_id,
+                                           policy_id=uuid,
+                                           values=request.json.get("rules", []))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"rules": data}
+
+    @check_auth
+    def delete(self, uuid=None, user_id=None):
+        """Delete several rules
+
+        :param uuid: policy ID
+        :param user_id: user ID who do the request
+        :request body: {"rules": ["rule_id1", "rule_id2"]}
+        :return: {"result": true, "deleted": 2}
+        :internal_api: delete_rules
+        """
+        try:
+            data = PolicyManager.delete_rules(user_id=user_id,
+                                              policy_id=uuid,
+                                              rule_ids=request.json.get("rules", []))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return {"result": False,
+                    "error": str(e)}, 500
+        return {"result": True, "deleted": data}
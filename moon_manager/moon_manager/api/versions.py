@@ -0,0 +1,28 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+"""
+Conditional requests on the collections polled by the cache
+
+The version of a collection changes on every write, it is sent as an
+ETag and a request with the same version in If-None-Match receives a
+304 response without the collection being read.
+"""
+
+from flask import request, Response
+
+
+def get_headers(version):
+    return {"ETag": '"{}"'.format(version)}
+
+
+def not_modified(version):
+    """Get a 304 response if the client already has that version
+
+    :param version: the current version of the collection
+    :return: a response or None
+    """
+    if request.if_none_match.contains(version):
+        return Response(status=304, headers=get_headers(version))
+    return None
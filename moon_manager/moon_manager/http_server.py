@@ -12,14 +12,18 @@ import time
 from moon_manager import __version__
 from moon_manager.api.generic import Status, Logs, API
 from moon_manager.api.models import Models
-from moon_manager.api.policies import Policies
+from moon_manager.api.policies import Policies, PolicyImport, PolicyClone
 from moon_manager.api.pdp import PDP
+from moon_manager.api import jobs
+from moon_manager.api.jobs import Jobs
+from moon_manager.api.metrics import Metrics
 from moon_manager.api.meta_rules import MetaRules
 from moon_manager.api.meta_data import SubjectCategories, ObjectCategories, ActionCategories
 from moon_manager.api.perimeter import Subjects, Objects, Actions
 from moon_manager.api.data import SubjectData, ObjectData, ActionData
-from moon_manager.api.assignments import SubjectAssignments, ObjectAssignments, ActionAssignments
-from moon_manager.api.rules import Rules
+from moon_manager.api.assignments import SubjectAssignments, ObjectAssignments, ActionAssignments, \
+    SubjectAssignmentsBulk, ObjectAssignmentsBulk, ActionAssignmentsBulk
+from moon_manager.api.rules import Rules, RulesBulk
 from python_moonutilities import configuration, exceptions
 from python_moondb.core import PDPManager
 
@@ -29,10 +33,11 @@ logger = logging.getLogger("moon.manager.http_server")
 __API__ = (
     Status, Logs, API,
     MetaRules, SubjectCategories, ObjectCategories, ActionCategories,
-    Subjects, Objects, Actions, Rules,
+    Subjects, Objects, Actions, Rules, RulesBulk,
     SubjectAssignments, ObjectAssignments, ActionAssignments,
+    SubjectAssignmentsBulk, ObjectAssignmentsBulk, ActionAssignmentsBulk,
     SubjectData, ObjectData, ActionData,
-    Models, Policies, PDP
+    Models, Policies, PolicyImport, PolicyClone, PDP, Jobs, Metrics
  )
 
 
@@ -137,7 +142,7 @@ class HTTPServer(Server):
             self.api.add_resource(_api, *_api.__urls__)
 
     @staticmethod
-    def __check_if_db_is_up():
+    def wait_for_database():
         first = True
         while True:
             try:
@@ -152,5 +157,20 @@ class HTTPServer(Server):
                 break
 
     def run(self):
-        self.__check_if_db_is_up()
-        self.app.run(debug=True, host=self._host, port=self._port)  # nosec
+        if self._extra.get("debug", False):
+            self.wait_for_database()
+            jobs.recover_jobs()
+            self.app.run(debug=True, host=self._host, port=self._port)  # nosec
+            return
+        try:
+            from moon_manager.wsgi import Application
+        except ImportError:
+            logger.warning("gunicorn is not installed, using the single process server")
+            self.wait_for_database()
+            jobs.recover_jobs()
+            self.app.run(host=self._host, port=self._port, threaded=True)
+            return
+        Application(self,
+                    workers=self._extra.get("workers", 4),
+                    threads=self._extra.get("threads", 8),
+                    timeout=self._extra.get("timeout", 30)).run()
@@ -17,17 +17,21 @@ def create_server():
         hostname = conf["components/manager"].get("hostname", "manager")
         port = conf["components/manager"].get("port", 80)
         bind = conf["components/manager"].get("bind", "127.0.0.1")
+        options = {key: conf["components/manager"][key]
+                   for key in ("debug", "workers", "threads", "timeout")
+                   if key in conf["components/manager"]}
     except exceptions.ConsulComponentNotFound:
         hostname = "manager"
         bind = "127.0.0.1"
         port = 80
+        options = {}
         configuration.add_component(uuid="manager",
                                     name=hostname,
                                     port=port,
                                     bind=bind)
     logger.info("Starting server with IP {} on port {} bind to {}".format(
         hostname, port, bind))
-    return HTTPServer(host=bind, port=port)
+    return HTTPServer(host=bind, port=port, **options)
 
 
 def run():
@@ -0,0 +1,49 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+"""
+Production server of the manager
+
+The application is served by gunicorn with several worker processes,
+each one with its own threads and its own database connection pool.
+"""
+
+import logging
+from gunicorn.app.base import BaseApplication
+from python_moondb import core
+
+logger = logging.getLogger("moon.manager.wsgi")
+
+
+def on_starting(arbiter):
+    """Wait for the database and recover the jobs before the workers are forked"""
+    from moon_manager.http_server import HTTPServer
+    from moon_manager.api import jobs
+    HTTPServer.wait_for_database()
+    jobs.recover_jobs()
+    # Note: the workers must not share the connections of the arbiter
+    core.dispose()
+
+
+class Application(BaseApplication):
+
+    def __init__(self, server, workers=4, threads=8, timeout=30):
+        self.server = server
+        self.options = {
+            "bind": "{}:{}".format(server.host, server.port),
+            "workers": workers,
+            "threads": threads,
+            "worker_class": "gthread",
+            "timeout": timeout,
+            "on_starting": on_starting,
+        }
+        super(Application, self).__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        logger.info("Starting worker with {} threads".format(self.options["threads"]))
+        return self.server.app
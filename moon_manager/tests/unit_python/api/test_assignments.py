@@ -0,0 +1,44 @@
+import json
+import api.utilities as utilities
+from api.test_policies import add_policies, delete_policies
+
+
+def bulk_subject_assignments(client, method, policy_id, assignments):
+    req = getattr(client, method)("/policies/{}/subject_assignments/bulk".format(policy_id),
+                                  data=json.dumps({"assignments": assignments}),
+                                  headers={'Content-Type': 'application/json'})
+    assert req.status_code == 200
+    return utilities.get_json(req.data)["subject_assignments"]
+
+
+def get_subject_assignments(client, policy_id):
+    req = client.get("/policies/{}/subject_assignments".format(policy_id))
+    assert req.status_code == 200
+    return utilities.get_json(req.data)["subject_assignments"]
+
+
+def test_subject_assignments_bulk():
+    client = utilities.register_client()
+    req, policies = add_policies(client, "test_subject_assignments_bulk")
+    policy_id = list(policies["policies"].keys())[0]
+    assignments = [
+        {"id": "subject_id{}".format(index), "category_id": "category_id1", "data_id": "data_id1"}
+        for index in range(3)
+    ]
+    result = bulk_subject_assignments(client, "post", policy_id, assignments + assignments[:1])
+    assert [_item["added"] for _item in result] == [True, True, True, False]
+    assert result[3]["id"] == result[0]["id"]
+    assert len(get_subject_assignments(client, policy_id)) == 3
+
+    result = bulk_subject_assignments(client, "delete", policy_id, assignments[:2])
+    assert [_item["deleted"] for _item in result] == [True, True]
+    assert len(get_subject_assignments(client, policy_id)) == 1
+    delete_policies(client, "test_subject_assignments_bulk")
+
+
+def test_subject_assignments_bulk_without_data():
+    client = utilities.register_client()
+    req = client.post("/policies/{}/subject_assignments/bulk".format("policy_id"),
+                      data=json.dumps({"assignments": [{"id": "subject_id1", "category_id": "category_id1"}]}),
+                      headers={'Content-Type': 'application/json'})
+    assert req.status_code == 500
@@ -0,0 +1,11 @@
+import api.utilities as utilities
+
+
+def test_get_metrics():
+    client = utilities.register_client()
+    req = client.get("/policies")
+    assert req.status_code == 200
+    req = client.get("/metrics")
+    assert req.status_code == 200
+    metrics = utilities.get_json(req.data)["metrics"]
+    assert metrics["PolicyManager.get_policies"]["calls"] > 0
@@ -0,0 +1,92 @@
+import json
+import time
+import api.utilities as utilities
+
+
+def wait_for_job(client, job_id, timeout=5):
+    end = time.time() + timeout
+    while True:
+        req = client.get("/jobs/{}".format(job_id))
+        assert req.status_code == 200
+        job = utilities.get_json(req.data)["jobs"][job_id]
+        if job["status"] in ("done", "error") or time.time() > end:
+            return job
+        time.sleep(0.1)
+
+
+def add_pdp(client, name, keystone_project_id=None):
+    data = {
+        "name": name,
+        "security_pipeline": [],
+        "keystone_project_id": keystone_project_id,
+        "description": "description of {}".format(name)
+    }
+    req = client.post("/pdp", data=json.dumps(data),
+                      headers={'Content-Type': 'application/json'})
+    assert req.status_code == 200
+    return utilities.get_json(req.data)
+
+
+def test_add_pdp_without_project():
+    client = utilities.register_client()
+    result = add_pdp(client, "pdp_without_project")
+    assert result["job_id"] is None
+
+
+def test_add_pdp_job(no_requests):
+    no_requests.register_uri('POST', 'http://interface:8083/pods', json={"pods": {}})
+    client = utilities.register_client()
+    result = add_pdp(client, "pdp_job", keystone_project_id="keystone_project_job")
+    pdp_id = list(result["pdps"].keys())[0]
+    job = wait_for_job(client, result["job_id"])
+    assert job["name"] == "add_pod"
+    assert job["pdp_id"] == pdp_id
+    assert job["status"] == "done"
+    assert no_requests.request_history[-1].json()["pdp_id"] == pdp_id
+
+
+def test_delete_pdp_job(no_requests):
+    client = utilities.register_client()
+    pdp_id = list(add_pdp(client, "pdp_delete_job")["pdps"].keys())[0]
+    no_requests.register_uri('GET', 'http://interface:8083/pods', json={
+        "pods": {"pod_id1": [{"pdp_id": pdp_id, "name": "pipeline"}]}})
+    no_requests.register_uri('DELETE', 'http://interface:8083/pods/pod_id1', json={})
+    req = client.delete("/pdp/{}".format(pdp_id))
+    assert req.status_code == 200
+    job = wait_for_job(client, utilities.get_json(req.data)["job_id"])
+    assert job["status"] == "done"
+    assert no_requests.request_history[-1].method == "DELETE"
+
+
+def test_jobs_of_a_pdp_run_in_order():
+    from moon_manager.api import jobs
+    client = utilities.register_client()
+    calls = []
+
+    def slow_job(name):
+        calls.append(("start", name))
+        time.sleep(0.3)
+        calls.append(("end", name))
+
+    first = jobs.submit("add_pod", "pdp_in_order", slow_job, "first")
+    second = jobs.submit("delete_pod", "pdp_in_order", slow_job, "second")
+    assert wait_for_job(client, second)["status"] == "done"
+    assert wait_for_job(client, first)["status"] == "done"
+    assert calls == [("start", "first"), ("end", "first"), ("start", "second"), ("end", "second")]
+
+
+def test_recover_jobs():
+    from moon_manager.api import jobs
+    from python_moondb.core import PDPManager
+    current_time = time.time()
+    job_ids = {}
+    for status, updated in (("running", current_time), ("done", current_time), ("done", 0)):
+        job = PDPManager.add_job(user_id="admin", value={
+            "name": "add_pod", "pdp_id": "pdp_recover", "status": status, "error": "",
+            "created": updated, "updated": updated})
+        job_ids[(status, updated)] = list(job.keys())[0]
+    jobs.recover_jobs()
+    all_jobs = PDPManager.get_jobs(user_id="admin")
+    assert all_jobs[job_ids[("running", current_time)]]["status"] == "error"
+    assert all_jobs[job_ids[("done", current_time)]]["status"] == "done"
+    assert job_ids[("done", 0)] not in all_jobs
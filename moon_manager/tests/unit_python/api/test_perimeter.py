@@ -112,6 +112,27 @@ def test_objects():
     delete_objects(client, "testuser")
 
 
+def test_objects_with_filters():
+    client = utilities.register_client()
+    for name in ("filter_object_1", "filter_object_2", "filter_object_3"):
+        add_objects(client, name)
+    req = client.get("/objects?name=filter_object_2&fields=name")
+    assert req.status_code == 200
+    objects = utilities.get_json(req.data)["objects"]
+    assert list(objects.values()) == [{"name": "filter_object_2"}]
+    ids = sorted(get_objects(client)["objects"].keys())
+    req = client.get("/objects?id={}&limit=1".format(",".join(ids[:2])))
+    objects = utilities.get_json(req.data)
+    assert list(objects["objects"].keys()) == ids[:1]
+    assert objects["next"] == ids[0]
+    req = client.get("/objects?id={}&limit=1&marker={}".format(",".join(ids[:2]), ids[0]))
+    objects = utilities.get_json(req.data)
+    assert list(objects["objects"].keys()) == ids[1:2]
+    assert objects["next"] is None
+    for name in ("filter_object_1", "filter_object_2", "filter_object_3"):
+        delete_objects(client, name)
+
+
 def get_actions(client):
     req = client.get("/actions")
     assert req.status_code == 200
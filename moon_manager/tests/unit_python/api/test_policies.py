@@ -56,6 +56,21 @@ def test_add_policies():
     assert value["genre"] == "genre"
 
 
+def test_get_policies_not_modified():
+    client = utilities.register_client()
+    req, policies = get_policies(client)
+    etag = req.headers["ETag"]
+    req = client.get("/policies", headers={"If-None-Match": etag})
+    assert req.status_code == 304
+    assert not req.data
+    add_policies(client, "test_etag")
+    req = client.get("/policies", headers={"If-None-Match": etag})
+    assert req.status_code == 200
+    assert req.headers["ETag"] != etag
+    assert "test_etag" in [_policy["name"] for _policy in utilities.get_json(req.data)["policies"].values()]
+    delete_policies(client, "test_etag")
+
+
 def test_delete_policies():
     client = utilities.register_client()
     req = delete_policies(client, "testuser")
@@ -67,3 +82,61 @@ def test_delete_policies_without_id():
     req = delete_policies_without_id(client)
     assert req.status_code == 500
 
+
+def test_import_policy():
+    client = utilities.register_client()
+    req, policies = add_policies(client, "import_policy")
+    policy_id = list(policies["policies"].keys())[0]
+    data = {
+        "object_data": {"object_category_id1": ["vm1", "vm2"]},
+        "objects": ["vm1", "vm2"],
+        "object_assignments": [
+            {"object": "vm1", "category_id": "object_category_id1", "data": "vm1"},
+            {"object": "vm2", "category_id": "object_category_id1", "data": "vm2"},
+        ]
+    }
+    req = client.post("/policies/{}/import".format(policy_id), data=json.dumps(data),
+                      headers={'Content-Type': 'application/json'})
+    assert req.status_code == 200
+    result = utilities.get_json(req.data)["import"]
+    assert set(result["objects"].keys()) == {"vm1", "vm2"}
+    assert result["rules"] == 0
+    req = client.get("/policies/{}/object_assignments/{}".format(
+        policy_id, result["objects"]["vm1"]))
+    assignments = utilities.get_json(req.data)["object_assignments"]
+    assert list(assignments.values())[0]["assignments"] == [
+        result["object_data"]["object_category_id1"]["vm1"]]
+
+
+def test_import_policy_unknown_policy():
+    client = utilities.register_client()
+    req = client.post("/policies/{}/import".format("unknown_policy"), data=json.dumps({}),
+                      headers={'Content-Type': 'application/json'})
+    assert req.status_code == 500
+
+
+def test_clone_policy():
+    client = utilities.register_client()
+    req, policies = add_policies(client, "clone_policy")
+    policy_id = list(policies["policies"].keys())[0]
+    data = {
+        "objects": ["vm1"],
+        "object_data": {"object_category_id1": ["vm1"]},
+        "object_assignments": [
+            {"object": "vm1", "category_id": "object_category_id1", "data": "vm1"},
+        ]
+    }
+    req = client.post("/policies/{}/import".format(policy_id), data=json.dumps(data),
+                      headers={'Content-Type': 'application/json'})
+    object_id = utilities.get_json(req.data)["import"]["objects"]["vm1"]
+    req = client.post("/policies/{}/clone".format(policy_id), data=json.dumps({"name": "cloned_policy"}),
+                      headers={'Content-Type': 'application/json'})
+    assert req.status_code == 200
+    result = utilities.get_json(req.data)
+    assert result["pdps"] == {}
+    new_policy_id = list(result["policies"].keys())[0]
+    assert result["policies"][new_policy_id]["name"] == "cloned_policy"
+    assert result["policies"][new_policy_id]["model_id"] == "modelId"
+    req = client.get("/policies/{}/object_assignments/{}".format(new_policy_id, object_id))
+    assignments = utilities.get_json(req.data)["object_assignments"]
+    assert len(list(assignments.values())[0]["assignments"]) == 1
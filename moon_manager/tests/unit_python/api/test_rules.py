@@ -0,0 +1,53 @@
+import json
+import api.utilities as utilities
+from api.test_policies import add_policies, delete_policies
+
+
+def add_rules_bulk(client, policy_id, rules):
+    req = client.post("/policies/{}/rules/bulk".format(policy_id),
+                      data=json.dumps({"rules": rules}),
+                      headers={'Content-Type': 'application/json'})
+    assert req.status_code == 200
+    return utilities.get_json(req.data)["rules"]
+
+
+def get_rules(client, policy_id):
+    req = client.get("/policies/{}/rules".format(policy_id))
+    assert req.status_code == 200
+    return utilities.get_json(req.data)["rules"]["rules"]
+
+
+def test_rules_bulk():
+    client = utilities.register_client()
+    req, policies = add_policies(client, "test_rules_bulk")
+    policy_id = list(policies["policies"].keys())[0]
+    rules = [
+        {
+            "meta_rule_id": "meta_rule_id1",
+            "rule": ["subject_data_id{}".format(index), "object_data_id1", "action_data_id1"],
+            "instructions": [{"decision": "grant"}],
+            "enabled": True
+        } for index in range(3)
+    ]
+    result = add_rules_bulk(client, policy_id, rules + rules[:1])
+    assert [_rule["added"] for _rule in result] == [True, True, True, False]
+    assert result[3]["id"] == result[0]["id"]
+    result = add_rules_bulk(client, policy_id, rules[1:])
+    assert [_rule["added"] for _rule in result] == [False, False]
+    assert len(get_rules(client, policy_id)) == 3
+
+    req = client.delete("/policies/{}/rules/bulk".format(policy_id),
+                        data=json.dumps({"rules": [result[0]["id"], result[1]["id"]]}),
+                        headers={'Content-Type': 'application/json'})
+    assert req.status_code == 200
+    assert utilities.get_json(req.data)["deleted"] == 2
+    assert len(get_rules(client, policy_id)) == 1
+    delete_policies(client, "test_rules_bulk")
+
+
+def test_rules_bulk_without_meta_rule():
+    client = utilities.register_client()
+    req = client.post("/policies/{}/rules/bulk".format("policy_id"),
+                      data=json.dumps({"rules": [{"rule": ["a", "b", "c"]}]}),
+                      headers={'Content-Type': 'application/json'})
+    assert req.status_code == 500
@@ -123,6 +123,7 @@ COMPONENTS = (
     "database",
     "slave",
     "components/manager",
+    "components/orchestrator",
 )
 
 
@@ -0,0 +1,21 @@
+import pytest
+
+
+def test_application_config():
+    pytest.importorskip("gunicorn")
+    import moon_manager.server
+    from moon_manager.wsgi import Application, on_starting
+    server = moon_manager.server.create_server()
+    application = Application(server, workers=2, threads=4, timeout=10)
+    assert application.cfg.workers == 2
+    assert application.cfg.threads == 4
+    assert application.cfg.worker_class_str == "gthread"
+    assert application.cfg.bind == ["{}:{}".format(server.host, server.port)]
+    assert application.cfg.on_starting is on_starting
+    assert application.load() is server.app
+
+
+def test_on_starting():
+    pytest.importorskip("gunicorn")
+    from moon_manager.wsgi import on_starting
+    on_starting(None)
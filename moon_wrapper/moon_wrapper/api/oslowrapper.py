@@ -12,6 +12,7 @@ from flask_restful import Resource
 import logging
 import json
 import requests
+from concurrent import futures
 from python_moonutilities import exceptions
 
 __version__ = "0.1.0"
@@ -32,6 +33,7 @@ class OsloWrapper(Resource):
     def __init__(self, **kwargs):
         self.port = kwargs.get("port")
         self.CACHE = kwargs.get("cache", {})
+        self.DECISIONS = kwargs.get("decisions")
         self.TIMEOUT = 5
 
     def post(self):
@@ -67,49 +69,166 @@ class OsloWrapper(Resource):
 
     def get_interface_url(self, project_id):
         logger.debug("project_id {}".format(project_id))
-        for containers in self.CACHE.containers.values():
-            logger.info("containers {}".format(containers))
-            for container in containers:
-                if container.get("keystone_project_id") == project_id:
-                    if "pipeline" in container['name']:
-                        return "http://{}:{}".format(
-                            container['name'],
-                            container['port'])
-        self.CACHE.update()
-        # Note (asteroide): test an other time after the update
-        for containers in self.CACHE.containers.values():
-            for container in containers:
-                if container.get("keystone_project_id") == project_id:
-                    if "pipeline" in container['name']:
-                        return "http://{}:{}".format(
-                            container['name'],
-                            container['port'])
-        raise exceptions.AuthzException("Keystone Project "
-                                        "ID ({}) is unknown or not mapped "
-                                        "to a PDP.".format(project_id))
+        return self.DECISIONS.get_interface(self.CACHE, project_id)[1]
+
+    def get_request(self, data):
+        """Extract the Moon request from an oslo.policy request
+
+        :param data: dictionary with the rule, the target and the credentials
+            (target and credentials may be JSON strings)
+        :return: a tuple (project_id, subject_name, object_name, action_name)
+        """
+        target = data.get('target', {})
+        if isinstance(target, str):
+            target = json.loads(target)
+        credentials = data.get('credentials', {})
+        if isinstance(credentials, str):
+            credentials = json.loads(credentials)
+        credentials = credentials or {}
+        return (
+            self.__get_project_id(target, credentials),
+            self.__get_subject(target, credentials),
+            self.__get_object(target, credentials),
+            data.get('rule', "")
+        )
 
     def manage_data(self):
         data = request.form
         if not dict(request.form):
             data = json.loads(request.data.decode("utf-8"))
-        target = json.loads(data.get('target', {}))
-        credentials = json.loads(data.get('credentials', {}))
-        rule = data.get('rule', "")
-        _subject = self.__get_subject(target, credentials)
-        _object = self.__get_object(target, credentials)
-        _action = rule
-        _project_id = self.__get_project_id(target, credentials)
-        _pdp_id = self.CACHE.get_pdp_from_keystone_project(_project_id)
-        interface_url = self.get_interface_url(_project_id)
+        key = self.get_request(data)
+        _project_id, _subject, _object, _action = key
+        decision = self.DECISIONS.get_decision(key)
+        if decision is not None:
+            return decision
+        _pdp_id, interface_url = self.DECISIONS.get_interface(self.CACHE, _project_id)
         logger.debug("interface_url={}".format(interface_url))
-        req = requests.get("{}/authz/{}/{}/{}/{}".format(
+        req = self.DECISIONS.session.get("{}/authz/{}/{}/{}/{}".format(
             interface_url,
             _pdp_id,
             _subject,
             _object,
             _action
-        ))
+        ), timeout=self.TIMEOUT)
         logger.debug("Get interface {}".format(req.text))
-        if req.status_code == 200:
-            if req.json().get("result", False):
-                return True
+        if req.status_code not in (200, 401):
+            # Note: errors of the interface are not kept in the decision cache
+            return False
+        decision = req.status_code == 200 and req.json().get("result", False)
+        self.DECISIONS.set_decision(key, decision)
+        return decision
+
+
+class OsloWrapperBulk(OsloWrapper):
+    """
+    Endpoint for bulk authz requests
+    """
+
+    __urls__ = (
+        "/authz/oslo/bulk",
+        "/authz/oslo/bulk/",
+    )
+
+    __executor = futures.ThreadPoolExecutor(max_workers=16)
+    # Note: a request holds a worker until the interfaces answer, both its size and its wait are bounded
+    MAX_ITEMS = 1000
+    MAX_TIMEOUT = 30
+
+    def post(self):
+        """Get the decisions of a list of oslo.policy requests
+
+        The requests are grouped by Keystone project and each group is
+        sent in one call to the stream endpoint of the matching interface.
+
+        :request body: [
+            {
+                "rule": "os_compute_api:servers:create",
+                "target": {"project_id": "...", "user_id": "..."},
+                "credentials": {"user_id": "..."}
+            },
+        ]
+        :return: a list of booleans, in the order of the requests, or
+            {"result": false, "message": "..."} with the code 400 if the
+            body is not a list of at most MAX_ITEMS requests
+        """
+        try:
+            keys = self.__get_keys(json.loads(request.data.decode("utf-8")))
+        except ValueError as e:
+            return {"result": False, "message": str(e)}, 400
+        results = [False] * len(keys)
+        groups = {}
+        for index, key in enumerate(keys):
+            decision = self.DECISIONS.get_decision(key)
+            if decision is not None:
+                results[index] = decision
+                continue
+            groups.setdefault(key[0], []).append((index, key))
+        jobs = [self.__executor.submit(self.__post_group, project_id, items)
+                for project_id, items in groups.items()]
+        for job in jobs:
+            for index, decision in job.result():
+                results[index] = decision
+        return flask.jsonify(results)
+
+    def __get_keys(self, data):
+        """Check the requests of the body and get their Moon requests
+
+        :raise ValueError: if a request is malformed
+        """
+        if not isinstance(data, list):
+            raise ValueError("The body must be a list of requests")
+        if len(data) > self.MAX_ITEMS:
+            raise ValueError("A body must not have more than {} requests".format(self.MAX_ITEMS))
+        keys = []
+        for index, item in enumerate(data):
+            if not isinstance(item, dict):
+                raise ValueError("The request {} is not an object".format(index))
+            target = item.get("target")
+            if isinstance(target, str):
+                target = json.loads(target)
+            if not isinstance(target, dict):
+                raise ValueError("The target of the request {} is not an object".format(index))
+            credentials = item.get("credentials")
+            if isinstance(credentials, str):
+                credentials = json.loads(credentials)
+            if not isinstance(credentials, (dict, type(None))):
+                raise ValueError("The credentials of the request {} are not an object".format(index))
+            if not isinstance(item.get("rule", ""), str):
+                raise ValueError("The rule of the request {} is not a string".format(index))
+            keys.append(self.get_request(dict(item, target=target, credentials=credentials)))
+        return keys
+
+    def __post_group(self, project_id, items):
+        try:
+            _pdp_id, interface_url = self.DECISIONS.get_interface(self.CACHE, project_id)
+        except exceptions.AuthzException as e:
+            logger.error(str(e))
+            return []
+        body = "".join(json.dumps({
+            "id": index,
+            "subject_name": key[1],
+            "object_name": key[2],
+            "action_name": key[3],
+        }, separators=(",", ":")) + "\n" for index, key in items)
+        try:
+            req = self.DECISIONS.session.post("{}/authz/stream/{}".format(interface_url, _pdp_id),
+                               data=body, timeout=min(self.TIMEOUT * len(items), self.MAX_TIMEOUT))
+        except requests.exceptions.RequestException as e:
+            logger.error("Cannot connect to {} ({})".format(interface_url, e))
+            return []
+        if req.status_code != 200:
+            logger.error("Receive bad response from {} ({})".format(
+                interface_url, req.status_code))
+            return []
+        keys = dict(items)
+        decisions = []
+        for line in req.text.splitlines():
+            answer = json.loads(line)
+            if answer.get("id") not in keys:
+                continue
+            decision = answer.get("result", False) is True
+            if not answer.get("message"):
+                # Note: errors of the interface are not kept in the decision cache
+                self.DECISIONS.set_decision(keys[answer["id"]], decision)
+            decisions.append((answer["id"], decision))
+        return decisions
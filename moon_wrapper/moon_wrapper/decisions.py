@@ -0,0 +1,133 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+
+import logging
+import requests
+import threading
+import time
+from python_moonutilities import exceptions
+
+logger = logging.getLogger("moon.wrapper.decisions")
+
+
+class DecisionCache:
+    """Keep the lookups of the wrapper out of the request path
+
+    The PDP and the interface URL of each Keystone project are indexed,
+    unknown projects are remembered for negative_ttl seconds or until the
+    index is rebuilt and, if decision_ttl is set, the decisions of the
+    interface are kept for decision_ttl seconds. At most max_decisions
+    decisions and unknown projects are kept.
+    """
+
+    def __init__(self, index_ttl=10, negative_ttl=5, decision_ttl=0, max_decisions=10000):
+        self.index_ttl = index_ttl
+        self.negative_ttl = negative_ttl
+        self.decision_ttl = decision_ttl
+        self.max_decisions = max_decisions
+        self.__lock = threading.Lock()
+        self.__index = {}
+        self.__index_update = 0
+        self.__unknown = {}
+        self.__decisions = {}
+        self.__sessions = threading.local()
+
+    def configure(self, index_ttl=None, negative_ttl=None, decision_ttl=None, max_decisions=None):
+        if index_ttl is not None:
+            self.index_ttl = index_ttl
+        if negative_ttl is not None:
+            self.negative_ttl = negative_ttl
+        if decision_ttl is not None:
+            self.decision_ttl = decision_ttl
+        if max_decisions is not None:
+            self.max_decisions = max_decisions
+
+    @property
+    def session(self):
+        """HTTP session of the current thread to the interfaces, a session is not shared by threads"""
+        session = getattr(self.__sessions, "session", None)
+        if session is None:
+            session = self.__sessions.session = requests.Session()
+        return session
+
+    def __update_index(self, cache):
+        index = {}
+        for containers in cache.containers.values():
+            for container in containers:
+                project_id = container.get("keystone_project_id")
+                if project_id in index:
+                    continue
+                if container.get("genre") != "interface" and \
+                        "pipeline" not in container.get("name", ""):
+                    continue
+                index[project_id] = (
+                    cache.get_pdp_from_keystone_project(project_id),
+                    "http://{}:{}".format(container['name'], container['port'])
+                )
+        with self.__lock:
+            self.__index = index
+            self.__index_update = time.time()
+            # Note: the projects mapped since are found in the new index
+            self.__unknown = {}
+
+    def get_interface(self, cache, project_id):
+        """Get the PDP and the interface URL serving a Keystone project
+
+        :param cache: Cache to use if the project is not indexed
+        :param project_id: Keystone Project ID
+        :return: (pdp_id, interface_url)
+        """
+        if self.__index_update + self.index_ttl < time.time():
+            self.__update_index(cache)
+        if project_id in self.__index:
+            return self.__index[project_id]
+        if self.__unknown.get(project_id, 0) > time.time():
+            raise exceptions.AuthzException("Keystone Project "
+                                            "ID ({}) is unknown or not mapped "
+                                            "to a PDP.".format(project_id))
+        # Note (asteroide): test an other time after the update
+        cache.update()
+        self.__update_index(cache)
+        if project_id in self.__index:
+            return self.__index[project_id]
+        logger.info("Keystone project {} is not mapped to a PDP".format(project_id))
+        current_time = time.time()
+        with self.__lock:
+            if len(self.__unknown) >= self.max_decisions:
+                self.__unknown = {
+                    _key: _value for _key, _value in self.__unknown.items()
+                    if _value > current_time}
+                if len(self.__unknown) >= self.max_decisions:
+                    self.__unknown = {}
+            self.__unknown[project_id] = current_time + self.negative_ttl
+        raise exceptions.AuthzException("Keystone Project "
+                                        "ID ({}) is unknown or not mapped "
+                                        "to a PDP.".format(project_id))
+
+    def get_decision(self, key):
+        """Get a decision which has not expired
+
+        :param key: (project_id, subject, object, rule)
+        :return: the decision or None
+        """
+        if not self.decision_ttl:
+            return None
+        expire, decision = self.__decisions.get(key, (0, None))
+        if expire > time.time():
+            return decision
+        return None
+
+    def set_decision(self, key, decision):
+        if not self.decision_ttl:
+            return
+        current_time = time.time()
+        with self.__lock:
+            if len(self.__decisions) >= self.max_decisions:
+                self.__decisions = {
+                    _key: _value for _key, _value in self.__decisions.items()
+                    if _value[0] > current_time}
+                if len(self.__decisions) >= self.max_decisions:
+                    self.__decisions = {}
+            self.__decisions[key] = (current_time + self.decision_ttl, decision)
@@ -8,14 +8,17 @@ from flask_restful import Resource, Api
 import logging
 from moon_wrapper import __version__
 from moon_wrapper.api.generic import Status, Logs, API
-from moon_wrapper.api.oslowrapper import OsloWrapper
+from moon_wrapper.api.oslowrapper import OsloWrapper, OsloWrapperBulk
+from moon_wrapper.decisions import DecisionCache
 from python_moonutilities.cache import Cache
 from python_moonutilities import configuration, exceptions
+from python_moonutilities.resources import Ready
 
 logger = logging.getLogger("moon.wrapper.http_server")
 
 
 CACHE = Cache()
+DECISIONS = DecisionCache()
 
 __API__ = (
     Status, Logs, API
@@ -103,6 +106,7 @@ class HTTPServer(Server):
         _protocol = conf["components/orchestrator"].get("protocol", "http")
         self.orchestrator_url = "{}://{}:{}".format(
             _protocol, _hostname, _port)
+        DECISIONS.configure(**kwargs.get("decision_cache", {}))
         # Todo : specify only few urls instead of *
         # CORS(self.app)
         self.api = Api(self.app)
@@ -127,13 +131,18 @@ class HTTPServer(Server):
 
         for api in __API__:
             self.api.add_resource(api, *api.__urls__)
-        self.api.add_resource(OsloWrapper, *OsloWrapper.__urls__,
-                              resource_class_kwargs={
-                                  "orchestrator_url": self.orchestrator_url,
-                                  "cache": CACHE,
-                              }
-                              )
+        self.api.add_resource(Ready, *Ready.__urls__,
+                              resource_class_kwargs={"cache": CACHE})
+        for api in (OsloWrapper, OsloWrapperBulk):
+            self.api.add_resource(api, *api.__urls__,
+                                  resource_class_kwargs={
+                                      "orchestrator_url": self.orchestrator_url,
+                                      "cache": CACHE,
+                                      "decisions": DECISIONS,
+                                  }
+                                  )
 
     def run(self):
+        CACHE.warm_up()
         self.app.run(host=self._host, port=self._port)  # nosec
 
@@ -18,13 +18,15 @@ def main():
         hostname = conf["components/wrapper"].get("hostname", "wrapper")
         port = conf["components/wrapper"].get("port", 80)
         bind = conf["components/wrapper"].get("bind", "127.0.0.1")
+        decision_cache = conf["components/wrapper"].get("decision_cache", {})
     except exceptions.ConsulComponentNotFound:
         hostname = "wrapper"
         bind = "127.0.0.1"
         port = 80
+        decision_cache = {}
         configuration.add_component(uuid="wrapper", name=hostname, port=port, bind=bind)
     LOG.info("Starting server with IP {} on port {} bind to {}".format(hostname, port, bind))
-    return HTTPServer(host=bind, port=port)
+    return HTTPServer(host=bind, port=port, decision_cache=decision_cache)
 
 
 if __name__ == '__main__':
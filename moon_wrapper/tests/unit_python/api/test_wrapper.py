@@ -20,9 +20,50 @@ def test_authz_true(context):
         'rule': context.get('action_name'),
         'target': json.dumps(_target),
         'credentials': 'null'}
-    req = client.post("/authz", data=json.dumps(authz_data))
+    req = client.post("/authz/oslo", data=json.dumps(authz_data))
     assert req.status_code == 200
     assert req.data
     assert isinstance(req.data, bytes)
     assert req.data == b"True"
 
+
+def test_authz_bulk(context, set_consul_and_db):
+    import moon_wrapper.server
+    set_consul_and_db.register_uri(
+        'POST', 'http://interface-paltry:8080/authz/stream/{}'.format(
+            "b3d3e18abf3340e8b635fd49e6634ccd"),
+        text='{"id":1,"result":false}\n{"id":0,"result":true}\n'
+    )
+    server = moon_wrapper.server.main()
+    client = server.app.test_client()
+    authz_data = []
+    for project_id, action_name in (
+            (context.get('project_id'), context.get('action_name')),
+            (context.get('project_id'), "delete"),
+            ("unknown_project", context.get('action_name'))):
+        authz_data.append({
+            'rule': action_name,
+            'target': {
+                'target': {
+                    "name": context.get('object_name'),
+                },
+                "project_id": project_id,
+                "user_id": context.get('subject_name')
+            },
+            'credentials': None})
+    req = client.post("/authz/oslo/bulk", data=json.dumps(authz_data))
+    assert req.status_code == 200
+    assert get_json(req.data) == [True, False, False]
+
+
+def test_authz_bulk_bad_requests(context):
+    import moon_wrapper.server
+    server = moon_wrapper.server.main()
+    client = server.app.test_client()
+    for body in ("not json", {"rule": "boot"}, ["boot"], [{"rule": "boot"}],
+                 [{"rule": "boot", "target": None}], [{"rule": "boot", "target": "[]"}],
+                 [{"rule": 1, "target": {}}], [{"rule": "boot", "target": {}, "credentials": []}]):
+        data = body if isinstance(body, str) else json.dumps(body)
+        req = client.post("/authz/oslo/bulk", data=data)
+        assert req.status_code == 400
+        assert get_json(req.data)["result"] is False
@@ -206,11 +206,11 @@ def set_env_variables():
 
 
 def get_pickled_context():
-    from python_moonutilities.security_functions import Context
+    from python_moonutilities.context import Context
     from python_moonutilities.cache import Cache
     CACHE = Cache()
     CACHE.update()
-    _context = Context(context(), CACHE)
+    _context = Context(CONTEXT, CACHE)
     _context.increment_index()
     _context.pdp_set['effect'] = 'grant'
     _context.pdp_set[os.environ['META_RULE_ID']]['effect'] = 'grant'
@@ -671,7 +671,7 @@ def set_consul_and_db(monkeypatch):
         )
         m.register_uri(
             'GET', 'http://interface-paltry:8080/authz/{}/{}/{}/{}'.format(
-                CONTEXT.get("project_id"),
+                "b3d3e18abf3340e8b635fd49e6634ccd",
                 CONTEXT.get("subject_name"),
                 CONTEXT.get("object_name"),
                 CONTEXT.get("action_name"),
@@ -0,0 +1,78 @@
+import pytest
+from python_moonutilities import exceptions
+
+
+class FakeCache:
+
+    def __init__(self):
+        self.updates = 0
+        self.containers = {
+            "pod1": [
+                {"name": "pipeline-paltry", "port": 8080, "genre": "interface",
+                 "keystone_project_id": "project1"},
+                {"name": "authz-economic", "port": 8081, "genre": "authz",
+                 "keystone_project_id": "project1"},
+            ]
+        }
+
+    def update(self):
+        self.updates += 1
+
+    def get_pdp_from_keystone_project(self, keystone_project_id):
+        return "pdp_" + keystone_project_id
+
+
+def test_get_interface():
+    from moon_wrapper.decisions import DecisionCache
+    cache = FakeCache()
+    decisions = DecisionCache()
+    assert decisions.get_interface(cache, "project1") == (
+        "pdp_project1", "http://pipeline-paltry:8080")
+    assert cache.updates == 0
+
+
+def test_get_interface_unknown_project():
+    from moon_wrapper.decisions import DecisionCache
+    cache = FakeCache()
+    decisions = DecisionCache(negative_ttl=60)
+    for _ in range(3):
+        with pytest.raises(exceptions.AuthzException):
+            decisions.get_interface(cache, "project2")
+    assert cache.updates == 1
+
+
+def test_unknown_projects_are_bounded():
+    from moon_wrapper.decisions import DecisionCache
+    cache = FakeCache()
+    decisions = DecisionCache(negative_ttl=60, max_decisions=2)
+    for project_id in ("project2", "project3", "project4"):
+        with pytest.raises(exceptions.AuthzException):
+            decisions.get_interface(cache, project_id)
+    assert len(decisions._DecisionCache__unknown) <= 2
+    decisions.configure(index_ttl=0)
+    decisions.get_interface(cache, "project1")
+    assert not decisions._DecisionCache__unknown
+
+
+def test_decision_cache():
+    from moon_wrapper.decisions import DecisionCache
+    decisions = DecisionCache()
+    key = ("project1", "testuser", "vm1", "boot")
+    decisions.set_decision(key, True)
+    assert decisions.get_decision(key) is None
+    decisions.configure(decision_ttl=60)
+    decisions.set_decision(key, True)
+    assert decisions.get_decision(key) is True
+    assert decisions.get_decision(("project1", "testuser", "vm2", "boot")) is None
+
+
+def test_session_per_thread():
+    import threading
+    from moon_wrapper.decisions import DecisionCache
+    decisions = DecisionCache()
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(decisions.session))
+    thread.start()
+    thread.join()
+    assert decisions.session is decisions.session
+    assert sessions[0] is not decisions.session
@@ -642,6 +642,80 @@ def delete_rule(policy_id, rule_id):
     assert not found_rule
 
 
+def import_policy(policy_id, document):
+    req = requests.post(URL.format("/policies/{}/import".format(policy_id)),
+                        json=document, headers=HEADERS)
+    logger.debug(req.text)
+    assert req.status_code == 200
+    result = req.json()
+    assert "import" in result
+    return result["import"]
+
+
+def __get_assignments(genre, assignments, categories):
+    result = []
+    for name, items in assignments.items():
+        if type(items) not in (list, tuple):
+            items = [items, ]
+        for item in items:
+            for category_name, data_name in item.items():
+                result.append({
+                    genre: name,
+                    "category_id": categories[category_name],
+                    "data": data_name
+                })
+    return result
+
+
+def get_policy_document(scenario):
+    """Build the document sent to the import endpoint from a scenario
+
+    The models must have been created before (see models.create_model)
+    so the scenario holds the IDs of the categories and meta rules.
+    """
+    templates = {
+        "subject": (subject_template, subject_data_template),
+        "object": (object_template, object_data_template),
+        "action": (action_template, action_data_template),
+    }
+    document = {}
+    for genre, (template, data_template) in templates.items():
+        categories = getattr(scenario, genre + "_categories")
+        scenario_data = getattr(scenario, genre + "_data")
+        document[genre + "_data"] = {
+            categories[category_name]: {
+                data_name: dict(data_template, name=data_name)
+                for data_name in scenario_data[category_name]
+            } for category_name in scenario_data
+        }
+        document[genre + "s"] = {
+            name: dict(template, name=name) for name in getattr(scenario, genre + "s")
+        }
+        document[genre + "_assignments"] = __get_assignments(
+            genre, getattr(scenario, genre + "_assignments"), categories)
+
+    document["rules"] = []
+    for meta_rule_name in scenario.rules:
+        meta_rule_value = scenario.meta_rule[meta_rule_name]
+        for rule in scenario.rules[meta_rule_name]:
+            # Note: the manager orders the items of a rule by subject, object and action categories
+            data_list = {"subject": [], "object": [], "action": []}
+            for category_name, data_name in zip(meta_rule_value["value"], rule["rule"]):
+                if category_name in scenario.subject_categories:
+                    data_list["subject"].append(data_name)
+                elif category_name in scenario.object_categories:
+                    data_list["object"].append(data_name)
+                elif category_name in scenario.action_categories:
+                    data_list["action"].append(data_name)
+            document["rules"].append({
+                "meta_rule_id": meta_rule_value["id"],
+                "rule": data_list["subject"] + data_list["object"] + data_list["action"],
+                "instructions": rule["instructions"],
+                "enabled": True
+            })
+    return document
+
+
 def create_policy(scenario, model_id, meta_rule_list):
     logger.info("Creating policy {}".format(scenario.policy_name))
     _policies = check_policy()
@@ -658,104 +732,18 @@ def create_policy(scenario, model_id, meta_rule_list):
         logger.debug("add_meta_rule_to_model {} {}".format(model_id, meta_rule_id))
         models.add_meta_rule_to_model(model_id, meta_rule_id)
 
-    logger.info("Add subject data")
-    for subject_cat_name in scenario.subject_data:
-        for subject_data_name in scenario.subject_data[subject_cat_name]:
-            data_id = scenario.subject_data[subject_cat_name][subject_data_name] = add_subject_data(
-                policy_id=policy_id,
-                category_id=scenario.subject_categories[subject_cat_name], name=subject_data_name)
-            scenario.subject_data[subject_cat_name][subject_data_name] = data_id
-    logger.info("Add object data")
-    for object_cat_name in scenario.object_data:
-        for object_data_name in scenario.object_data[object_cat_name]:
-            data_id = scenario.object_data[object_cat_name][object_data_name] = add_object_data(
-                policy_id=policy_id,
-                category_id=scenario.object_categories[object_cat_name], name=object_data_name)
-            scenario.object_data[object_cat_name][object_data_name] = data_id
-    logger.info("Add action data")
-    for action_cat_name in scenario.action_data:
-        for action_data_name in scenario.action_data[action_cat_name]:
-            data_id = scenario.action_data[action_cat_name][action_data_name] = add_action_data(
-                policy_id=policy_id,
-                category_id=scenario.action_categories[action_cat_name], name=action_data_name)
-            scenario.action_data[action_cat_name][action_data_name] = data_id
-
-    logger.info("Add subjects")
-    for name in scenario.subjects:
-        scenario.subjects[name] = add_subject(policy_id, name=name)
-    logger.info("Add objects")
-    for name in scenario.objects:
-        scenario.objects[name] = add_object(policy_id, name=name)
-    logger.info("Add actions")
-    for name in scenario.actions:
-        scenario.actions[name] = add_action(policy_id, name=name)
-
-    logger.info("Add subject assignments")
-    for subject_name in scenario.subject_assignments:
-        if type(scenario.subject_assignments[subject_name]) in (list, tuple):
-            for items in scenario.subject_assignments[subject_name]:
-                for subject_category_name in items:
-                    subject_id = scenario.subjects[subject_name]
-                    subject_cat_id = scenario.subject_categories[subject_category_name]
-                    for data in scenario.subject_assignments[subject_name]:
-                        subject_data_id = scenario.subject_data[subject_category_name][data[subject_category_name]]
-                        add_subject_assignments(policy_id, subject_id, subject_cat_id, subject_data_id)
-        else:
-            for subject_category_name in scenario.subject_assignments[subject_name]:
-                subject_id = scenario.subjects[subject_name]
-                subject_cat_id = scenario.subject_categories[subject_category_name]
-                subject_data_id = scenario.subject_data[subject_category_name][scenario.subject_assignments[subject_name][subject_category_name]]
-                add_subject_assignments(policy_id, subject_id, subject_cat_id, subject_data_id)
-
-    logger.info("Add object assignments")
-    for object_name in scenario.object_assignments:
-        if type(scenario.object_assignments[object_name]) in (list, tuple):
-            for items in scenario.object_assignments[object_name]:
-                for object_category_name in items:
-                    object_id = scenario.objects[object_name]
-                    object_cat_id = scenario.object_categories[object_category_name]
-                    for data in scenario.object_assignments[object_name]:
-                        object_data_id = scenario.object_data[object_category_name][data[object_category_name]]
-                        add_object_assignments(policy_id, object_id, object_cat_id, object_data_id)
-        else:
-            for object_category_name in scenario.object_assignments[object_name]:
-                object_id = scenario.objects[object_name]
-                object_cat_id = scenario.object_categories[object_category_name]
-                object_data_id = scenario.object_data[object_category_name][scenario.object_assignments[object_name][object_category_name]]
-                add_object_assignments(policy_id, object_id, object_cat_id, object_data_id)
-
-    logger.info("Add action assignments")
-    for action_name in scenario.action_assignments:
-        if type(scenario.action_assignments[action_name]) in (list, tuple):
-            for items in scenario.action_assignments[action_name]:
-                for action_category_name in items:
-                    action_id = scenario.actions[action_name]
-                    action_cat_id = scenario.action_categories[action_category_name]
-                    for data in scenario.action_assignments[action_name]:
-                        action_data_id = scenario.action_data[action_category_name][data[action_category_name]]
-                        add_action_assignments(policy_id, action_id, action_cat_id, action_data_id)
-        else:
-            for action_category_name in scenario.action_assignments[action_name]:
-                action_id = scenario.actions[action_name]
-                action_cat_id = scenario.action_categories[action_category_name]
-                action_data_id = scenario.action_data[action_category_name][scenario.action_assignments[action_name][action_category_name]]
-                add_action_assignments(policy_id, action_id, action_cat_id, action_data_id)
-
-    logger.info("Add rules")
-    for meta_rule_name in scenario.rules:
-        meta_rule_value = scenario.meta_rule[meta_rule_name]
-        for rule in scenario.rules[meta_rule_name]:
-            data_list = []
-            _meta_rule = list(meta_rule_value["value"])
-            for data_name in rule["rule"]:
-                category_name = _meta_rule.pop(0)
-                if category_name in scenario.subject_categories:
-                    data_list.append(scenario.subject_data[category_name][data_name])
-                elif category_name in scenario.object_categories:
-                    data_list.append(scenario.object_data[category_name][data_name])
-                elif category_name in scenario.action_categories:
-                    data_list.append(scenario.action_data[category_name][data_name])
-            instructions = rule["instructions"]
-            add_rule(policy_id, meta_rule_value["id"], data_list, instructions)
+    logger.info("Import data, perimeter, assignments and rules")
+    result = import_policy(policy_id, get_policy_document(scenario))
+    for genre in ("subject", "object", "action"):
+        scenario_data = getattr(scenario, genre + "_data")
+        categories = getattr(scenario, genre + "_categories")
+        for category_name in scenario_data:
+            for data_name in scenario_data[category_name]:
+                scenario_data[category_name][data_name] = \
+                    result[genre + "_data"][categories[category_name]][data_name]
+        perimeter = getattr(scenario, genre + "s")
+        for name in perimeter:
+            perimeter[name] = result[genre + "s"][name]
+    logger.info("{} rules added".format(result["rules"]))
     return policy_id
 
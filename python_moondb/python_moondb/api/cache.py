@@ -0,0 +1,66 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+
+import copy
+import logging
+import threading
+from functools import wraps
+
+logger = logging.getLogger("moon.db.api.cache")
+
+
+class QueryCache(object):
+    """Process-local read-through cache of the collections which rarely change
+
+    Each collection (policies, models, meta_rules, pdp) is kept with the
+    version it was read at. A single query on the versions tells if the
+    collections are still up to date, even when another process wrote them,
+    and the write methods of the managers drop the collections they change.
+    The callers get copies of the collections, so they can change them.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__collections = {}
+
+    def get(self, driver, loaders):
+        """Get collections, reading again those which have changed
+
+        :param driver: driver giving the versions of the collections
+        :param loaders: dictionary collection name => function reading the whole collection
+        :return: dictionary collection name => copy of the collection
+        """
+        versions = driver.get_versions(list(loaders.keys()))
+        results = {}
+        for key, loader in loaders.items():
+            version, value = self.__collections.get(key, (None, None))
+            if version != versions[key]:
+                logger.debug("Reading the {} collection".format(key))
+                value = loader()
+                with self.__lock:
+                    self.__collections[key] = (versions[key], value)
+            results[key] = copy.deepcopy(value)
+        return results
+
+    def invalidate(self, *keys):
+        with self.__lock:
+            for key in keys:
+                self.__collections.pop(key, None)
+
+
+query_cache = QueryCache()
+
+
+def invalidate(*keys):
+    """Decorator dropping collections from the cache once a write method returns"""
+    def wrapper_func(func):
+        @wraps(func)
+        def wrapper_args(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                query_cache.invalidate(*keys)
+        return wrapper_args
+    return wrapper_func
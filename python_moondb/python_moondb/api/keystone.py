@@ -6,6 +6,8 @@
 import os
 import requests
 import json
+import threading
+import time
 from uuid import uuid4
 import logging
 from python_moonutilities import exceptions, configuration
@@ -27,36 +29,79 @@ class KeystoneManager(Managers):
         self.__password = conf['password']
         self.__domain = conf['domain']
         self.__project = conf['project']
+        # Note: Keystone tokens last one hour by default, the token is renewed before
+        self.__token_ttl = conf.get('token_ttl', 3000)
+        self.__headers = None
+        self.__headers_expiration = 0
+        self.__lock = threading.Lock()
         try:
             os.environ.pop("http_proxy")
             os.environ.pop("https_proxy")
         except KeyError:
             pass
 
+    def __get_headers(self, renew=False):
+        """Get the headers holding the admin token shared by all the requests
+
+        :param renew: True if Keystone refused the current token
+        """
+        old_headers = None
+        with self.__lock:
+            if renew or not self.__headers or self.__headers_expiration < time.time():
+                old_headers = self.__headers
+                self.__headers = login()
+                self.__headers_expiration = time.time() + self.__token_ttl
+            headers = dict(self.__headers)
+        # Note: a token refused by Keystone does not need to be revoked
+        if old_headers and not renew:
+            self.__logout(old_headers)
+        return headers
+
+    @staticmethod
+    def __logout(headers):
+        try:
+            logout(dict(headers))
+        except Exception as e:
+            logger.warning("Cannot revoke the admin token ({})".format(e))
+
+    def __request(self, method, endpoint, **kwargs):
+        req = method("{}{}".format(self.__url, endpoint), headers=self.__get_headers(), verify=False, **kwargs)
+        if req.status_code == 401:
+            logger.info("The admin token has been refused, renewing it")
+            req = method("{}{}".format(self.__url, endpoint), headers=self.__get_headers(renew=True),
+                         verify=False, **kwargs)
+        return req
+
+    def close(self):
+        """Revoke the admin token, called by core.dispose"""
+        with self.__lock:
+            headers = self.__headers
+            self.__headers = None
+        if headers:
+            self.__logout(headers)
+
     def __get(self, endpoint, _exception=exceptions.KeystoneError):
-        _headers = login()
-        req = requests.get("{}{}".format(self.__url, endpoint), headers=_headers, verify=False)
+        req = self.__request(requests.get, endpoint)
         if req.status_code not in (200, 201):
             logger.error(req.text)
             raise _exception
-        data = req.json()
-        logout(_headers)
-        return data
+        return req.json()
 
     def __post(self, endpoint, data=None, _exception=exceptions.KeystoneError):
-        _headers = login()
-        req = requests.post("{}{}".format(self.__url, endpoint),
-                            data=json.dumps(data),
-                            headers=_headers, verify=False)
+        req = self.__request(requests.post, endpoint, data=json.dumps(data))
         if req.status_code == 409:
             logger.warning(req.text)
             raise exceptions.KeystoneUserConflict
         if req.status_code not in (200, 201):
             logger.error(req.text)
             raise _exception
-        data = req.json()
-        logout(_headers)
-        return data
+        return req.json()
+
+    def __delete(self, endpoint, _exception=exceptions.KeystoneError):
+        req = self.__request(requests.delete, endpoint)
+        if req.status_code not in (200, 204, 404):
+            logger.error(req.text)
+            raise _exception
 
     def list_projects(self):
         return self.__get(endpoint="/projects/", _exception=exceptions.KeystoneProjectError)
@@ -104,3 +149,34 @@ class KeystoneManager(Managers):
         except exceptions.KeystoneUserConflict:
             return True
 
+    def delete_user(self, user_id):
+        self.__delete(endpoint="/users/{}".format(user_id), _exception=exceptions.KeystoneUserError)
+
+    def ensure_users(self, subjects, domain_id="default", created=None):
+        """Get the Keystone users of several subjects, creating the missing ones
+
+        The users of the domain are listed once, only the missing users are
+        requested one by one.
+
+        :param subjects: list of subject values with their name
+        :param created: if given, list to which the names of the users created are appended
+        :return: a dictionary name => Keystone user
+        """
+        users = self.__get(endpoint="/users?domain_id={}".format(domain_id),
+                           _exception=exceptions.KeystoneUserError)
+        users = {_user["name"]: _user for _user in users.get("users", [])}
+        for subject in subjects:
+            name = subject.get("name")
+            if name in users:
+                continue
+            k_user = self.create_user(subject)
+            if k_user is True:
+                # Note: the user has been created since the users were listed
+                k_user = self.get_user_by_name(name)
+            elif created is not None:
+                created.append(name)
+            if "user" in k_user:
+                users[name] = k_user["user"]
+            elif k_user.get("users"):
+                users[name] = k_user["users"][0]
+        return users
@@ -4,9 +4,23 @@
 # or at 'http://www.apache.org/licenses/LICENSE-2.0'.
 
 import logging
+from functools import wraps
 logger = logging.getLogger("moon.db.api.managers")
 
 
+def operation(func):
+    """Decorator running the driver calls of a manager method in one session
+
+    The existence checks and the write of the method then use the same
+    connection and transaction.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self.driver.operation():
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
 class Managers(object):
     """Object that links managers together"""
     ModelManager = None
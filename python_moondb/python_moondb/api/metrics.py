@@ -0,0 +1,97 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+
+import inspect
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from python_moonutilities import configuration
+
+logger = logging.getLogger("moon.db.api.metrics")
+
+
+class Metrics(object):
+    """Process-local counters of the database statements issued by the manager methods
+
+    The driver reports each statement it runs, it is counted for the
+    outermost manager method running in the thread. A call issuing more
+    statements than the max_statements key of the database configuration
+    (default 50, 0 to disable) is logged as a warning, it usually reads
+    in a loop what one query could read.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__calls = threading.local()
+        self.__metrics = {}
+        conf = configuration.get_configuration("database")['database']
+        self.max_statements = conf.get("max_statements", 50)
+
+    @contextmanager
+    def measure(self, name):
+        """Count the statements run by the thread in the block for the method name"""
+        if getattr(self.__calls, "current", None) is not None:
+            yield
+            return
+        call = self.__calls.current = {"statements": 0, "duration": 0.0}
+        try:
+            yield
+        finally:
+            self.__calls.current = None
+            self.__record(name, call)
+
+    def add_statement(self, duration):
+        """Count a statement which took duration seconds"""
+        call = getattr(self.__calls, "current", None)
+        if call is not None:
+            call["statements"] += 1
+            call["duration"] += duration
+
+    def __record(self, name, call):
+        with self.__lock:
+            metric = self.__metrics.setdefault(name, {
+                "calls": 0, "statements": 0, "duration": 0.0, "max_statements": 0})
+            metric["calls"] += 1
+            metric["statements"] += call["statements"]
+            metric["duration"] += call["duration"]
+            metric["max_statements"] = max(metric["max_statements"], call["statements"])
+        if self.max_statements and call["statements"] > self.max_statements:
+            logger.warning("{} issued {} statements in {:.3f}s, more than {}".format(
+                name, call["statements"], call["duration"], self.max_statements))
+
+    def get(self):
+        """Get the metrics of each method name
+
+        :return: dictionary name => {"calls", "statements", "duration", "max_statements"}
+        """
+        with self.__lock:
+            return {name: dict(metric) for name, metric in self.__metrics.items()}
+
+    def reset(self):
+        with self.__lock:
+            self.__metrics = {}
+
+
+metrics = Metrics()
+
+
+def measured(name):
+    """Decorator counting the statements of a method under name"""
+    def wrapper_func(func):
+        @wraps(func)
+        def wrapper_args(*args, **kwargs):
+            with metrics.measure(name):
+                return func(*args, **kwargs)
+        return wrapper_args
+    return wrapper_func
+
+
+def instrumented(cls):
+    """Class decorator counting the statements of the public methods of a manager"""
+    for name, func in list(vars(cls).items()):
+        if inspect.isfunction(func) and not name.startswith("_"):
+            setattr(cls, name, measured("{}.{}".format(cls.__name__, name))(func))
+    return cls
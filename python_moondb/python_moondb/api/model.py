@@ -7,12 +7,15 @@ from uuid import uuid4
 import logging
 from python_moonutilities import exceptions
 from python_moonutilities.security_functions import filter_input, enforce
-from python_moondb.api.managers import Managers
+from python_moondb.api.managers import Managers, operation
+from python_moondb.api.cache import invalidate
+from python_moondb.api.metrics import instrumented
 
 
 logger = logging.getLogger("moon.db.api.model")
 
 
+@instrumented
 class ModelManager(Managers):
 
     def __init__(self, connector=None):
@@ -20,19 +23,28 @@ class ModelManager(Managers):
         Managers.ModelManager = self
 
     @enforce(("read", "write"), "models")
+    @invalidate("models")
+    @operation
     def update_model(self, user_id, model_id, value):
         if model_id not in self.driver.get_models(model_id=model_id):
             raise exceptions.ModelUnknown
         return self.driver.update_model(model_id=model_id, value=value)
 
     @enforce(("read", "write"), "models")
+    @invalidate("models", "meta_rules", "policies", "pdp")
+    @operation
     def delete_model(self, user_id, model_id):
+        """Delete a model with the policies of that model and its meta rules
+
+        A meta rule used by another model is kept.
+        """
         if model_id not in self.driver.get_models(model_id=model_id):
             raise exceptions.ModelUnknown
-        # TODO (asteroide): check that no policy is connected to this model
         return self.driver.delete_model(model_id=model_id)
 
     @enforce(("read", "write"), "models")
+    @invalidate("models")
+    @operation
     def add_model(self, user_id, model_id=None, value=None):
         if model_id in self.driver.get_models(model_id=model_id):
             raise exceptions.ModelExisting
@@ -44,7 +56,14 @@ class ModelManager(Managers):
     def get_models(self, user_id, model_id=None):
         return self.driver.get_models(model_id=model_id)
 
+    @enforce("read", "models")
+    def get_models_version(self, user_id):
+        """Get a version of the models which changes on every write"""
+        return self.driver.get_version("models")
+
     @enforce(("read", "write"), "meta_rules")
+    @invalidate("meta_rules")
+    @operation
     def set_meta_rule(self, user_id, meta_rule_id, value):
         if meta_rule_id not in self.driver.get_meta_rules(meta_rule_id=meta_rule_id):
             raise exceptions.MetaRuleUnknown
@@ -54,7 +73,14 @@ class ModelManager(Managers):
     def get_meta_rules(self, user_id, meta_rule_id=None):
         return self.driver.get_meta_rules(meta_rule_id=meta_rule_id)
 
+    @enforce("read", "meta_rules")
+    def get_meta_rules_version(self, user_id):
+        """Get a version of the meta rules which changes on every write"""
+        return self.driver.get_version("meta_rules")
+
     @enforce(("read", "write"), "meta_rules")
+    @invalidate("meta_rules")
+    @operation
     def add_meta_rule(self, user_id, meta_rule_id=None, value=None):
         if meta_rule_id in self.driver.get_meta_rules(meta_rule_id=meta_rule_id):
             raise exceptions.MetaRuleExisting
@@ -64,10 +90,12 @@ class ModelManager(Managers):
         return self.driver.set_meta_rule(meta_rule_id=meta_rule_id, value=value)
 
     @enforce(("read", "write"), "meta_rules")
+    @invalidate("meta_rules")
+    @operation
     def delete_meta_rule(self, user_id, meta_rule_id=None):
         if meta_rule_id not in self.driver.get_meta_rules(meta_rule_id=meta_rule_id):
             raise exceptions.MetaRuleUnknown
-        # TODO (asteroide): check and/or delete data and assignments and rules linked to that meta_rule
+        # Note: the rules of that meta rule are deleted with it
         return self.driver.delete_meta_rule(meta_rule_id=meta_rule_id)
 
     @enforce("read", "meta_data")
@@ -75,6 +103,7 @@ class ModelManager(Managers):
         return self.driver.get_subject_categories(category_id=category_id)
 
     @enforce(("read", "write"), "meta_data")
+    @operation
     def add_subject_category(self, user_id, category_id=None, value=None):
         if category_id in self.driver.get_subject_categories(category_id=category_id):
             raise exceptions.SubjectCategoryExisting
@@ -83,6 +112,7 @@ class ModelManager(Managers):
         return self.driver.add_subject_category(name=value["name"], description=value["description"], uuid=category_id)
 
     @enforce(("read", "write"), "meta_data")
+    @operation
     def delete_subject_category(self, user_id, category_id):
         # TODO (asteroide): delete all data linked to that category
         # TODO (asteroide): delete all meta_rules linked to that category
@@ -95,6 +125,7 @@ class ModelManager(Managers):
         return self.driver.get_object_categories(category_id)
 
     @enforce(("read", "write"), "meta_data")
+    @operation
     def add_object_category(self, user_id, category_id=None, value=None):
         if category_id in self.driver.get_object_categories(category_id=category_id):
             raise exceptions.ObjectCategoryExisting
@@ -103,6 +134,7 @@ class ModelManager(Managers):
         return self.driver.add_object_category(name=value["name"], description=value["description"], uuid=category_id)
 
     @enforce(("read", "write"), "meta_data")
+    @operation
     def delete_object_category(self, user_id, category_id):
         # TODO (asteroide): delete all data linked to that category
         # TODO (asteroide): delete all meta_rules linked to that category
@@ -115,6 +147,7 @@ class ModelManager(Managers):
         return self.driver.get_action_categories(category_id=category_id)
 
     @enforce(("read", "write"), "meta_data")
+    @operation
     def add_action_category(self, user_id, category_id=None, value=None):
         if category_id in self.driver.get_action_categories(category_id=category_id):
             raise exceptions.ActionCategoryExisting
@@ -123,6 +156,7 @@ class ModelManager(Managers):
         return self.driver.add_action_category(name=value["name"], description=value["description"], uuid=category_id)
 
     @enforce(("read", "write"), "meta_data")
+    @operation
     def delete_action_category(self, user_id, category_id):
         # TODO (asteroide): delete all data linked to that category
         # TODO (asteroide): delete all meta_rules linked to that category
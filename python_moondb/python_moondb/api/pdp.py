@@ -6,12 +6,15 @@
 from uuid import uuid4
 import logging
 from python_moonutilities.security_functions import enforce
-from python_moondb.api.managers import Managers
+from python_moondb.api.managers import Managers, operation
+from python_moondb.api.cache import invalidate
+from python_moondb.api.metrics import instrumented
 from python_moonutilities import exceptions
 
 logger = logging.getLogger("moon.db.api.pdp")
 
 
+@instrumented
 class PDPManager(Managers):
 
     def __init__(self, connector=None):
@@ -19,18 +22,24 @@ class PDPManager(Managers):
         Managers.PDPManager = self
 
     @enforce(("read", "write"), "pdp")
+    @invalidate("pdp")
+    @operation
     def update_pdp(self, user_id, pdp_id, value):
         if pdp_id not in self.driver.get_pdp(pdp_id=pdp_id):
             raise exceptions.PdpUnknown
         return self.driver.update_pdp(pdp_id=pdp_id, value=value)
 
     @enforce(("read", "write"), "pdp")
+    @invalidate("pdp")
+    @operation
     def delete_pdp(self, user_id, pdp_id):
         if pdp_id not in self.driver.get_pdp(pdp_id=pdp_id):
             raise exceptions.PdpUnknown
         return self.driver.delete_pdp(pdp_id=pdp_id)
 
     @enforce(("read", "write"), "pdp")
+    @invalidate("pdp")
+    @operation
     def add_pdp(self, user_id, pdp_id=None, value=None):
         if pdp_id in self.driver.get_pdp(pdp_id=pdp_id):
             raise exceptions.PdpExisting
@@ -41,3 +50,34 @@ class PDPManager(Managers):
     @enforce("read", "pdp")
     def get_pdp(self, user_id, pdp_id=None):
         return self.driver.get_pdp(pdp_id=pdp_id)
+
+    @enforce("read", "pdp")
+    def get_pdp_version(self, user_id):
+        """Get a version of the PDP which changes on every write"""
+        return self.driver.get_version("pdp")
+
+    @enforce("read", "pdp")
+    def get_jobs(self, user_id, job_id=None):
+        return self.driver.get_jobs(job_id=job_id)
+
+    @enforce(("read", "write"), "pdp")
+    def add_job(self, user_id, job_id=None, value=None):
+        """Record a background job provisioning or tearing down the pods of a PDP
+
+        :param value: {"name", "pdp_id", "status", "error", "created", "updated"}
+        """
+        if not job_id:
+            job_id = uuid4().hex
+        return self.driver.add_job(job_id=job_id, value=value)
+
+    @enforce(("read", "write"), "pdp")
+    def update_job(self, user_id, job_id, value):
+        return self.driver.update_job(job_id=job_id, value=value)
+
+    @enforce(("read", "write"), "pdp")
+    def delete_jobs(self, user_id, job_ids):
+        """Delete several jobs
+
+        :return: the number of jobs deleted
+        """
+        return self.driver.delete_jobs(job_ids=job_ids)
@@ -6,22 +6,36 @@
 from uuid import uuid4
 import logging
 from python_moonutilities.security_functions import enforce
-from python_moondb.api.managers import Managers
+from python_moondb.api.managers import Managers, operation
+from python_moondb.api.cache import invalidate, query_cache
+from python_moondb.api.metrics import instrumented
 from python_moonutilities import exceptions
 
 logger = logging.getLogger("moon.db.api.policy")
 
 
+@instrumented
 class PolicyManager(Managers):
 
     def __init__(self, connector=None):
         self.driver = connector.driver
         Managers.PolicyManager = self
 
+    def __get_collections(self, *keys):
+        """Get whole collections through the process-local cache"""
+        loaders = {
+            "policies": self.driver.get_policies,
+            "models": Managers.ModelManager.driver.get_models,
+            "meta_rules": Managers.ModelManager.driver.get_meta_rules,
+            "pdp": Managers.PDPManager.driver.get_pdp,
+        }
+        return query_cache.get(self.driver, {key: loaders[key] for key in keys})
+
     def get_policy_from_meta_rules(self, user_id, meta_rule_id):
-        policies = self.PolicyManager.get_policies("admin")
-        models = self.ModelManager.get_models("admin")
-        for pdp_key, pdp_value in self.PDPManager.get_pdp(user_id).items():
+        collections = self.__get_collections("policies", "models", "pdp")
+        policies = collections["policies"]
+        models = collections["models"]
+        for pdp_key, pdp_value in collections["pdp"].items():
             for policy_id in pdp_value["security_pipeline"]:
                 if not policies:
                     raise exceptions.PolicyUnknown
@@ -32,19 +46,28 @@ class PolicyManager(Managers):
                     return policy_id
 
     @enforce(("read", "write"), "policies")
+    @invalidate("policies")
+    @operation
     def update_policy(self, user_id, policy_id, value):
         if policy_id not in self.driver.get_policies(policy_id=policy_id):
             raise exceptions.PolicyUnknown
         return self.driver.update_policy(policy_id=policy_id, value=value)
 
     @enforce(("read", "write"), "policies")
+    @invalidate("policies", "pdp")
+    @operation
     def delete_policy(self, user_id, policy_id):
-        # TODO (asteroide): unmap PDP linked to that policy
+        """Delete a policy with its data, perimeter, assignments and rules
+
+        The policy is also removed from the security pipeline of the PDPs.
+        """
         if policy_id not in self.driver.get_policies(policy_id=policy_id):
             raise exceptions.PolicyUnknown
         return self.driver.delete_policy(policy_id=policy_id)
 
     @enforce(("read", "write"), "policies")
+    @invalidate("policies")
+    @operation
     def add_policy(self, user_id, policy_id=None, value=None):
         if policy_id in self.driver.get_policies(policy_id=policy_id):
             raise exceptions.PolicyExisting
@@ -56,12 +79,27 @@ class PolicyManager(Managers):
     def get_policies(self, user_id, policy_id=None):
         return self.driver.get_policies(policy_id=policy_id)
 
+    @enforce("read", "policies")
+    def get_policies_version(self, user_id):
+        """Get a version of the policies which changes on every write"""
+        return self.driver.get_version("policies")
+
     @enforce("read", "perimeter")
-    def get_subjects(self, user_id, policy_id, perimeter_id=None):
-        return self.driver.get_subjects(policy_id=policy_id, perimeter_id=perimeter_id)
+    def get_subjects(self, user_id, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        return self.driver.get_subjects(policy_id=policy_id, perimeter_id=perimeter_id, name=name,
+                                        ids=ids, limit=limit, marker=marker)
 
     @enforce(("read", "write"), "perimeter")
     def add_subject(self, user_id, policy_id, perimeter_id=None, value=None):
+        perimeter_id = self.__set_keystone_user(perimeter_id, value)
+        return self.driver.set_subject(policy_id=policy_id, perimeter_id=perimeter_id, value=value)
+
+    @staticmethod
+    def __set_keystone_user(perimeter_id, value):
+        """Get or create the Keystone user of a subject and update its value
+
+        :return: the perimeter ID of the subject
+        """
         k_user = Managers.KeystoneManager.get_user_by_name(value.get('name'))
         if not k_user['users']:
             k_user = Managers.KeystoneManager.create_user(value)
@@ -78,15 +116,34 @@ class PolicyManager(Managers):
                     value.get('name'))
                 perimeter_id = uuid4().hex
         value.update(k_user['users'][0])
-        return self.driver.set_subject(policy_id=policy_id, perimeter_id=perimeter_id, value=value)
+        return perimeter_id
 
     @enforce(("read", "write"), "perimeter")
     def delete_subject(self, user_id, policy_id, perimeter_id):
         return self.driver.delete_subject(policy_id=policy_id, perimeter_id=perimeter_id)
 
+    @enforce(("read", "write"), "perimeter")
+    def add_subjects(self, user_id, policy_id, values):
+        """Add several subjects to a policy in one transaction
+
+        The subjects without an ID get the one of their Keystone user, the
+        Keystone users are listed only once and the missing ones created.
+
+        :param values: list of subject values with their name and an optional "id"
+        :return: list of {"id": perimeter ID, "added": False if the subject already existed}
+        """
+        values = [dict(value) for value in values]
+        missing_ids = [value for value in values if not value.get("id")]
+        if missing_ids:
+            k_users = Managers.KeystoneManager.ensure_users(missing_ids)
+            for value in missing_ids:
+                value.update(k_users.get(value.get("name"), {}))
+        return self.driver.set_subjects(policy_id=policy_id, values=values)
+
     @enforce("read", "perimeter")
-    def get_objects(self, user_id, policy_id, perimeter_id=None):
-        return self.driver.get_objects(policy_id=policy_id, perimeter_id=perimeter_id)
+    def get_objects(self, user_id, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        return self.driver.get_objects(policy_id=policy_id, perimeter_id=perimeter_id, name=name,
+                                       ids=ids, limit=limit, marker=marker)
 
     @enforce(("read", "write"), "perimeter")
     def add_object(self, user_id, policy_id, perimeter_id=None, value=None):
@@ -98,9 +155,14 @@ class PolicyManager(Managers):
     def delete_object(self, user_id, policy_id, perimeter_id):
         return self.driver.delete_object(policy_id=policy_id, perimeter_id=perimeter_id)
 
+    @enforce(("read", "write"), "perimeter")
+    def add_objects(self, user_id, policy_id, values):
+        return self.driver.set_objects(policy_id=policy_id, values=values)
+
     @enforce("read", "perimeter")
-    def get_actions(self, user_id, policy_id, perimeter_id=None):
-        return self.driver.get_actions(policy_id=policy_id, perimeter_id=perimeter_id)
+    def get_actions(self, user_id, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        return self.driver.get_actions(policy_id=policy_id, perimeter_id=perimeter_id, name=name,
+                                       ids=ids, limit=limit, marker=marker)
 
     @enforce(("read", "write"), "perimeter")
     def add_action(self, user_id, policy_id, perimeter_id=None, value=None):
@@ -112,6 +174,10 @@ class PolicyManager(Managers):
     def delete_action(self, user_id, policy_id, perimeter_id):
         return self.driver.delete_action(policy_id=policy_id, perimeter_id=perimeter_id)
 
+    @enforce(("read", "write"), "perimeter")
+    def add_actions(self, user_id, policy_id, values):
+        return self.driver.set_actions(policy_id=policy_id, values=values)
+
     @enforce("read", "data")
     def get_subject_data(self, user_id, policy_id, data_id=None, category_id=None):
         available_metadata = self.get_available_metadata(user_id, policy_id)
@@ -136,6 +202,15 @@ class PolicyManager(Managers):
         # TODO (asteroide): check and/or delete assignments linked to that data
         return self.driver.delete_subject_data(policy_id=policy_id, data_id=data_id)
 
+    @enforce(("read", "write"), "data")
+    def add_subject_data_list(self, user_id, policy_id, category_id, values):
+        """Add several data to a category of a policy in one transaction
+
+        :param values: list of data values with their name and an optional "id"
+        :return: list of {"id": data ID, "added": False if the data already existed}
+        """
+        return self.driver.set_subject_data_list(policy_id=policy_id, category_id=category_id, values=values)
+
     @enforce("read", "data")
     def get_object_data(self, user_id, policy_id, data_id=None, category_id=None):
         available_metadata = self.get_available_metadata(user_id, policy_id)
@@ -160,6 +235,10 @@ class PolicyManager(Managers):
         # TODO (asteroide): check and/or delete assignments linked to that data
         return self.driver.delete_object_data(policy_id=policy_id, data_id=data_id)
 
+    @enforce(("read", "write"), "data")
+    def add_object_data_list(self, user_id, policy_id, category_id, values):
+        return self.driver.set_object_data_list(policy_id=policy_id, category_id=category_id, values=values)
+
     @enforce("read", "data")
     def get_action_data(self, user_id, policy_id, data_id=None, category_id=None):
         available_metadata = self.get_available_metadata(user_id, policy_id)
@@ -184,9 +263,22 @@ class PolicyManager(Managers):
         # TODO (asteroide): check and/or delete assignments linked to that data
         return self.driver.delete_action_data(policy_id=policy_id, data_id=data_id)
 
+    @enforce(("read", "write"), "data")
+    def add_action_data_list(self, user_id, policy_id, category_id, values):
+        return self.driver.set_action_data_list(policy_id=policy_id, category_id=category_id, values=values)
+
+    @staticmethod
+    def __check_assignments(perimeter_key, assignments):
+        for assignment in assignments:
+            for key in (perimeter_key, "category_id", "data_id"):
+                if not assignment.get(key):
+                    raise exceptions.AdminAssignment("Missing {} in assignment {}".format(key, assignment))
+
     @enforce("read", "assignments")
-    def get_subject_assignments(self, user_id, policy_id, subject_id=None, category_id=None):
-        return self.driver.get_subject_assignments(policy_id=policy_id, subject_id=subject_id, category_id=category_id)
+    def get_subject_assignments(self, user_id, policy_id, subject_id=None, category_id=None, data_id=None,
+                                ids=None, limit=None, marker=None):
+        return self.driver.get_subject_assignments(policy_id=policy_id, subject_id=subject_id, category_id=category_id,
+                                                   data_id=data_id, ids=ids, limit=limit, marker=marker)
 
     @enforce(("read", "write"), "assignments")
     def add_subject_assignment(self, user_id, policy_id, subject_id, category_id, data_id):
@@ -198,9 +290,31 @@ class PolicyManager(Managers):
         return self.driver.delete_subject_assignment(policy_id=policy_id, subject_id=subject_id,
                                                      category_id=category_id, data_id=data_id)
 
+    @enforce(("read", "write"), "assignments")
+    def add_subject_assignments(self, user_id, policy_id, assignments):
+        """Assign several data to subjects of a policy in one transaction
+
+        :param assignments: list of {"subject_id", "category_id", "data_id"}
+        :return: list of {"id": assignment ID, "added": False if the data was already assigned}
+        """
+        self.__check_assignments("subject_id", assignments)
+        return self.driver.add_subject_assignments(policy_id=policy_id, assignments=assignments)
+
+    @enforce(("read", "write"), "assignments")
+    def delete_subject_assignments(self, user_id, policy_id, assignments):
+        """Remove several data from the assignments of subjects of a policy in one transaction
+
+        :param assignments: list of {"subject_id", "category_id", "data_id"}
+        :return: list of {"deleted": False if the data was not assigned}
+        """
+        self.__check_assignments("subject_id", assignments)
+        return self.driver.delete_subject_assignments(policy_id=policy_id, assignments=assignments)
+
     @enforce("read", "assignments")
-    def get_object_assignments(self, user_id, policy_id, object_id=None, category_id=None):
-        return self.driver.get_object_assignments(policy_id=policy_id, object_id=object_id, category_id=category_id)
+    def get_object_assignments(self, user_id, policy_id, object_id=None, category_id=None, data_id=None,
+                               ids=None, limit=None, marker=None):
+        return self.driver.get_object_assignments(policy_id=policy_id, object_id=object_id, category_id=category_id,
+                                                  data_id=data_id, ids=ids, limit=limit, marker=marker)
 
     @enforce(("read", "write"), "assignments")
     def add_object_assignment(self, user_id, policy_id, object_id, category_id, data_id):
@@ -212,9 +326,21 @@ class PolicyManager(Managers):
         return self.driver.delete_object_assignment(policy_id=policy_id, object_id=object_id,
                                                     category_id=category_id, data_id=data_id)
 
+    @enforce(("read", "write"), "assignments")
+    def add_object_assignments(self, user_id, policy_id, assignments):
+        self.__check_assignments("object_id", assignments)
+        return self.driver.add_object_assignments(policy_id=policy_id, assignments=assignments)
+
+    @enforce(("read", "write"), "assignments")
+    def delete_object_assignments(self, user_id, policy_id, assignments):
+        self.__check_assignments("object_id", assignments)
+        return self.driver.delete_object_assignments(policy_id=policy_id, assignments=assignments)
+
     @enforce("read", "assignments")
-    def get_action_assignments(self, user_id, policy_id, action_id=None, category_id=None):
-        return self.driver.get_action_assignments(policy_id=policy_id, action_id=action_id, category_id=category_id)
+    def get_action_assignments(self, user_id, policy_id, action_id=None, category_id=None, data_id=None,
+                               ids=None, limit=None, marker=None):
+        return self.driver.get_action_assignments(policy_id=policy_id, action_id=action_id, category_id=category_id,
+                                                  data_id=data_id, ids=ids, limit=limit, marker=marker)
 
     @enforce(("read", "write"), "assignments")
     def add_action_assignment(self, user_id, policy_id, action_id, category_id, data_id):
@@ -226,18 +352,124 @@ class PolicyManager(Managers):
         return self.driver.delete_action_assignment(policy_id=policy_id, action_id=action_id,
                                                     category_id=category_id, data_id=data_id)
 
+    @enforce(("read", "write"), "assignments")
+    def add_action_assignments(self, user_id, policy_id, assignments):
+        self.__check_assignments("action_id", assignments)
+        return self.driver.add_action_assignments(policy_id=policy_id, assignments=assignments)
+
+    @enforce(("read", "write"), "assignments")
+    def delete_action_assignments(self, user_id, policy_id, assignments):
+        self.__check_assignments("action_id", assignments)
+        return self.driver.delete_action_assignments(policy_id=policy_id, assignments=assignments)
+
+    @enforce("read", "rules")
+    def get_rules(self, user_id, policy_id, meta_rule_id=None, rule_id=None, ids=None, limit=None, marker=None):
+        return self.driver.get_rules(policy_id=policy_id, meta_rule_id=meta_rule_id, rule_id=rule_id,
+                                     ids=ids, limit=limit, marker=marker)
+
     @enforce("read", "rules")
-    def get_rules(self, user_id, policy_id, meta_rule_id=None, rule_id=None):
-        return self.driver.get_rules(policy_id=policy_id, meta_rule_id=meta_rule_id, rule_id=rule_id)
+    def get_rules_version(self, user_id, policy_id):
+        """Get a version of the rules of a policy which changes on every write"""
+        return self.driver.get_version("rules:{}".format(policy_id))
 
     @enforce(("read", "write"), "rules")
     def add_rule(self, user_id, policy_id, meta_rule_id, value):
         return self.driver.add_rule(policy_id=policy_id, meta_rule_id=meta_rule_id, value=value)
 
+    @enforce(("read", "write"), "rules")
+    def add_rules(self, user_id, policy_id, values):
+        """Add several rules to a policy, the rules already in the policy are skipped
+
+        :param values: list of rules with their meta_rule_id
+        :return: list of {"id": rule ID, "added": False if the rule already existed}
+        """
+        for value in values:
+            if not value.get("meta_rule_id"):
+                raise exceptions.MetaRuleUnknown("Missing meta_rule_id in rule {}".format(value.get("rule")))
+        return self.driver.add_rules(policy_id=policy_id, values=values)
+
     @enforce(("read", "write"), "rules")
     def delete_rule(self, user_id, policy_id, rule_id):
         return self.driver.delete_rule(policy_id=policy_id, rule_id=rule_id)
 
+    @enforce(("read", "write"), "rules")
+    def delete_rules(self, user_id, policy_id, rule_ids):
+        return self.driver.delete_rules(policy_id=policy_id, rule_ids=rule_ids)
+
+    @staticmethod
+    def __get_items(items):
+        """Get a dictionary name => value from a list of names or a dictionary"""
+        if isinstance(items, (list, tuple)):
+            items = {name: {} for name in items}
+        return {name: dict(item or {}, name=name) for name, item in items.items()}
+
+    @enforce(("read", "write"), "policies")
+    def import_policy(self, user_id, policy_id, value):
+        """Add data, perimeter, assignments and rules to a policy in one transaction
+
+        Subjects which are not already in the database are created in Keystone
+        before the transaction starts, the Keystone users are listed only once.
+        The users created are deleted if the transaction is rolled back.
+        """
+        if policy_id not in self.driver.get_policies(policy_id=policy_id):
+            raise exceptions.PolicyUnknown
+        value = dict(value)
+        for genre in ("subject", "object", "action"):
+            value[genre + "s"] = self.__get_items(value.get(genre + "s", {}))
+            value[genre + "_data"] = {
+                category_id: self.__get_items(items)
+                for category_id, items in value.get(genre + "_data", {}).items()}
+        existing_subjects = self.driver.get_subjects_by_names(list(value["subjects"].keys()))
+        missing_subjects = {name: item for name, item in value["subjects"].items()
+                            if name not in existing_subjects}
+        created_users = {}
+        if missing_subjects:
+            created = []
+            k_users = Managers.KeystoneManager.ensure_users(list(missing_subjects.values()), created=created)
+            created_users = {name: k_users[name]["id"] for name in created if k_users.get(name, {}).get("id")}
+            for name, item in missing_subjects.items():
+                k_user = k_users.get(name, {})
+                perimeter_id = item.get("id") or k_user.get("id") or uuid4().hex
+                item.update(k_user)
+                item["id"] = perimeter_id
+        try:
+            return self.driver.import_policy(policy_id=policy_id, value=value)
+        except Exception:
+            for name, k_user_id in created_users.items():
+                try:
+                    Managers.KeystoneManager.delete_user(k_user_id)
+                except Exception as e:
+                    logger.error("Cannot delete the Keystone user {} of {}: {}".format(k_user_id, name, e))
+            raise
+
+    @enforce(("read", "write"), "policies")
+    @invalidate("policies", "pdp")
+    @operation
+    def clone_policy(self, user_id, policy_id, new_policy_id=None, value=None, pdp_id=None, pdp_value=None):
+        """Copy a policy with its data, perimeter, assignments and rules in one transaction
+
+        :param value: attributes of the new policy overriding the ones of the copied policy
+        :param pdp_value: if given, a PDP is created with the new policy as security pipeline
+        :return: {"policies": {new_policy_id: {...}}, "pdp": {pdp_id: {...}} or {}}
+        """
+        policies = self.driver.get_policies(policy_id=policy_id)
+        if policy_id not in policies:
+            raise exceptions.PolicyUnknown
+        if new_policy_id and new_policy_id in self.driver.get_policies(policy_id=new_policy_id):
+            raise exceptions.PolicyExisting
+        if not new_policy_id:
+            new_policy_id = uuid4().hex
+        new_value = dict(policies[policy_id])
+        new_value.update(value or {})
+        if pdp_value is not None:
+            if not pdp_id:
+                pdp_id = uuid4().hex
+            pdp_value = dict(pdp_value, security_pipeline=[new_policy_id, ])
+        else:
+            pdp_id = None
+        return self.driver.clone_policy(policy_id=policy_id, new_policy_id=new_policy_id, value=new_value,
+                                        pdp_id=pdp_id, pdp_value=pdp_value)
+
     @enforce("read", "meta_data")
     def get_available_metadata(self, user_id, policy_id):
         categories = {
@@ -245,15 +477,15 @@ class PolicyManager(Managers):
             "object": [],
             "action": []
         }
-        policy = self.driver.get_policies(policy_id=policy_id)
-        if not policy:
+        collections = self.__get_collections("policies", "models", "meta_rules")
+        if policy_id not in collections["policies"]:
             raise exceptions.PolicyUnknown
-        model_id = policy[policy_id]["model_id"]
-        model = Managers.ModelManager.get_models(user_id=user_id, model_id=model_id)
+        model_id = collections["policies"][policy_id]["model_id"]
+        model = collections["models"]
+        meta_rule = collections["meta_rules"]
         try:
             meta_rule_list = model[model_id]["meta_rules"]
             for meta_rule_id in meta_rule_list:
-                meta_rule = Managers.ModelManager.get_meta_rules(user_id=user_id, meta_rule_id=meta_rule_id)
                 categories["subject"].extend(meta_rule[meta_rule_id]["subject_categories"])
                 categories["object"].extend(meta_rule[meta_rule_id]["object_categories"])
                 categories["action"].extend(meta_rule[meta_rule_id]["action_categories"])
@@ -0,0 +1,975 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+"""
+In-memory driver, selected with the memory driver name of the database configuration
+
+The rows are kept in dictionaries indexed by ID and by the keys of INDEXES,
+they have the columns of the tables of the SQL driver and are turned into
+dictionaries by its models so that both drivers return the same values.
+
+The URL is memory:// or memory://<path>, with a path the rows are loaded
+from that JSON snapshot file and written back by snapshot(), dispose()
+and at exit. The rows are only seen by the current process, so that
+driver is meant for the tests, the benchmarks and the deployments with
+a single worker.
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from uuid import uuid4
+from python_moonutilities.exceptions import *
+from python_moondb.core import PDPDriver, PolicyDriver, ModelDriver
+from python_moondb.backends.sql import Model, Policy, PDP, Job, MetaRule, SubjectCategory, ObjectCategory, \
+    ActionCategory, Subject, Object, Action, SubjectData, ObjectData, ActionData, Rule, get_rule_hash, \
+    get_assignment_dicts, get_meta_rule_ids, DEFAULT_VERSION
+
+logger = logging.getLogger("moon.db.driver.memory")
+
+GENRES = ("subject", "object", "action")
+
+TABLES = ("models", "policies", "pdp", "jobs", "meta_rules", "versions", "rules") + \
+    tuple("{}_categories".format(genre) for genre in GENRES) + \
+    tuple("{}s".format(genre) for genre in GENRES) + \
+    tuple("{}_data".format(genre) for genre in GENRES) + \
+    tuple("{}_assignments".format(genre) for genre in GENRES)
+
+# Note: an index gives the keys of a row, each key maps to the IDs of its rows in insertion order
+INDEXES = {
+    "rules": {
+        "policy": lambda row: (row["policy_id"], ),
+        "hash": lambda row: ((row["policy_id"], row["meta_rule_id"], row["hash"]), ),
+    },
+}
+for _genre in GENRES:
+    INDEXES["{}_categories".format(_genre)] = {
+        "name": lambda row: (row["name"], ),
+    }
+    INDEXES["{}s".format(_genre)] = {
+        "policy": lambda row: row["value"].get("policy_list") or (),
+        "name": lambda row: (row["value"].get("name"), ),
+    }
+    INDEXES["{}_data".format(_genre)] = {
+        "policy": lambda row: (row["policy_id"], ),
+        "category": lambda row: ((row["policy_id"], row["category_id"]), ),
+    }
+    INDEXES["{}_assignments".format(_genre)] = {
+        "policy": lambda row: (row["policy_id"], ),
+        "assignment": lambda row: (row["assignment_id"], ),
+        "perimeter": lambda row, key="{}_id".format(_genre): ((row["policy_id"], row[key], row["category_id"]), ),
+        "element": lambda row, key="{}_id".format(_genre): (row[key], ),
+    }
+del _genre
+
+# Note: the versions of the collections read by the caches, like get_version_keys of the SQL driver
+VERSION_KEYS = {
+    "pdp": lambda row: "pdp",
+    "policies": lambda row: "policies",
+    "models": lambda row: "models",
+    "meta_rules": lambda row: "meta_rules",
+    "rules": lambda row: "rules:{}".format(row["policy_id"]),
+}
+
+MODELS = {
+    "models": Model, "policies": Policy, "pdp": PDP, "jobs": Job, "meta_rules": MetaRule, "rules": Rule,
+    "subject_categories": SubjectCategory, "object_categories": ObjectCategory,
+    "action_categories": ActionCategory, "subjects": Subject, "objects": Object, "actions": Action,
+    "subject_data": SubjectData, "object_data": ObjectData, "action_data": ActionData,
+}
+
+
+def get_copy(value):
+    """Copy a value as the SQL driver would store it, tuples become lists"""
+    return json.loads(json.dumps(value))
+
+
+def get_dict(table, row):
+    return get_copy(MODELS[table].get_dict(row))
+
+
+class Row(dict):
+    """A row whose columns are read as items or attributes, like the rows of the SQL driver"""
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+
+class Store(object):
+    """The rows of the tables and their indexes
+
+    The changes made in a transaction are journaled and undone if it fails.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.RLock()
+        self.tables = {table: {} for table in TABLES}
+        self.indexes = {table: {name: {} for name in indexes} for table, indexes in INDEXES.items()}
+        self.journal = None
+        self.counter = itertools.count(1)
+        if path and os.path.exists(path):
+            self.load()
+
+    def __set(self, table, _id, row):
+        old = self.tables[table].pop(_id, None)
+        for name, get_keys in INDEXES.get(table, {}).items():
+            index = self.indexes[table][name]
+            if old is not None:
+                for key in get_keys(old):
+                    index[key].pop(_id, None)
+                    if not index[key]:
+                        del index[key]
+            if row is not None:
+                for key in get_keys(row):
+                    index.setdefault(key, {})[_id] = None
+        if row is not None:
+            self.tables[table][_id] = row
+        return old
+
+    def get(self, table, _id):
+        return self.tables[table].get(_id)
+
+    def find(self, table, index, key):
+        """Get the rows of a table having that key in an index"""
+        return [self.tables[table][_id] for _id in self.indexes[table][index].get(key, ())]
+
+    def put(self, table, row):
+        row = Row(row)
+        if table.endswith("_assignments") and "id" not in row:
+            row["id"] = next(self.counter)
+        self.__write(table, row["id"], row)
+        return row
+
+    def remove(self, table, _id):
+        return self.__write(table, _id, None)
+
+    def __write(self, table, _id, row):
+        old = self.__set(table, _id, row)
+        if self.journal is not None:
+            self.journal.append((table, _id, old))
+        if table in VERSION_KEYS and (old or row):
+            key = VERSION_KEYS[table](row or old)
+            self.__write("versions", key, Row(id=key, value=uuid4().hex))
+        return old
+
+    @contextmanager
+    def transaction(self):
+        """Run the writes of the block in one transaction, nested blocks join it"""
+        with self.lock:
+            if self.journal is not None:
+                yield self
+                return
+            self.journal = []
+            try:
+                yield self
+            except BaseException:
+                for table, _id, old in reversed(self.journal):
+                    self.__set(table, _id, old)
+                raise
+            finally:
+                self.journal = None
+
+    def load(self):
+        with open(self.path) as f:
+            tables = json.load(f)
+        for table, rows in tables.items():
+            for row in rows:
+                self.__set(table, row["id"], Row(row))
+        last_id = max([row["id"] for table in TABLES if table.endswith("_assignments")
+                       for row in self.tables[table].values()] or [0])
+        self.counter = itertools.count(last_id + 1)
+        logger.info("Rows loaded from {}".format(self.path))
+
+    def save(self):
+        """Write the rows to the snapshot file, through a temporary file so that it is never partly written"""
+        if not self.path:
+            return
+        with self.lock:
+            tables = {table: list(rows.values()) for table, rows in self.tables.items()}
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(tables, f)
+        os.replace(self.path + ".tmp", self.path)
+
+
+def delete_policies(store, policy_ids):
+    """Delete policies with their data, perimeter, assignments and rules, like the SQL driver"""
+    policy_ids = set(policy_ids)
+    for policy_id in policy_ids:
+        tables = ["rules"] + ["{}_{}".format(genre, kind) for genre in GENRES for kind in ("assignments", "data")]
+        for table in tables:
+            for row in store.find(table, "policy", policy_id):
+                store.remove(table, row["id"])
+        for genre in GENRES:
+            table = "{}s".format(genre)
+            for row in store.find(table, "policy", policy_id):
+                policy_list = [_id for _id in row["value"].get("policy_list") or [] if _id not in policy_ids]
+                if policy_list:
+                    store.put(table, dict(row, value=dict(row["value"], policy_list=policy_list)))
+                    continue
+                for _row in store.find("{}_assignments".format(genre), "element", row["id"]):
+                    store.remove("{}_assignments".format(genre), _row["id"])
+                store.remove(table, row["id"])
+        store.remove("policies", policy_id)
+    for row in list(store.tables["pdp"].values()):
+        pipeline = row["value"].get("security_pipeline") or []
+        if policy_ids & set(pipeline):
+            store.put("pdp", dict(row, value=dict(row["value"], security_pipeline=[
+                _id for _id in pipeline if _id not in policy_ids])))
+
+
+def delete_meta_rules(store, meta_rule_ids):
+    """Delete meta rules with the rules of all the policies using them"""
+    meta_rule_ids = set(meta_rule_ids)
+    for row in list(store.tables["rules"].values()):
+        if row["meta_rule_id"] in meta_rule_ids:
+            store.remove("rules", row["id"])
+    for meta_rule_id in meta_rule_ids:
+        store.remove("meta_rules", meta_rule_id)
+
+
+__stores = {}
+__stores_lock = threading.Lock()
+
+
+def get_store(url):
+    """Get the store shared by the connectors of a URL"""
+    with __stores_lock:
+        if url not in __stores:
+            path = url.split("://", 1)[-1] or None
+            __stores[url] = Store(path)
+            if path:
+                atexit.register(__stores[url].save)
+        return __stores[url]
+
+
+class BaseConnector(object):
+    """Provide a base connector to the rows kept in memory"""
+    store = None
+
+    def __init__(self, engine_name):
+        self.store = get_store(engine_name)
+
+    def dispose(self):
+        self.snapshot()
+
+    def snapshot(self):
+        """Write the rows to the snapshot file given in the URL"""
+        self.store.save()
+
+    def operation(self):
+        """Run all the calls made to the connectors in the block in one transaction"""
+        return self.store.transaction()
+
+    def get_session_for_read(self):
+        return self.store.lock
+
+    def get_session_for_write(self):
+        return self.store.transaction()
+
+    def get_version(self, key):
+        return self.get_versions((key, ))[key]
+
+    def get_versions(self, keys):
+        with self.get_session_for_read():
+            return {key: (self.store.get("versions", key) or {}).get("value", DEFAULT_VERSION) for key in keys}
+
+    def _get_rows(self, table, _id=None):
+        with self.get_session_for_read():
+            rows = [self.store.get(table, _id)] if _id else self.store.tables[table].values()
+            return {row["id"]: get_dict(table, row) for row in rows if row}
+
+    def _add_row(self, table, _id, value):
+        with self.get_session_for_write() as store:
+            row = store.put(table, {"id": _id if _id else uuid4().hex, "value": get_copy(value)})
+            return {row["id"]: get_dict(table, row)}
+
+    def _update_row(self, table, _id, value, unknown):
+        with self.get_session_for_write() as store:
+            row = store.get(table, _id)
+            if not row:
+                raise unknown
+            _value = dict(row["value"])
+            _value.update(get_copy(value))
+            row = store.put(table, dict(row, value=_value))
+            return {row["id"]: get_dict(table, row)}
+
+
+class PDPConnector(BaseConnector, PDPDriver):
+
+    def update_pdp(self, pdp_id, value):
+        return self._update_row("pdp", pdp_id, value, PdpUnknown)
+
+    def delete_pdp(self, pdp_id):
+        with self.get_session_for_write() as store:
+            store.remove("pdp", pdp_id)
+
+    def add_pdp(self, pdp_id=None, value=None):
+        return self._add_row("pdp", pdp_id, value)
+
+    def get_pdp(self, pdp_id=None):
+        return self._get_rows("pdp", pdp_id)
+
+    def get_jobs(self, job_id=None):
+        return self._get_rows("jobs", job_id)
+
+    def add_job(self, job_id, value):
+        return self._add_row("jobs", job_id, value)
+
+    def update_job(self, job_id, value):
+        return self._update_row("jobs", job_id, value, KeyError(job_id))
+
+    def delete_jobs(self, job_ids):
+        with self.get_session_for_write() as store:
+            return len([job_id for job_id in set(job_ids) if store.remove("jobs", job_id)])
+
+
+class PolicyConnector(BaseConnector, PolicyDriver):
+
+    def update_policy(self, policy_id, value):
+        return self._update_row("policies", policy_id, value, PolicyUnknown)
+
+    def delete_policy(self, policy_id):
+        with self.get_session_for_write() as store:
+            delete_policies(store, [policy_id, ])
+
+    def add_policy(self, policy_id=None, value=None):
+        return self._add_row("policies", policy_id, value)
+
+    def get_policies(self, policy_id=None):
+        return self._get_rows("policies", policy_id)
+
+    def __get_perimeter(self, table, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        """Get the subjects, objects or actions ordered by ID"""
+        if perimeter_id and not policy_id:
+            return {}
+        with self.get_session_for_read():
+            if policy_id:
+                rows = self.store.find(table, "policy", policy_id)
+            else:
+                rows = self.store.tables[table].values()
+            if perimeter_id:
+                rows = [row for row in rows if row["id"] == perimeter_id]
+            if ids:
+                ids = set(ids)
+                rows = [row for row in rows if row["id"] in ids]
+            if name is not None:
+                rows = [row for row in rows if row["value"].get("name") == name]
+            if marker:
+                rows = [row for row in rows if row["id"] > marker]
+            rows = sorted(rows, key=lambda row: row["id"])[:limit]
+            return {row["id"]: get_copy(MODELS[table].get_return(row)) for row in rows}
+
+    def __set_perimeter(self, table, policy_id, perimeter_id=None, value=None):
+        with self.get_session_for_write() as store:
+            row = store.get(table, perimeter_id) if perimeter_id else None
+            if not row:
+                value = get_copy(value)
+                if type(value.get("policy_list")) is not list:
+                    value["policy_list"] = []
+                if policy_id and policy_id not in value["policy_list"]:
+                    value["policy_list"] = [policy_id, ]
+                row = store.put(table, {"id": perimeter_id if perimeter_id else uuid4().hex, "value": value})
+            else:
+                value = get_copy(row["value"])
+                if type(value.get("policy_list")) is not list:
+                    value["policy_list"] = []
+                if policy_id and policy_id not in value["policy_list"]:
+                    value["policy_list"].append(policy_id)
+                row = store.put(table, dict(row, value=value))
+            return {row["id"]: get_copy(MODELS[table].get_return(row))}
+
+    def __delete_perimeter(self, table, policy_id, perimeter_id, unknown):
+        with self.get_session_for_write() as store:
+            row = store.get(table, perimeter_id)
+            if not row:
+                raise unknown
+            policy_list = list(row["value"].get("policy_list") or [])
+            if policy_id in policy_list:
+                policy_list.remove(policy_id)
+                store.put(table, dict(row, value=dict(row["value"], policy_list=policy_list)))
+            elif not policy_list:
+                store.remove(table, perimeter_id)
+
+    def __set_perimeters(self, table, policy_id, values):
+        """Add several subjects, objects or actions to a policy in one transaction
+
+        :return: list of {"id": perimeter ID, "added": False if the element already existed}
+        """
+        with self.get_session_for_write() as store:
+            results = []
+            for value in values:
+                perimeter_id = value.get("id") or uuid4().hex
+                row = store.get(table, perimeter_id)
+                if row:
+                    policy_list = row["value"].get("policy_list") or []
+                    if policy_id not in policy_list:
+                        store.put(table, dict(row, value=dict(row["value"], policy_list=policy_list + [policy_id, ])))
+                else:
+                    _value = get_copy({key: item for key, item in value.items() if key != "id"})
+                    _value["policy_list"] = [policy_id, ]
+                    store.put(table, {"id": perimeter_id, "value": _value})
+                results.append({"id": perimeter_id, "added": not row})
+            return results
+
+    def get_subjects(self, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        return self.__get_perimeter("subjects", policy_id, perimeter_id=perimeter_id, name=name,
+                                    ids=ids, limit=limit, marker=marker)
+
+    def get_subjects_by_names(self, names):
+        with self.get_session_for_read():
+            rows = {name: self.store.find("subjects", "name", name) for name in set(names)}
+            return {name: get_copy(Subject.get_return(_rows[0])) for name, _rows in rows.items() if _rows}
+
+    def set_subject(self, policy_id, perimeter_id=None, value=None):
+        return self.__set_perimeter("subjects", policy_id, perimeter_id, value)
+
+    def delete_subject(self, policy_id, perimeter_id):
+        return self.__delete_perimeter("subjects", policy_id, perimeter_id, SubjectUnknown)
+
+    def set_subjects(self, policy_id, values):
+        return self.__set_perimeters("subjects", policy_id, values)
+
+    def get_objects(self, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        return self.__get_perimeter("objects", policy_id, perimeter_id=perimeter_id, name=name,
+                                    ids=ids, limit=limit, marker=marker)
+
+    def set_object(self, policy_id, perimeter_id=None, value=None):
+        return self.__set_perimeter("objects", policy_id, perimeter_id, value)
+
+    def delete_object(self, policy_id, perimeter_id):
+        return self.__delete_perimeter("objects", policy_id, perimeter_id, ObjectUnknown)
+
+    def set_objects(self, policy_id, values):
+        return self.__set_perimeters("objects", policy_id, values)
+
+    def get_actions(self, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        return self.__get_perimeter("actions", policy_id, perimeter_id=perimeter_id, name=name,
+                                    ids=ids, limit=limit, marker=marker)
+
+    def set_action(self, policy_id, perimeter_id=None, value=None):
+        return self.__set_perimeter("actions", policy_id, perimeter_id, value)
+
+    def delete_action(self, policy_id, perimeter_id):
+        return self.__delete_perimeter("actions", policy_id, perimeter_id, ActionUnknown)
+
+    def set_actions(self, policy_id, values):
+        return self.__set_perimeters("actions", policy_id, values)
+
+    def __get_data(self, table, policy_id, data_id=None, category_id=None):
+        with self.get_session_for_read():
+            rows = self.store.find(table, "category", (policy_id, category_id))
+            if data_id:
+                rows = [row for row in rows if row["id"] == data_id]
+            return {
+                "policy_id": policy_id,
+                "category_id": category_id,
+                "data": {row["id"]: get_dict(table, row) for row in rows}
+            }
+
+    def __set_data(self, table, policy_id, data_id=None, category_id=None, value=None):
+        with self.get_session_for_write() as store:
+            row = store.get(table, data_id) if data_id else None
+            if not row or row["policy_id"] != policy_id or row["category_id"] != category_id:
+                row = store.put(table, {
+                    "id": data_id if data_id else uuid4().hex,
+                    "value": get_copy(value),
+                    "category_id": category_id,
+                    "policy_id": policy_id,
+                })
+            return {
+                "policy_id": policy_id,
+                "category_id": category_id,
+                "data": {row["id"]: get_dict(table, row)}
+            }
+
+    def __delete_data(self, table, policy_id, data_id):
+        with self.get_session_for_write() as store:
+            row = store.get(table, data_id)
+            if row and row["policy_id"] == policy_id:
+                store.remove(table, data_id)
+
+    def __set_data_list(self, table, policy_id, category_id, values):
+        """Add several data to a category of a policy in one transaction
+
+        :return: list of {"id": data ID, "added": False if the data already existed}
+        """
+        with self.get_session_for_write() as store:
+            results = []
+            for value in values:
+                data_id = value.get("id") or uuid4().hex
+                added = not store.get(table, data_id)
+                if added:
+                    store.put(table, {
+                        "id": data_id,
+                        "value": get_copy({key: item for key, item in value.items() if key != "id"}),
+                        "category_id": category_id,
+                        "policy_id": policy_id,
+                    })
+                results.append({"id": data_id, "added": added})
+            return results
+
+    def get_subject_data(self, policy_id, data_id=None, category_id=None):
+        return self.__get_data("subject_data", policy_id, data_id=data_id, category_id=category_id)
+
+    def set_subject_data(self, policy_id, data_id=None, category_id=None, value=None):
+        return self.__set_data("subject_data", policy_id, data_id=data_id, category_id=category_id, value=value)
+
+    def delete_subject_data(self, policy_id, data_id):
+        return self.__delete_data("subject_data", policy_id, data_id)
+
+    def set_subject_data_list(self, policy_id, category_id, values):
+        return self.__set_data_list("subject_data", policy_id, category_id, values)
+
+    def get_object_data(self, policy_id, data_id=None, category_id=None):
+        return self.__get_data("object_data", policy_id, data_id=data_id, category_id=category_id)
+
+    def set_object_data(self, policy_id, data_id=None, category_id=None, value=None):
+        return self.__set_data("object_data", policy_id, data_id=data_id, category_id=category_id, value=value)
+
+    def delete_object_data(self, policy_id, data_id):
+        return self.__delete_data("object_data", policy_id, data_id)
+
+    def set_object_data_list(self, policy_id, category_id, values):
+        return self.__set_data_list("object_data", policy_id, category_id, values)
+
+    def get_action_data(self, policy_id, data_id=None, category_id=None):
+        return self.__get_data("action_data", policy_id, data_id=data_id, category_id=category_id)
+
+    def set_action_data(self, policy_id, data_id=None, category_id=None, value=None):
+        return self.__set_data("action_data", policy_id, data_id=data_id, category_id=category_id, value=value)
+
+    def delete_action_data(self, policy_id, data_id):
+        return self.__delete_data("action_data", policy_id, data_id)
+
+    def set_action_data_list(self, policy_id, category_id, values):
+        return self.__set_data_list("action_data", policy_id, category_id, values)
+
+    def __get_assignments(self, genre, policy_id, perimeter_id=None, category_id=None, data_id=None,
+                          ids=None, limit=None, marker=None):
+        """Get the subject, object or action assignments ordered by ID"""
+        table = "{}_assignments".format(genre)
+        perimeter_key = "{}_id".format(genre)
+        with self.get_session_for_read():
+            rows = self.store.find(table, "policy", policy_id)
+            if perimeter_id:
+                rows = [row for row in rows if row[perimeter_key] == perimeter_id]
+            if category_id:
+                rows = [row for row in rows if row["category_id"] == category_id]
+            if ids:
+                ids = set(ids)
+                rows = [row for row in rows if row["assignment_id"] in ids]
+            if marker:
+                rows = [row for row in rows if row["assignment_id"] > marker]
+            if data_id or limit:
+                assignment_ids = sorted(set(row["assignment_id"] for row in rows
+                                            if not data_id or row["data_id"] == data_id))[:limit]
+                rows = [row for _id in assignment_ids for row in self.store.find(table, "assignment", _id)]
+            return get_assignment_dicts(perimeter_key, rows)
+
+    def __add_assignment(self, genre, policy_id, perimeter_id, category_id, data_id):
+        table = "{}_assignments".format(genre)
+        with self.get_session_for_write() as store:
+            rows = store.find(table, "perimeter", (policy_id, perimeter_id, category_id))
+            if data_id not in [row["data_id"] for row in rows]:
+                rows.append(store.put(table, {
+                    "assignment_id": rows[0]["assignment_id"] if rows else uuid4().hex,
+                    "policy_id": policy_id,
+                    "{}_id".format(genre): perimeter_id,
+                    "category_id": category_id,
+                    "data_id": data_id,
+                }))
+            return get_assignment_dicts("{}_id".format(genre), rows)
+
+    def __delete_assignment(self, genre, policy_id, perimeter_id, category_id, data_id):
+        table = "{}_assignments".format(genre)
+        with self.get_session_for_write() as store:
+            for row in store.find(table, "perimeter", (policy_id, perimeter_id, category_id)):
+                if row["data_id"] == data_id:
+                    store.remove(table, row["id"])
+
+    def __add_assignments(self, genre, policy_id, assignments):
+        """Add (perimeter, category, data) tuples to the assignments of a policy
+
+        :return: list of {"id": assignment ID, "added": False if the data was already assigned}
+        """
+        table = "{}_assignments".format(genre)
+        perimeter_key = "{}_id".format(genre)
+        with self.get_session_for_write() as store:
+            results = []
+            for item in assignments:
+                rows = store.find(table, "perimeter", (policy_id, item[perimeter_key], item["category_id"]))
+                added = item["data_id"] not in [row["data_id"] for row in rows]
+                if added:
+                    rows.append(store.put(table, {
+                        "assignment_id": rows[0]["assignment_id"] if rows else uuid4().hex,
+                        "policy_id": policy_id,
+                        perimeter_key: item[perimeter_key],
+                        "category_id": item["category_id"],
+                        "data_id": item["data_id"],
+                    }))
+                results.append({"id": rows[0]["assignment_id"], "added": added})
+            return results
+
+    def __delete_assignments(self, genre, policy_id, assignments):
+        """Remove (perimeter, category, data) tuples from the assignments of a policy
+
+        :return: list of {"deleted": False if the data was not assigned}
+        """
+        table = "{}_assignments".format(genre)
+        perimeter_key = "{}_id".format(genre)
+        with self.get_session_for_write() as store:
+            results = []
+            for item in assignments:
+                rows = store.find(table, "perimeter", (policy_id, item[perimeter_key], item["category_id"]))
+                rows = [row for row in rows if row["data_id"] == item["data_id"]]
+                for row in rows:
+                    store.remove(table, row["id"])
+                results.append({"deleted": bool(rows)})
+            return results
+
+    def get_subject_assignments(self, policy_id, subject_id=None, category_id=None, data_id=None,
+                                ids=None, limit=None, marker=None):
+        return self.__get_assignments("subject", policy_id, subject_id, category_id=category_id,
+                                      data_id=data_id, ids=ids, limit=limit, marker=marker)
+
+    def add_subject_assignment(self, policy_id, subject_id, category_id, data_id):
+        return self.__add_assignment("subject", policy_id, subject_id, category_id, data_id)
+
+    def delete_subject_assignment(self, policy_id, subject_id, category_id, data_id):
+        return self.__delete_assignment("subject", policy_id, subject_id, category_id, data_id)
+
+    def add_subject_assignments(self, policy_id, assignments):
+        return self.__add_assignments("subject", policy_id, assignments)
+
+    def delete_subject_assignments(self, policy_id, assignments):
+        return self.__delete_assignments("subject", policy_id, assignments)
+
+    def get_object_assignments(self, policy_id, object_id=None, category_id=None, data_id=None,
+                               ids=None, limit=None, marker=None):
+        return self.__get_assignments("object", policy_id, object_id, category_id=category_id,
+                                      data_id=data_id, ids=ids, limit=limit, marker=marker)
+
+    def add_object_assignment(self, policy_id, object_id, category_id, data_id):
+        return self.__add_assignment("object", policy_id, object_id, category_id, data_id)
+
+    def delete_object_assignment(self, policy_id, object_id, category_id, data_id):
+        return self.__delete_assignment("object", policy_id, object_id, category_id, data_id)
+
+    def add_object_assignments(self, policy_id, assignments):
+        return self.__add_assignments("object", policy_id, assignments)
+
+    def delete_object_assignments(self, policy_id, assignments):
+        return self.__delete_assignments("object", policy_id, assignments)
+
+    def get_action_assignments(self, policy_id, action_id=None, category_id=None, data_id=None,
+                               ids=None, limit=None, marker=None):
+        return self.__get_assignments("action", policy_id, action_id, category_id=category_id,
+                                      data_id=data_id, ids=ids, limit=limit, marker=marker)
+
+    def add_action_assignment(self, policy_id, action_id, category_id, data_id):
+        return self.__add_assignment("action", policy_id, action_id, category_id, data_id)
+
+    def delete_action_assignment(self, policy_id, action_id, category_id, data_id):
+        return self.__delete_assignment("action", policy_id, action_id, category_id, data_id)
+
+    def add_action_assignments(self, policy_id, assignments):
+        return self.__add_assignments("action", policy_id, assignments)
+
+    def delete_action_assignments(self, policy_id, assignments):
+        return self.__delete_assignments("action", policy_id, assignments)
+
+    def get_rules(self, policy_id, rule_id=None, meta_rule_id=None, ids=None, limit=None, marker=None):
+        with self.get_session_for_read():
+            if rule_id:
+                row = self.store.get("rules", rule_id)
+                return {row["id"]: get_dict("rules", row)} if row and row["policy_id"] == policy_id else {}
+            rows = self.store.find("rules", "policy", policy_id)
+            if meta_rule_id:
+                rows = [row for row in rows if row["meta_rule_id"] == meta_rule_id]
+            if ids:
+                ids = set(ids)
+                rows = [row for row in rows if row["id"] in ids]
+            if marker:
+                rows = [row for row in rows if row["id"] > marker]
+            rows = sorted(rows, key=lambda row: row["id"])[:limit]
+            result = {
+                "policy_id": policy_id,
+                "rules": [get_dict("rules", row) for row in rows]
+            }
+            if meta_rule_id:
+                result["meta_rule_id"] = meta_rule_id
+            return result
+
+    def __put_rule(self, policy_id, meta_rule_id, value):
+        """Add a rule unless the policy has the same one
+
+        :return: (rule row, True if it was added)
+        """
+        rule_hash = get_rule_hash(value)
+        rows = self.store.find("rules", "hash", (policy_id, meta_rule_id, rule_hash))
+        if rows:
+            return rows[0], False
+        return self.store.put("rules", {
+            "id": uuid4().hex,
+            "policy_id": policy_id,
+            "meta_rule_id": meta_rule_id,
+            "rule": get_copy(value),
+            "hash": rule_hash
+        }), True
+
+    def add_rule(self, policy_id, meta_rule_id, value):
+        with self.get_session_for_write():
+            row, added = self.__put_rule(policy_id, meta_rule_id, value)
+            # Note: like the SQL driver, the rule added is returned with the value given
+            return {row["id"]: Rule.get_dict(Row(row, rule=value))} if added else {}
+
+    def add_rules(self, policy_id, values):
+        with self.get_session_for_write():
+            results = []
+            for value in values:
+                row, added = self.__put_rule(policy_id, value["meta_rule_id"], value)
+                results.append({"id": row["id"], "added": added})
+            return results
+
+    def delete_rule(self, policy_id, rule_id):
+        self.delete_rules(policy_id, [rule_id, ])
+
+    def delete_rules(self, policy_id, rule_ids):
+        with self.get_session_for_write() as store:
+            count = 0
+            for rule_id in rule_ids:
+                row = store.get("rules", rule_id)
+                if row and row["policy_id"] == policy_id:
+                    store.remove("rules", rule_id)
+                    count += 1
+            return count
+
+    def import_policy(self, policy_id, value):
+        with self.get_session_for_write() as store:
+            result = {}
+            data_ids = {}
+            for genre in GENRES:
+                table = "{}_data".format(genre)
+                ids = {(row["category_id"], row["value"].get("name")): row["id"]
+                       for row in store.find(table, "policy", policy_id)}
+                result[genre + "_data"] = {}
+                for category_id, items in value.get(genre + "_data", {}).items():
+                    result[genre + "_data"][category_id] = {}
+                    for name, item in items.items():
+                        if (category_id, name) not in ids:
+                            _value = {"description": ""}
+                            _value.update(get_copy(item))
+                            _value["name"] = name
+                            ids[(category_id, name)] = store.put(table, {
+                                "id": uuid4().hex,
+                                "value": _value,
+                                "category_id": category_id,
+                                "policy_id": policy_id,
+                            })["id"]
+                        result[genre + "_data"][category_id][name] = ids[(category_id, name)]
+                data_ids[genre] = ids
+
+            perimeter_ids = {}
+            for genre in GENRES:
+                table = "{}s".format(genre)
+                items = value.get(genre + "s", {})
+                rows_by_name = {}
+                for name in set(items) | set(assignment[genre] for assignment in value.get(genre + "_assignments", [])):
+                    rows = store.find(table, "name", name)
+                    if rows:
+                        rows_by_name[name] = rows[0]
+                ids = {name: row["id"] for name, row in rows_by_name.items()
+                       if policy_id in (row["value"].get("policy_list") or [])}
+                result[genre + "s"] = {}
+                for name, item in items.items():
+                    row = (item.get("id") and store.get(table, item["id"])) or rows_by_name.get(name)
+                    if row:
+                        policy_list = row["value"].get("policy_list") or []
+                        if policy_id not in policy_list:
+                            store.put(table, dict(row, value=dict(row["value"],
+                                                                  policy_list=policy_list + [policy_id, ])))
+                        ids[name] = row["id"]
+                    else:
+                        _value = get_copy(item)
+                        _value["name"] = name
+                        _value["policy_list"] = [policy_id, ]
+                        ids[name] = item.get("id") or uuid4().hex
+                        store.put(table, {"id": ids[name], "value": _value})
+                    result[genre + "s"][name] = ids[name]
+                perimeter_ids[genre] = ids
+
+            for genre, unknown_perimeter, unknown_data in (
+                    ("subject", SubjectUnknown, SubjectScopeUnknown),
+                    ("object", ObjectUnknown, ObjectScopeUnknown),
+                    ("action", ActionUnknown, ActionScopeUnknown)):
+                for assignment in value.get(genre + "_assignments", []):
+                    category_id = assignment["category_id"]
+                    if assignment[genre] not in perimeter_ids[genre]:
+                        raise unknown_perimeter("Unknown {} {}".format(genre, assignment[genre]))
+                    if (category_id, assignment["data"]) not in data_ids[genre]:
+                        raise unknown_data("Unknown {} data {}".format(genre, assignment["data"]))
+                    self.__add_assignment(genre, policy_id, perimeter_ids[genre][assignment[genre]], category_id,
+                                          data_ids[genre][(category_id, assignment["data"])])
+
+            data_id_sets = {genre: set(ids.values()) for genre, ids in data_ids.items()}
+            result["rules"] = 0
+            for rule in value.get("rules", []):
+                meta_rule_id = rule["meta_rule_id"]
+                meta_rule = store.get("meta_rules", meta_rule_id)
+                if not meta_rule:
+                    raise MetaRuleUnknown("Unknown meta rule {}".format(meta_rule_id))
+                categories = []
+                for genre in GENRES:
+                    for category_id in meta_rule["value"].get(genre + "_categories", []):
+                        categories.append((genre, category_id))
+                if len(categories) != len(rule["rule"]):
+                    raise RuleContentError("The rule {} does not match the meta rule {}".format(
+                        rule["rule"], meta_rule_id))
+                data_list = []
+                for (genre, category_id), name in zip(categories, rule["rule"]):
+                    if (category_id, name) in data_ids[genre]:
+                        data_list.append(data_ids[genre][(category_id, name)])
+                    elif name in data_id_sets[genre]:
+                        data_list.append(name)
+                    else:
+                        raise RuleContentError("Unknown {} data {}".format(genre, name))
+                _, added = self.__put_rule(policy_id, meta_rule_id, {
+                    "meta_rule_id": meta_rule_id,
+                    "rule": data_list,
+                    "instructions": rule.get("instructions", ({"decision": "grant"}, )),
+                    "enabled": rule.get("enabled", True),
+                })
+                result["rules"] += added
+            return result
+
+    def clone_policy(self, policy_id, new_policy_id, value, pdp_id=None, pdp_value=None):
+        """Copy the data, perimeter, assignments and rules of a policy in one transaction"""
+        with self.get_session_for_write() as store:
+            store.put("policies", {"id": new_policy_id, "value": get_copy(value)})
+            if pdp_id:
+                store.put("pdp", {"id": pdp_id, "value": get_copy(pdp_value)})
+            data_ids = {}
+            for genre in GENRES:
+                table = "{}_data".format(genre)
+                for row in store.find(table, "policy", policy_id):
+                    data_ids[row["id"]] = uuid4().hex
+                    store.put(table, dict(row, id=data_ids[row["id"]], policy_id=new_policy_id))
+
+                table = "{}s".format(genre)
+                for row in store.find(table, "policy", policy_id):
+                    policy_list = row["value"].get("policy_list") or []
+                    if new_policy_id not in policy_list:
+                        store.put(table, dict(row, value=dict(row["value"], policy_list=policy_list + [new_policy_id, ])))
+
+                table = "{}_assignments".format(genre)
+                assignment_ids = {}
+                for row in sorted(store.find(table, "policy", policy_id), key=lambda _row: _row["id"]):
+                    _row = {key: item for key, item in row.items() if key != "id"}
+                    _row["assignment_id"] = assignment_ids.setdefault(row["assignment_id"], uuid4().hex)
+                    _row["policy_id"] = new_policy_id
+                    _row["data_id"] = data_ids.get(row["data_id"], row["data_id"])
+                    store.put(table, _row)
+
+            for row in store.find("rules", "policy", policy_id):
+                _value = dict(row["rule"])
+                _value["rule"] = [data_ids.get(_id, _id) for _id in row["rule"]["rule"]]
+                store.put("rules", {
+                    "id": uuid4().hex,
+                    "policy_id": new_policy_id,
+                    "meta_rule_id": row["meta_rule_id"],
+                    "rule": _value,
+                    "hash": get_rule_hash(_value) if row["hash"] else None,
+                })
+            return {
+                "policies": {new_policy_id: get_dict("policies", store.get("policies", new_policy_id))},
+                "pdp": {pdp_id: get_dict("pdp", store.get("pdp", pdp_id))} if pdp_id else {},
+            }
+
+
+class ModelConnector(BaseConnector, ModelDriver):
+
+    def update_model(self, model_id, value):
+        return self._update_row("models", model_id, value, ModelUnknown)
+
+    def delete_model(self, model_id):
+        """Delete a model with its policies and the meta rules no other model uses"""
+        with self.get_session_for_write() as store:
+            row = store.get("models", model_id)
+            delete_policies(store, [_row["id"] for _row in store.tables["policies"].values()
+                                    if _row["value"].get("model_id") == model_id])
+            used_ids = set()
+            for _row in store.tables["models"].values():
+                if _row["id"] != model_id:
+                    used_ids.update(get_meta_rule_ids(_row["value"]))
+            delete_meta_rules(store, [_id for _id in get_meta_rule_ids(row["value"]) if _id not in used_ids])
+            store.remove("models", model_id)
+
+    def add_model(self, model_id=None, value=None):
+        return self._add_row("models", model_id, value)
+
+    def get_models(self, model_id=None):
+        return self._get_rows("models", model_id)
+
+    def set_meta_rule(self, meta_rule_id, value):
+        return self._add_row("meta_rules", meta_rule_id, value)
+
+    def get_meta_rules(self, meta_rule_id=None):
+        return self._get_rows("meta_rules", meta_rule_id)
+
+    def delete_meta_rule(self, meta_rule_id=None):
+        with self.get_session_for_write() as store:
+            delete_meta_rules(store, [meta_rule_id, ])
+
+    def __add_category(self, table, name, description, uuid=None):
+        with self.get_session_for_write() as store:
+            rows = store.find(table, "name", name)
+            row = rows[0] if rows else store.put(table, {
+                "id": uuid if uuid else uuid4().hex,
+                "name": name,
+                "description": description
+            })
+            return {row["id"]: get_dict(table, row)}
+
+    def __delete_category(self, table, category_id):
+        with self.get_session_for_write() as store:
+            store.remove(table, category_id)
+
+    def get_subject_categories(self, category_id=None):
+        return self._get_rows("subject_categories", category_id)
+
+    def add_subject_category(self, name, description, uuid=None):
+        return self.__add_category("subject_categories", name, description, uuid)
+
+    def delete_subject_category(self, category_id):
+        return self.__delete_category("subject_categories", category_id)
+
+    def get_object_categories(self, category_id=None):
+        return self._get_rows("object_categories", category_id)
+
+    def add_object_category(self, name, description, uuid=None):
+        return self.__add_category("object_categories", name, description, uuid)
+
+    def delete_object_category(self, category_id):
+        return self.__delete_category("object_categories", category_id)
+
+    def get_action_categories(self, category_id=None):
+        return self._get_rows("action_categories", category_id)
+
+    def add_action_category(self, name, description, uuid=None):
+        return self.__add_category("action_categories", name, description, uuid)
+
+    def delete_action_category(self, category_id):
+        return self.__delete_category("action_categories", category_id)
+
+
+class MemoryConnector(PDPConnector, PolicyConnector, ModelConnector):
+    pass
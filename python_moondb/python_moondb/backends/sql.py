@@ -4,11 +4,17 @@
 # or at 'http://www.apache.org/licenses/LICENSE-2.0'.
 
 import copy
+import hashlib
+import importlib
+import itertools
 import json
+import time
 from uuid import uuid4
 import sqlalchemy as sql
 import logging
-from sqlalchemy.orm import sessionmaker
+import threading
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import create_engine
 from contextlib import contextmanager
@@ -16,12 +22,30 @@ from sqlalchemy import types as sql_types
 from python_moonutilities import configuration
 from python_moonutilities.exceptions import *
 from python_moondb.core import PDPDriver, PolicyDriver, ModelDriver
+from python_moondb.api.metrics import metrics
 
 logger = logging.getLogger("moon.db.driver.sql")
 Base = declarative_base()
 DEBUG = True if configuration.get_configuration("logging")['logging']['loggers']['moon']['level'] == "DEBUG" else False
 
 
+def get_json_loads():
+    """Get the function decoding the JsonBlob columns
+
+    It is the loads function of the module named by the json_codec key of
+    the database configuration, json by default (ujson or orjson are faster).
+    """
+    name = configuration.get_configuration("database")['database'].get("json_codec", "json")
+    try:
+        return importlib.import_module(name).loads
+    except (ImportError, AttributeError):
+        logger.warning("Cannot use the JSON codec {}, using json".format(name))
+        return json.loads
+
+
+json_loads = get_json_loads()
+
+
 class DictBase:
     attributes = []
 
@@ -36,12 +60,17 @@ class DictBase:
         #
         # return cls(**new_d)
 
-    def to_dict(self):
+    @classmethod
+    def get_dict(cls, ref):
+        """Build the dictionary of an instance or of a row selected from the table"""
         d = dict()
-        for attr in self.__class__.attributes:
-            d[attr] = getattr(self, attr)
+        for attr in cls.attributes:
+            d[attr] = ref[attr]
         return d
 
+    def to_dict(self):
+        return self.get_dict(self)
+
     def __getitem__(self, key):
         # if "extra" in dir(self) and key in self.extra:
         #     return self.extra[key]
@@ -53,10 +82,21 @@ class JsonBlob(sql_types.TypeDecorator):
     impl = sql.Text
 
     def process_bind_param(self, value, dialect):
+        # Note: json_like relies on the separators of json.dumps, the codec only decodes
         return json.dumps(value)
 
     def process_result_value(self, value, dialect):
-        return json.loads(value)
+        return json_loads(value)
+
+
+def json_like(column, value):
+    """Build a LIKE predicate matching a JSON fragment in a JsonBlob column
+
+    The column is searched as text, so the rows found must still be checked
+    against the exact value.
+    """
+    fragment = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return sql.type_coerce(column, sql.Text).like("%{}%".format(fragment), escape="\\")
 
 
 class Model(Base, DictBase):
@@ -65,11 +105,12 @@ class Model(Base, DictBase):
     id = sql.Column(sql.String(64), primary_key=True)
     value = sql.Column(JsonBlob(), nullable=True)
 
-    def to_dict(self):
+    @classmethod
+    def get_dict(cls, ref):
         return {
-            "name": self.value.get("name"),
-            "description": self.value.get("description", ""),
-            "meta_rules": self.value.get("meta_rules", list()),
+            "name": ref.value.get("name"),
+            "description": ref.value.get("description", ""),
+            "meta_rules": ref.value.get("meta_rules", list()),
         }
 
 
@@ -79,12 +120,13 @@ class Policy(Base, DictBase):
     id = sql.Column(sql.String(64), primary_key=True)
     value = sql.Column(JsonBlob(), nullable=True)
 
-    def to_dict(self):
+    @classmethod
+    def get_dict(cls, ref):
         return {
-            "name": self.value.get("name"),
-            "description": self.value.get("description", ""),
-            "model_id": self.value.get("model_id", ""),
-            "genre": self.value.get("genre", ""),
+            "name": ref.value.get("name"),
+            "description": ref.value.get("description", ""),
+            "model_id": ref.value.get("model_id", ""),
+            "genre": ref.value.get("genre", ""),
         }
 
 
@@ -94,12 +136,31 @@ class PDP(Base, DictBase):
     id = sql.Column(sql.String(64), primary_key=True)
     value = sql.Column(JsonBlob(), nullable=True)
 
-    def to_dict(self):
+    @classmethod
+    def get_dict(cls, ref):
+        return {
+            "name": ref.value.get("name"),
+            "description": ref.value.get("description", ""),
+            "keystone_project_id": ref.value.get("keystone_project_id", ""),
+            "security_pipeline": ref.value.get("security_pipeline", []),
+        }
+
+
+class Job(Base, DictBase):
+    __tablename__ = 'jobs'
+    attributes = ['id', 'value']
+    id = sql.Column(sql.String(64), primary_key=True)
+    value = sql.Column(JsonBlob(), nullable=True)
+
+    @classmethod
+    def get_dict(cls, ref):
         return {
-            "name": self.value.get("name"),
-            "description": self.value.get("description", ""),
-            "keystone_project_id": self.value.get("keystone_project_id", ""),
-            "security_pipeline": self.value.get("security_pipeline", []),
+            "name": ref.value.get("name"),
+            "pdp_id": ref.value.get("pdp_id"),
+            "status": ref.value.get("status"),
+            "error": ref.value.get("error", ""),
+            "created": ref.value.get("created"),
+            "updated": ref.value.get("updated"),
         }
 
 
@@ -136,16 +197,20 @@ class Subject(Base, DictBase):
     def __repr__(self):
         return "{}: {}".format(self.id, json.dumps(self.value))
 
-    def to_return(self):
+    @classmethod
+    def get_return(cls, ref):
         return {
-            'id': self.id,
-            'name': self.value.get("name", ""),
-            'description': self.value.get("description", ""),
-            'email': self.value.get("email", ""),
-            'partner_id': self.value.get("partner_id", ""),
-            'policy_list': self.value.get("policy_list", [])
+            'id': ref.id,
+            'name': ref.value.get("name", ""),
+            'description': ref.value.get("description", ""),
+            'email': ref.value.get("email", ""),
+            'partner_id': ref.value.get("partner_id", ""),
+            'policy_list': ref.value.get("policy_list", [])
         }
 
+    def to_return(self):
+        return self.get_return(self)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -168,15 +233,19 @@ class Object(Base, DictBase):
             'value': self.value
         }
 
-    def to_return(self):
+    @classmethod
+    def get_return(cls, ref):
         return {
-            'id': self.id,
-            'name': self.value.get("name", ""),
-            'description': self.value.get("description", ""),
-            'partner_id': self.value.get("partner_id", ""),
-            'policy_list': self.value.get("policy_list", [])
+            'id': ref.id,
+            'name': ref.value.get("name", ""),
+            'description': ref.value.get("description", ""),
+            'partner_id': ref.value.get("partner_id", ""),
+            'policy_list': ref.value.get("policy_list", [])
         }
 
+    def to_return(self):
+        return self.get_return(self)
+
 
 class Action(Base, DictBase):
     __tablename__ = 'actions'
@@ -193,36 +262,84 @@ class Action(Base, DictBase):
             'value': self.value
         }
 
-    def to_return(self):
+    @classmethod
+    def get_return(cls, ref):
         return {
-            'id': self.id,
-            'name': self.value.get("name", ""),
-            'description': self.value.get("description", ""),
-            'partner_id': self.value.get("partner_id", ""),
-            'policy_list': self.value.get("policy_list", [])
+            'id': ref.id,
+            'name': ref.value.get("name", ""),
+            'description': ref.value.get("description", ""),
+            'partner_id': ref.value.get("partner_id", ""),
+            'policy_list': ref.value.get("policy_list", [])
         }
 
+    def to_return(self):
+        return self.get_return(self)
+
+
+class SubjectPolicy(Base, DictBase):
+    """Membership of a subject in a policy, kept in sync with its policy_list"""
+    __tablename__ = 'subject_policies'
+    __table_args__ = (
+        sql.Index("subject_policies_policy", "policy_id", "perimeter_id"),
+    )
+    attributes = ['perimeter_id', 'policy_id']
+    perimeter_id = sql.Column(sql.String(64), primary_key=True)
+    policy_id = sql.Column(sql.String(64), primary_key=True)
+
+
+class ObjectPolicy(Base, DictBase):
+    """Membership of an object in a policy, kept in sync with its policy_list"""
+    __tablename__ = 'object_policies'
+    __table_args__ = (
+        sql.Index("object_policies_policy", "policy_id", "perimeter_id"),
+    )
+    attributes = ['perimeter_id', 'policy_id']
+    perimeter_id = sql.Column(sql.String(64), primary_key=True)
+    policy_id = sql.Column(sql.String(64), primary_key=True)
+
+
+class ActionPolicy(Base, DictBase):
+    """Membership of an action in a policy, kept in sync with its policy_list"""
+    __tablename__ = 'action_policies'
+    __table_args__ = (
+        sql.Index("action_policies_policy", "policy_id", "perimeter_id"),
+    )
+    attributes = ['perimeter_id', 'policy_id']
+    perimeter_id = sql.Column(sql.String(64), primary_key=True)
+    policy_id = sql.Column(sql.String(64), primary_key=True)
+
+
+def get_membership_model(model):
+    return {Subject: SubjectPolicy, Object: ObjectPolicy, Action: ActionPolicy}[model]
+
 
 class SubjectData(Base, DictBase):
     __tablename__ = 'subject_data'
+    __table_args__ = (
+        sql.Index("subject_data_policy", "policy_id", "category_id"),
+    )
     attributes = ['id', 'value', 'category_id', 'policy_id']
     id = sql.Column(sql.String(64), primary_key=True)
     value = sql.Column(JsonBlob(), nullable=True)
     category_id = sql.Column(sql.ForeignKey("subject_categories.id"), nullable=False)
     policy_id = sql.Column(sql.ForeignKey("policies.id"), nullable=False)
 
-    def to_dict(self):
+    @classmethod
+    def get_dict(cls, ref):
         return {
-            'id': self.id,
-            'name': self.value.get("name", ""),
-            'description': self.value.get("description", ""),
-            'category_id': self.category_id,
-            'policy_id': self.policy_id
+            'id': ref.id,
+            'name': ref.value.get("name", ""),
+            'description': ref.value.get("description", ""),
+            'category_id': ref.category_id,
+            'policy_id': ref.policy_id
         }
 
 
 class ObjectData(Base, DictBase):
     __tablename__ = 'object_data'
+    __table_args__ = (
+        sql.Index("object_data_policy", "policy_id", "category_id"),
+    )
     attributes = ['id', 'value', 'category_id', 'policy_id']
     id = sql.Column(sql.String(64), primary_key=True)
     value = sql.Column(JsonBlob(), nullable=True)
@@ -232,6 +349,9 @@ class ObjectData(Base, DictBase):
 
 class ActionData(Base, DictBase):
     __tablename__ = 'action_data'
+    __table_args__ = (
+        sql.Index("action_data_policy", "policy_id", "category_id"),
+    )
     attributes = ['id', 'value', 'category_id', 'policy_id']
     id = sql.Column(sql.String(64), primary_key=True)
     value = sql.Column(JsonBlob(), nullable=True)
@@ -240,60 +360,66 @@ class ActionData(Base, DictBase):
 
 
 class SubjectAssignment(Base, DictBase):
+    """One data assigned to a subject in a category of a policy
+
+    The rows of the same (policy, subject, category) share an assignment_id,
+    their IDs keep the order in which the data were assigned.
+    """
     __tablename__ = 'subject_assignments'
-    attributes = ['id', 'assignments', 'policy_id', 'subject_id', 'category_id']
-    id = sql.Column(sql.String(64), primary_key=True)
-    assignments = sql.Column(JsonBlob(), nullable=True)
+    __table_args__ = (
+        sql.UniqueConstraint("policy_id", "subject_id", "category_id", "data_id", name="subject_assignments_unique"),
+        sql.Index("subject_assignments_id", "assignment_id"),
+        sql.Index("subject_assignments_data", "data_id"),
+    )
+    attributes = ['id', 'assignment_id', 'policy_id', 'subject_id', 'category_id', 'data_id']
+    id = sql.Column(sql.Integer, primary_key=True, autoincrement=True)
+    assignment_id = sql.Column(sql.String(64), nullable=False)
     policy_id = sql.Column(sql.ForeignKey("policies.id"), nullable=False)
     subject_id = sql.Column(sql.ForeignKey("subjects.id"), nullable=False)
     category_id = sql.Column(sql.ForeignKey("subject_categories.id"), nullable=False)
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "policy_id": self.policy_id,
-            "subject_id": self.subject_id,
-            "category_id": self.category_id,
-            "assignments": self.assignments,
-        }
+    data_id = sql.Column(sql.String(64), nullable=False)
 
 
 class ObjectAssignment(Base, DictBase):
+    """One data assigned to an object in a category of a policy
+
+    The rows of the same (policy, object, category) share an assignment_id,
+    their IDs keep the order in which the data were assigned.
+    """
     __tablename__ = 'object_assignments'
-    attributes = ['id', 'assignments', 'policy_id', 'object_id', 'category_id']
-    id = sql.Column(sql.String(64), primary_key=True)
-    assignments = sql.Column(JsonBlob(), nullable=True)
+    __table_args__ = (
+        sql.UniqueConstraint("policy_id", "object_id", "category_id", "data_id", name="object_assignments_unique"),
+        sql.Index("object_assignments_id", "assignment_id"),
+        sql.Index("object_assignments_data", "data_id"),
+    )
+    attributes = ['id', 'assignment_id', 'policy_id', 'object_id', 'category_id', 'data_id']
+    id = sql.Column(sql.Integer, primary_key=True, autoincrement=True)
+    assignment_id = sql.Column(sql.String(64), nullable=False)
     policy_id = sql.Column(sql.ForeignKey("policies.id"), nullable=False)
     object_id = sql.Column(sql.ForeignKey("objects.id"), nullable=False)
     category_id = sql.Column(sql.ForeignKey("object_categories.id"), nullable=False)
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "policy_id": self.policy_id,
-            "object_id": self.object_id,
-            "category_id": self.category_id,
-            "assignments": self.assignments,
-        }
+    data_id = sql.Column(sql.String(64), nullable=False)
 
 
 class ActionAssignment(Base, DictBase):
+    """One data assigned to an action in a category of a policy
+
+    The rows of the same (policy, action, category) share an assignment_id,
+    their IDs keep the order in which the data were assigned.
+    """
     __tablename__ = 'action_assignments'
-    attributes = ['id', 'assignments', 'policy_id', 'action_id', 'category_id']
-    id = sql.Column(sql.String(64), primary_key=True)
-    assignments = sql.Column(JsonBlob(), nullable=True)
+    __table_args__ = (
+        sql.UniqueConstraint("policy_id", "action_id", "category_id", "data_id", name="action_assignments_unique"),
+        sql.Index("action_assignments_id", "assignment_id"),
+        sql.Index("action_assignments_data", "data_id"),
+    )
+    attributes = ['id', 'assignment_id', 'policy_id', 'action_id', 'category_id', 'data_id']
+    id = sql.Column(sql.Integer, primary_key=True, autoincrement=True)
+    assignment_id = sql.Column(sql.String(64), nullable=False)
     policy_id = sql.Column(sql.ForeignKey("policies.id"), nullable=False)
     action_id = sql.Column(sql.ForeignKey("actions.id"), nullable=False)
     category_id = sql.Column(sql.ForeignKey("action_categories.id"), nullable=False)
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "policy_id": self.policy_id,
-            "action_id": self.action_id,
-            "category_id": self.category_id,
-            "assignments": self.assignments,
-        }
+    data_id = sql.Column(sql.String(64), nullable=False)
 
 
 class MetaRule(Base, DictBase):
@@ -302,45 +428,269 @@ class MetaRule(Base, DictBase):
     id = sql.Column(sql.String(64), primary_key=True)
     value = sql.Column(JsonBlob(), nullable=True)
 
-    def to_dict(self):
+    @classmethod
+    def get_dict(cls, ref):
         return {
-            "name": self.value["name"],
-            "description": self.value.get("description", ""),
-            "subject_categories": self.value.get("subject_categories", list()),
-            "object_categories": self.value.get("object_categories", list()),
-            "action_categories": self.value.get("action_categories", list()),
+            "name": ref.value["name"],
+            "description": ref.value.get("description", ""),
+            "subject_categories": ref.value.get("subject_categories", list()),
+            "object_categories": ref.value.get("object_categories", list()),
+            "action_categories": ref.value.get("action_categories", list()),
         }
 
 
 class Rule(Base, DictBase):
     __tablename__ = 'rules'
-    attributes = ['id', 'rule', 'policy_id', 'meta_rule_id']
+    __table_args__ = (
+        sql.Index("rules_hash", "policy_id", "meta_rule_id", "hash", unique=True),
+    )
+    attributes = ['id', 'rule', 'policy_id', 'meta_rule_id', 'hash']
     id = sql.Column(sql.String(64), primary_key=True)
     rule = sql.Column(JsonBlob(), nullable=True)
     policy_id = sql.Column(sql.ForeignKey("policies.id"), nullable=False)
     meta_rule_id = sql.Column(sql.ForeignKey("meta_rules.id"), nullable=False)
+    hash = sql.Column(sql.String(64), nullable=True)
 
-    def to_dict(self):
+    @classmethod
+    def get_dict(cls, ref):
         return {
-            'id': self.id,
-            'rule': self.rule["rule"],
-            'instructions': self.rule["instructions"],
-            'enabled': self.rule["enabled"],
-            'policy_id': self.policy_id,
-            'meta_rule_id': self.meta_rule_id
+            'id': ref.id,
+            'rule': ref.rule["rule"],
+            'instructions': ref.rule["instructions"],
+            'enabled': ref.rule["enabled"],
+            'policy_id': ref.policy_id,
+            'meta_rule_id': ref.meta_rule_id
         }
 
     def __repr__(self):
         return "{}".format(self.rule)
 
 
+def get_rule_hash(value):
+    """Get the canonical hash of a rule, two rules with the same hash are duplicates"""
+    content = {key: value.get(key) for key in ("rule", "instructions", "enabled")}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_assignment_dicts(perimeter_key, refs):
+    """Group the rows of assignments by assignment ID
+
+    :param perimeter_key: subject_id, object_id or action_id
+    :param refs: SubjectAssignment, ObjectAssignment or ActionAssignment rows
+    :return: dictionary assignment ID => {"id", "policy_id", perimeter_key, "category_id", "assignments"}
+    """
+    results = {}
+    for ref in sorted(refs, key=lambda _ref: (_ref.assignment_id, _ref.id)):
+        if ref.assignment_id not in results:
+            results[ref.assignment_id] = {
+                "id": ref.assignment_id,
+                "policy_id": ref.policy_id,
+                perimeter_key: getattr(ref, perimeter_key),
+                "category_id": ref.category_id,
+                "assignments": [],
+            }
+        results[ref.assignment_id]["assignments"].append(ref.data_id)
+    return results
+
+
+def get_chunks(items, size=500):
+    """Split a list so that each IN clause stays under the limits of the database"""
+    items = list(items)
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+# Note: a temporary table is only seen by the connection which created it,
+# it is not part of Base so that create_all and the migrations ignore it
+id_map = sql.Table(
+    "id_map", sql.MetaData(),
+    sql.Column("old_id", sql.String(64), primary_key=True),
+    sql.Column("new_id", sql.String(64), nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+class Version(Base, DictBase):
+    __tablename__ = 'versions'
+    attributes = ['id', 'value']
+    id = sql.Column(sql.String(128), primary_key=True)
+    value = sql.Column(sql.String(64), nullable=False)
+
+
+# Note: the version of a collection which has never been written, the versions are only created by the writes
+DEFAULT_VERSION = "0"
+
+
+def get_version_keys(ref):
+    """Get the keys of the collections changed when ref is written"""
+    if isinstance(ref, PDP):
+        return "pdp",
+    if isinstance(ref, Policy):
+        return "policies",
+    if isinstance(ref, Model):
+        return "models",
+    if isinstance(ref, MetaRule):
+        return "meta_rules",
+    if isinstance(ref, Rule):
+        return "rules:{}".format(ref.policy_id),
+    return ()
+
+
+def set_versions(session, keys):
+    """Give a new version to the collections in the transaction of session"""
+    for key in keys:
+        session.merge(Version(id=key, value=uuid4().hex))
+
+
+@sql.event.listens_for(Session, "before_flush")
+def update_versions(session, flush_context, instances):
+    keys = set()
+    for ref in list(session.new) + list(session.dirty) + list(session.deleted):
+        keys.update(get_version_keys(ref))
+    set_versions(session, keys)
+
+
+def set_memberships(session, model, perimeter_ids):
+    """Write the policies of perimeter elements in their membership table
+
+    Core statements are used as this is also called while flushing.
+
+    :param model: Subject, Object or Action
+    :param perimeter_ids: dictionary perimeter ID => policy_list
+    """
+    table = get_membership_model(model).__table__
+    for chunk in get_chunks(perimeter_ids):
+        session.execute(table.delete().where(table.c.perimeter_id.in_(chunk)))
+    rows = [{"perimeter_id": _id, "policy_id": policy_id}
+            for _id, policy_list in perimeter_ids.items() for policy_id in set(policy_list or [])]
+    if rows:
+        session.execute(table.insert(), rows)
+
+
+@sql.event.listens_for(Session, "before_flush")
+def update_memberships(session, flush_context, instances):
+    perimeter_ids = {Subject: {}, Object: {}, Action: {}}
+    for ref in list(session.new) + list(session.dirty):
+        if type(ref) in perimeter_ids and (ref in session.new or session.is_modified(ref)):
+            perimeter_ids[type(ref)][ref.id] = ref.value.get("policy_list")
+    for ref in session.deleted:
+        if type(ref) in perimeter_ids:
+            perimeter_ids[type(ref)][ref.id] = []
+    for model, ids in perimeter_ids.items():
+        if ids:
+            set_memberships(session, model, ids)
+
+
+def delete_policies(session, policy_ids):
+    """Delete policies with their data, perimeter, assignments and rules
+
+    Set-based statements are used, only the perimeter elements which stay in
+    other policies and the PDPs of the policies are rewritten. An element of
+    the perimeter which is in no other policy is deleted.
+    """
+    for chunk in get_chunks(policy_ids):
+        for model in (Rule, SubjectAssignment, ObjectAssignment, ActionAssignment, SubjectData, ObjectData, ActionData):
+            table = model.__table__
+            session.execute(table.delete().where(table.c.policy_id.in_(chunk)))
+        for model, assignment_model, perimeter_key in ((Subject, SubjectAssignment, "subject_id"),
+                                                       (Object, ObjectAssignment, "object_id"),
+                                                       (Action, ActionAssignment, "action_id")):
+            table = model.__table__
+            membership = get_membership_model(model).__table__
+            members = sql.select([membership.c.perimeter_id]).where(membership.c.policy_id.in_(chunk))
+            others = sql.select([membership.c.perimeter_id]).where(~membership.c.policy_id.in_(chunk))
+            rows = session.execute(sql.select([table]).where(sql.and_(table.c.id.in_(members),
+                                                                       table.c.id.in_(others)))).fetchall()
+            if rows:
+                session.execute(table.update().where(table.c.id == sql.bindparam("perimeter_id")), [{
+                    "perimeter_id": row.id,
+                    "value": dict(row.value, policy_list=[_id for _id in row.value.get("policy_list") or []
+                                                          if _id not in chunk]),
+                } for row in rows])
+            orphans = sql.select([membership.c.perimeter_id]).where(sql.and_(
+                membership.c.policy_id.in_(chunk), ~membership.c.perimeter_id.in_(others)))
+            assignments = assignment_model.__table__
+            session.execute(assignments.delete().where(assignments.c[perimeter_key].in_(orphans)))
+            session.execute(table.delete().where(table.c.id.in_(orphans)))
+            session.execute(membership.delete().where(membership.c.policy_id.in_(chunk)))
+        for ref in session.query(PDP):
+            pipeline = ref.value.get("security_pipeline") or []
+            if set(pipeline) & set(chunk):
+                setattr(ref, "value", dict(ref.value, security_pipeline=[_id for _id in pipeline if _id not in chunk]))
+        table = Policy.__table__
+        session.execute(table.delete().where(table.c.id.in_(chunk)))
+        set_versions(session, ["policies"] + ["rules:{}".format(_id) for _id in chunk])
+
+
+def delete_meta_rules(session, meta_rule_ids):
+    """Delete meta rules with the rules of all the policies using them"""
+    table = Rule.__table__
+    for chunk in get_chunks(meta_rule_ids):
+        query = sql.select([table.c.policy_id]).where(table.c.meta_rule_id.in_(chunk)).distinct()
+        policy_ids = [_id for _id, in session.execute(query)]
+        session.execute(table.delete().where(table.c.meta_rule_id.in_(chunk)))
+        session.execute(MetaRule.__table__.delete().where(MetaRule.__table__.c.id.in_(chunk)))
+        set_versions(session, ["meta_rules"] + ["rules:{}".format(_id) for _id in policy_ids])
+
+
+def get_meta_rule_ids(model_value):
+    meta_rules = model_value.get("meta_rules") or []
+    return meta_rules if isinstance(meta_rules, list) else [meta_rules, ]
+
+
+@sql.event.listens_for(Engine, "before_cursor_execute")
+def start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info["statement_start"] = time.time()
+
+
+@sql.event.listens_for(Engine, "after_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    metrics.add_statement(time.time() - conn.info["statement_start"])
+
+
+__engines = {}
+__engines_lock = threading.Lock()
+__operations = threading.local()
+__read_failures = {}
+session_factory = sessionmaker()
+
+
+def get_engine(url):
+    """Get the engine, and so the connection pool, shared by the connectors of a database URL
+
+    The pool is set by the pool_size, max_overflow, pool_timeout,
+    pool_recycle and pool_pre_ping keys of the database configuration.
+    """
+    with __engines_lock:
+        if url not in __engines:
+            db_conf = configuration.get_configuration("database")['database']
+            pool_options = {key: db_conf[key] for key in ("pool_size", "max_overflow", "pool_timeout", "pool_recycle")
+                            if key in db_conf}
+            pool_options["pool_pre_ping"] = db_conf.get("pool_pre_ping", True)
+            __engines[url] = create_engine(url, echo=DEBUG, **pool_options)
+        return __engines[url]
+
+
+def get_operation_sessions():
+    if not hasattr(__operations, "sessions"):
+        __operations.sessions = {}
+    return __operations.sessions
+
+
 @contextmanager
 def session_scope(engine):
-    """Provide a transactional scope around a series of operations."""
+    """Provide a transactional scope around a series of operations.
+
+    Inside an operation_scope of the same engine, the session of the
+    operation is reused and committed when the operation ends.
+    """
     if type(engine) is str:
-        echo = DEBUG
-        engine = create_engine(engine, echo=echo)
-    session = sessionmaker(bind=engine)()
+        engine = get_engine(engine)
+    sessions = get_operation_sessions()
+    if engine in sessions:
+        yield sessions[engine]
+        return
+    session = session_factory(bind=engine)
     try:
         yield session
         session.commit()
@@ -351,13 +701,68 @@ def session_scope(engine):
         session.close()
 
 
+@contextmanager
+def operation_scope(engine):
+    """Share one session, and so one connection and transaction, between
+    the session scopes opened by the current thread in the block"""
+    sessions = get_operation_sessions()
+    if engine in sessions:
+        yield sessions[engine]
+        return
+    with session_scope(engine) as session:
+        sessions[engine] = session
+        try:
+            yield session
+        finally:
+            del sessions[engine]
+
+
+@contextmanager
+def read_session_scope(connection):
+    """Provide a session on a connection checked out of a read replica"""
+    try:
+        with session_scope(connection) as session:
+            yield session
+    finally:
+        connection.close()
+
+
+def get_read_connection(engines, counter, primary):
+    """Connect to the next read replica which answers, or else to the primary
+
+    A replica which has failed is skipped during read_retry_delay seconds
+    (default 30) of the database configuration.
+    """
+    db_conf = configuration.get_configuration("database")['database']
+    retry_delay = db_conf.get("read_retry_delay", 30)
+    for _ in range(len(engines)):
+        engine = engines[next(counter) % len(engines)]
+        if time.time() - __read_failures.get(engine, 0) < retry_delay:
+            continue
+        try:
+            return engine.connect()
+        except sql.exc.DBAPIError as e:
+            logger.warning("Read replica {} is not available: {}".format(engine.url.host or engine.url.database, e))
+            __read_failures[engine] = time.time()
+    return primary.connect()
+
+
 class BaseConnector(object):
     """Provide a base connector to connect them all"""
     engine = ""
+    read_engines = []
 
     def __init__(self, engine_name):
-        echo = DEBUG
-        self.engine = create_engine(engine_name, echo=echo)
+        self.engine = get_engine(engine_name)
+        db_conf = configuration.get_configuration("database")['database']
+        if engine_name == db_conf.get('url'):
+            self.read_engines = [get_engine(url) for url in db_conf.get("read_urls", [])]
+        self.__read_counter = itertools.count()
+
+    def dispose(self):
+        self.engine.dispose()
+        for engine in self.read_engines:
+            engine.dispose()
 
     def init_db(self):
         Base.metadata.create_all(self.engine)
@@ -368,12 +773,32 @@ class BaseConnector(object):
     def get_session(self):
         return session_scope(self.engine)
 
+    def operation(self):
+        """Run all the calls made to the connectors in the block in one session"""
+        return operation_scope(self.engine)
+
     def get_session_for_read(self):
-        return self.get_session()
+        """Get a session on a read replica, round-robin
+
+        The primary is used when no replica is configured or answers, and
+        inside an operation so that it reads its own writes.
+        """
+        if not self.read_engines or self.engine in get_operation_sessions():
+            return self.get_session()
+        return read_session_scope(get_read_connection(self.read_engines, self.__read_counter, self.engine))
 
     def get_session_for_write(self):
         return self.get_session()
 
+    def get_version(self, key):
+        return self.get_versions((key, ))[key]
+
+    def get_versions(self, keys):
+        with self.get_session_for_read() as session:
+            query = session.query(Version.id, Version.value).filter(Version.id.in_(keys))
+            versions = {key: value for key, value in query}
+        return {key: versions.get(key, DEFAULT_VERSION) for key in keys}
+
 
 class PDPConnector(BaseConnector, PDPDriver):
 
@@ -410,6 +835,38 @@ class PDPConnector(BaseConnector, PDPDriver):
             ref_list = query.all()
             return {_ref.id: _ref.to_dict() for _ref in ref_list}
 
+    def get_jobs(self, job_id=None):
+        with self.get_session_for_read() as session:
+            query = session.query(Job)
+            if job_id:
+                query = query.filter_by(id=job_id)
+            ref_list = query.all()
+            return {_ref.id: _ref.to_dict() for _ref in ref_list}
+
+    def add_job(self, job_id, value):
+        with self.get_session_for_write() as session:
+            new = Job.from_dict({
+                "id": job_id,
+                "value": value
+            })
+            session.add(new)
+            return {new.id: new.to_dict()}
+
+    def update_job(self, job_id, value):
+        with self.get_session_for_write() as session:
+            ref = session.query(Job).get(job_id)
+            d = dict(ref.value)
+            d.update(value)
+            setattr(ref, "value", d)
+            return {ref.id: ref.to_dict()}
+
+    def delete_jobs(self, job_ids):
+        with self.get_session_for_write() as session:
+            count = 0
+            for chunk in get_chunks(job_ids):
+                count += session.query(Job).filter(Job.id.in_(chunk)).delete(synchronize_session=False)
+            return count
+
 
 class PolicyConnector(BaseConnector, PolicyDriver):
 
@@ -426,8 +883,7 @@ class PolicyConnector(BaseConnector, PolicyDriver):
 
     def delete_policy(self, policy_id):
         with self.get_session_for_write() as session:
-            ref = session.query(Policy).get(policy_id)
-            session.delete(ref)
+            delete_policies(session, [policy_id, ])
 
     def add_policy(self, policy_id=None, value=None):
         with self.get_session_for_write() as session:
@@ -446,26 +902,98 @@ class PolicyConnector(BaseConnector, PolicyDriver):
             ref_list = query.all()
             return {_ref.id: _ref.to_dict() for _ref in ref_list}
 
-    def get_subjects(self, policy_id, perimeter_id=None):
+    def __get_perimeter(self, model, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        """Get the subjects, objects or actions ordered by ID
+
+        :param model: Subject, Object or Action
+        :param name: only return the element with that name
+        :param ids: only return the elements with those IDs
+        :param limit: maximum number of elements to return
+        :param marker: only return the elements with an ID greater than marker
+        """
+        if perimeter_id and not policy_id:
+            return {}
+        table = model.__table__
+        query = sql.select([table])
+        if perimeter_id:
+            query = query.where(table.c.id == perimeter_id)
+        if ids:
+            query = query.where(table.c.id.in_(ids))
+        if policy_id:
+            membership = get_membership_model(model).__table__
+            query = query.select_from(table.join(membership, membership.c.perimeter_id == table.c.id))
+            query = query.where(membership.c.policy_id == policy_id)
+        if name is not None:
+            query = query.where(json_like(table.c.value, json.dumps({"name": name})[1:-1]))
+        query = query.order_by(table.c.id)
         with self.get_session_for_read() as session:
-            query = session.query(Subject)
-            ref_list = copy.deepcopy(query.all())
-            if perimeter_id:
-                for _ref in ref_list:
-                    _ref_value = _ref.to_return()
-                    if perimeter_id == _ref.id:
-                        if policy_id and policy_id in _ref_value["policy_list"]:
-                            return {_ref.id: _ref_value}
-                        else:
-                            return {}
-            elif policy_id:
-                results = []
-                for _ref in ref_list:
-                    _ref_value = _ref.to_return()
-                    if policy_id in _ref_value["policy_list"]:
-                        results.append(_ref)
-                return {_ref.id: _ref.to_return() for _ref in results}
-            return {_ref.id: _ref.to_return() for _ref in ref_list}
+            results = {}
+            while True:
+                page = query
+                if marker:
+                    page = page.where(table.c.id > marker)
+                if limit:
+                    page = page.limit(limit)
+                rows = session.execute(page).fetchall()
+                for row in rows:
+                    _value = model.get_return(row)
+                    if name is not None and _value["name"] != name:
+                        continue
+                    results[row.id] = _value
+                    if limit and len(results) >= limit:
+                        return results
+                if not limit or len(rows) < limit:
+                    return results
+                # Note: some rows only matched the LIKE pre-filter of the name, read the next page
+                marker = rows[-1].id
+
+    def __set_perimeters(self, model, policy_id, values):
+        """Add several subjects, objects or actions to a policy in one transaction
+
+        An element whose ID already exists is only added to the policy.
+
+        :param model: Subject, Object or Action
+        :param values: list of values, with an optional "id"
+        :return: list of {"id": perimeter ID, "added": False if the element already existed}
+        """
+        with self.get_session_for_write() as session:
+            ids = [value.get("id") or uuid4().hex for value in values]
+            refs = {}
+            for chunk in get_chunks(set(ids)):
+                for ref in session.query(model).filter(model.id.in_(chunk)):
+                    refs[ref.id] = ref
+            new_refs = {}
+            results = []
+            for perimeter_id, value in zip(ids, values):
+                ref = refs.get(perimeter_id)
+                if ref:
+                    policy_list = ref.value.get("policy_list") or []
+                    if policy_id not in policy_list:
+                        setattr(ref, "value", dict(ref.value, policy_list=policy_list + [policy_id, ]))
+                elif perimeter_id not in new_refs:
+                    _value = {key: item for key, item in value.items() if key != "id"}
+                    _value["policy_list"] = [policy_id, ]
+                    new_refs[perimeter_id] = {"id": perimeter_id, "value": _value}
+                    results.append({"id": perimeter_id, "added": True})
+                    continue
+                results.append({"id": perimeter_id, "added": False})
+            for chunk in get_chunks(list(new_refs.values())):
+                session.bulk_insert_mappings(model, chunk)
+            set_memberships(session, model, {_id: [policy_id, ] for _id in new_refs})
+            return results
+
+    def get_subjects(self, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        return self.__get_perimeter(Subject, policy_id, perimeter_id=perimeter_id, name=name,
+                                    ids=ids, limit=limit, marker=marker)
+
+    def get_subjects_by_names(self, names):
+        """Get a subject for each of those names which is used, whatever its policies
+
+        :return: dictionary name => subject
+        """
+        with self.get_session_for_read() as session:
+            refs = self.__get_import_perimeter(session, Subject, (), set(names))[1]
+            return {name: ref.to_return() for name, ref in refs.items()}
 
     def set_subject(self, policy_id, perimeter_id=None, value=None):
         _subject = None
@@ -513,26 +1041,12 @@ class PolicyConnector(BaseConnector, PolicyDriver):
                 if not _subject.value["policy_list"]:
                     session.delete(_subject)
 
-    def get_objects(self, policy_id, perimeter_id=None):
-        with self.get_session_for_read() as session:
-            query = session.query(Object)
-            ref_list = copy.deepcopy(query.all())
-            if perimeter_id:
-                for _ref in ref_list:
-                    _ref_value = _ref.to_return()
-                    if perimeter_id == _ref.id:
-                        if policy_id and policy_id in _ref_value["policy_list"]:
-                            return {_ref.id: _ref_value}
-                        else:
-                            return {}
-            elif policy_id:
-                results = []
-                for _ref in ref_list:
-                    _ref_value = _ref.to_return()
-                    if policy_id in _ref_value["policy_list"]:
-                        results.append(_ref)
-                return {_ref.id: _ref.to_return() for _ref in results}
-            return {_ref.id: _ref.to_return() for _ref in ref_list}
+    def set_subjects(self, policy_id, values):
+        return self.__set_perimeters(Subject, policy_id, values)
+
+    def get_objects(self, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        return self.__get_perimeter(Object, policy_id, perimeter_id=perimeter_id, name=name,
+                                    ids=ids, limit=limit, marker=marker)
 
     def set_object(self, policy_id, perimeter_id=None, value=None):
         _object = None
@@ -580,26 +1094,12 @@ class PolicyConnector(BaseConnector, PolicyDriver):
                 if not _object.value["policy_list"]:
                     session.delete(_object)
 
-    def get_actions(self, policy_id, perimeter_id=None):
-        with self.get_session_for_read() as session:
-            query = session.query(Action)
-            ref_list = copy.deepcopy(query.all())
-            if perimeter_id:
-                for _ref in ref_list:
-                    _ref_value = _ref.to_return()
-                    if perimeter_id == _ref.id:
-                        if policy_id and policy_id in _ref_value["policy_list"]:
-                            return {_ref.id: _ref_value}
-                        else:
-                            return {}
-            elif policy_id:
-                results = []
-                for _ref in ref_list:
-                    _ref_value = _ref.to_return()
-                    if policy_id in _ref_value["policy_list"]:
-                        results.append(_ref)
-                return {_ref.id: _ref.to_return() for _ref in results}
-            return {_ref.id: _ref.to_return() for _ref in ref_list}
+    def set_objects(self, policy_id, values):
+        return self.__set_perimeters(Object, policy_id, values)
+
+    def get_actions(self, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        return self.__get_perimeter(Action, policy_id, perimeter_id=perimeter_id, name=name,
+                                    ids=ids, limit=limit, marker=marker)
 
     def set_action(self, policy_id, perimeter_id=None, value=None):
         _action = None
@@ -647,22 +1147,56 @@ class PolicyConnector(BaseConnector, PolicyDriver):
                 if not _action.value["policy_list"]:
                     session.delete(_action)
 
-    def get_subject_data(self, policy_id, data_id=None, category_id=None):
-        logger.info("driver {} {} {}".format(policy_id, data_id, category_id))
+    def set_actions(self, policy_id, values):
+        return self.__set_perimeters(Action, policy_id, values)
+
+    def __set_data_list(self, model, policy_id, category_id, values):
+        """Add several data to a category of a policy in one transaction
+
+        :param model: SubjectData, ObjectData or ActionData
+        :param values: list of values, with an optional "id"
+        :return: list of {"id": data ID, "added": False if the data already existed}
+        """
+        with self.get_session_for_write() as session:
+            ids = [value.get("id") or uuid4().hex for value in values]
+            existing_ids = set()
+            for chunk in get_chunks(set(ids)):
+                existing_ids.update(_id for _id, in session.query(model.id).filter(model.id.in_(chunk)))
+            new_refs = []
+            results = []
+            for data_id, value in zip(ids, values):
+                added = data_id not in existing_ids
+                if added:
+                    existing_ids.add(data_id)
+                    new_refs.append({
+                        "id": data_id,
+                        "value": {key: item for key, item in value.items() if key != "id"},
+                        "category_id": category_id,
+                        "policy_id": policy_id,
+                    })
+                results.append({"id": data_id, "added": added})
+            for chunk in get_chunks(new_refs):
+                session.bulk_insert_mappings(model, chunk)
+            return results
+
+    def __get_data(self, model, policy_id, data_id=None, category_id=None):
+        """Get the subject, object or action data of a category of a policy"""
+        table = model.__table__
+        query = sql.select([table]).where(table.c.policy_id == policy_id)
+        query = query.where(table.c.category_id == category_id)
+        if data_id:
+            query = query.where(table.c.id == data_id)
         with self.get_session_for_read() as session:
-            query = session.query(SubjectData)
-            if data_id:
-                query = query.filter_by(policy_id=policy_id, id=data_id, category_id=category_id)
-            else:
-                query = query.filter_by(policy_id=policy_id, category_id=category_id)
-            ref_list = query.all()
-            logger.info("ref_list={}".format(ref_list))
+            rows = session.execute(query.execution_options(stream_results=True))
             return {
                 "policy_id": policy_id,
                 "category_id": category_id,
-                "data": {_ref.id: _ref.to_dict() for _ref in ref_list}
+                "data": {row.id: model.get_dict(row) for row in rows}
             }
 
+    def get_subject_data(self, policy_id, data_id=None, category_id=None):
+        return self.__get_data(SubjectData, policy_id, data_id=data_id, category_id=category_id)
+
     def set_subject_data(self, policy_id, data_id=None, category_id=None, value=None):
         with self.get_session_for_write() as session:
             query = session.query(SubjectData)
@@ -698,19 +1232,11 @@ class PolicyConnector(BaseConnector, PolicyDriver):
             if ref:
                 session.delete(ref)
 
+    def set_subject_data_list(self, policy_id, category_id, values):
+        return self.__set_data_list(SubjectData, policy_id, category_id, values)
+
     def get_object_data(self, policy_id, data_id=None, category_id=None):
-        with self.get_session_for_read() as session:
-            query = session.query(ObjectData)
-            if data_id:
-                query = query.filter_by(policy_id=policy_id, id=data_id, category_id=category_id)
-            else:
-                query = query.filter_by(policy_id=policy_id, category_id=category_id)
-            ref_list = query.all()
-            return {
-                "policy_id": policy_id,
-                "category_id": category_id,
-                "data": {_ref.id: _ref.to_dict() for _ref in ref_list}
-            }
+        return self.__get_data(ObjectData, policy_id, data_id=data_id, category_id=category_id)
 
     def set_object_data(self, policy_id, data_id=None, category_id=None, value=None):
         with self.get_session_for_write() as session:
@@ -747,19 +1273,11 @@ class PolicyConnector(BaseConnector, PolicyDriver):
             if ref:
                 session.delete(ref)
 
+    def set_object_data_list(self, policy_id, category_id, values):
+        return self.__set_data_list(ObjectData, policy_id, category_id, values)
+
     def get_action_data(self, policy_id, data_id=None, category_id=None):
-        with self.get_session_for_read() as session:
-            query = session.query(ActionData)
-            if data_id:
-                query = query.filter_by(policy_id=policy_id, id=data_id, category_id=category_id)
-            else:
-                query = query.filter_by(policy_id=policy_id, category_id=category_id)
-            ref_list = query.all()
-            return {
-                "policy_id": policy_id,
-                "category_id": category_id,
-                "data": {_ref.id: _ref.to_dict() for _ref in ref_list}
-            }
+        return self.__get_data(ActionData, policy_id, data_id=data_id, category_id=category_id)
 
     def set_action_data(self, policy_id, data_id=None, category_id=None, value=None):
         with self.get_session_for_write() as session:
@@ -796,204 +1314,247 @@ class PolicyConnector(BaseConnector, PolicyDriver):
             if ref:
                 session.delete(ref)
 
-    def get_subject_assignments(self, policy_id, subject_id=None, category_id=None):
+    def set_action_data_list(self, policy_id, category_id, values):
+        return self.__set_data_list(ActionData, policy_id, category_id, values)
+
+    def __get_assignments(self, model, perimeter_key, policy_id, perimeter_id=None, category_id=None, data_id=None,
+                          ids=None, limit=None, marker=None):
+        """Get the subject, object or action assignments ordered by ID
+
+        :param data_id: only return the assignments holding that data
+        """
+        table = model.__table__
+        query = sql.select([table]).where(table.c.policy_id == policy_id)
+        if perimeter_id:
+            query = query.where(table.c[perimeter_key] == perimeter_id)
+        if category_id:
+            query = query.where(table.c.category_id == category_id)
+        if ids:
+            query = query.where(table.c.assignment_id.in_(ids))
+        if marker:
+            query = query.where(table.c.assignment_id > marker)
+        with self.get_session_for_read() as session:
+            if not data_id and not limit:
+                return get_assignment_dicts(perimeter_key, session.execute(query.execution_options(stream_results=True)))
+            id_query = query.with_only_columns([table.c.assignment_id])
+            if data_id:
+                id_query = id_query.where(table.c.data_id == data_id)
+            id_query = id_query.distinct().order_by(table.c.assignment_id)
+            if limit:
+                id_query = id_query.limit(limit)
+            rows = []
+            for chunk in get_chunks([_id for _id, in session.execute(id_query)]):
+                rows.extend(session.execute(sql.select([table]).where(table.c.assignment_id.in_(chunk))))
+            return get_assignment_dicts(perimeter_key, rows)
+
+    def __add_assignment(self, model, perimeter_key, policy_id, perimeter_id, category_id, data_id):
         with self.get_session_for_write() as session:
-            query = session.query(SubjectAssignment)
-            if subject_id and category_id:
-                query = query.filter_by(policy_id=policy_id, subject_id=subject_id, category_id=category_id)
-            elif subject_id:
-                query = query.filter_by(policy_id=policy_id, subject_id=subject_id)
-            else:
-                query = query.filter_by(policy_id=policy_id)
-            ref_list = query.all()
-            return {_ref.id: _ref.to_dict() for _ref in ref_list}
+            keys = {"policy_id": policy_id, perimeter_key: perimeter_id, "category_id": category_id}
+            ref_list = session.query(model).filter_by(**keys).all()
+            if data_id not in [_ref.data_id for _ref in ref_list]:
+                ref = model.from_dict(dict(
+                    keys,
+                    assignment_id=ref_list[0].assignment_id if ref_list else uuid4().hex,
+                    data_id=data_id))
+                session.add(ref)
+                session.flush()
+                ref_list.append(ref)
+            return get_assignment_dicts(perimeter_key, ref_list)
 
-    def add_subject_assignment(self, policy_id, subject_id, category_id, data_id):
+    def __delete_assignment(self, model, perimeter_key, policy_id, perimeter_id, category_id, data_id):
         with self.get_session_for_write() as session:
-            query = session.query(SubjectAssignment)
-            query = query.filter_by(policy_id=policy_id, subject_id=subject_id, category_id=category_id)
-            ref = query.first()
-            if ref:
-                old_ref = copy.deepcopy(ref.to_dict())
-                assignments = old_ref["assignments"]
-                if data_id not in assignments:
-                    assignments.append(data_id)
-                    setattr(ref, "assignments", assignments)
-            else:
-                ref = SubjectAssignment.from_dict(
-                    {
-                        "id": uuid4().hex,
-                        "policy_id": policy_id,
-                        "subject_id": subject_id,
-                        "category_id": category_id,
-                        "assignments": [data_id, ],
-                    }
-                )
-                session.add(ref)
-            return {ref.id: ref.to_dict()}
+            # TODO (asteroide): if data_id is None, delete all
+            query = session.query(model).filter_by(policy_id=policy_id, category_id=category_id, data_id=data_id)
+            query.filter(getattr(model, perimeter_key) == perimeter_id).delete(synchronize_session=False)
 
-    def delete_subject_assignment(self, policy_id, subject_id, category_id, data_id):
+    def __add_assignments(self, model, perimeter_key, policy_id, assignments):
+        """Add (perimeter, category, data) tuples to the assignments of a policy
+
+        The rows of all the tuples are read and written in one transaction,
+        a data already assigned is left untouched.
+
+        :return: list of {"id": assignment ID, "added": False if the data was already assigned}
+        """
+        perimeter_column = getattr(model, perimeter_key)
         with self.get_session_for_write() as session:
-            query = session.query(SubjectAssignment)
-            query = query.filter_by(policy_id=policy_id, subject_id=subject_id, category_id=category_id)
-            ref = query.first()
-            if ref:
-                old_ref = copy.deepcopy(ref.to_dict())
-                assignments = old_ref["assignments"]
-                # TODO (asteroide): if data_id is None, delete all
-                if data_id in assignments:
-                    assignments.remove(data_id)
-                    # FIXME (asteroide): the setattr doesn't work here ; the assignments is not updated in the database
-                    setattr(ref, "assignments", assignments)
-                if not assignments:
-                    session.delete(ref)
-
-    def get_object_assignments(self, policy_id, object_id=None, category_id=None):
+            assignment_ids = {}
+            data_ids = set()
+            for chunk in get_chunks(set(_item[perimeter_key] for _item in assignments)):
+                query = session.query(model).filter(model.policy_id == policy_id, perimeter_column.in_(chunk))
+                for ref in query:
+                    key = (getattr(ref, perimeter_key), ref.category_id)
+                    assignment_ids[key] = ref.assignment_id
+                    data_ids.add(key + (ref.data_id, ))
+            new_refs = []
+            results = []
+            for item in assignments:
+                key = (item[perimeter_key], item["category_id"])
+                assignment_id = assignment_ids.setdefault(key, uuid4().hex)
+                added = key + (item["data_id"], ) not in data_ids
+                if added:
+                    data_ids.add(key + (item["data_id"], ))
+                    new_refs.append({
+                        "assignment_id": assignment_id,
+                        "policy_id": policy_id,
+                        perimeter_key: key[0],
+                        "category_id": key[1],
+                        "data_id": item["data_id"],
+                    })
+                results.append({"id": assignment_id, "added": added})
+            for chunk in get_chunks(new_refs):
+                session.bulk_insert_mappings(model, chunk)
+            return results
+
+    def __delete_assignments(self, model, perimeter_key, policy_id, assignments):
+        """Remove (perimeter, category, data) tuples from the assignments of a policy
+
+        :return: list of {"deleted": False if the data was not assigned}
+        """
+        perimeter_column = getattr(model, perimeter_key)
         with self.get_session_for_write() as session:
-            query = session.query(ObjectAssignment)
-            if object_id and category_id:
-                query = query.filter_by(policy_id=policy_id, object_id=object_id, category_id=category_id)
-            elif object_id:
-                query = query.filter_by(policy_id=policy_id, object_id=object_id)
-            else:
-                query = query.filter_by(policy_id=policy_id)
-            ref_list = query.all()
-            return {_ref.id: _ref.to_dict() for _ref in ref_list}
+            data_ids = set()
+            for chunk in get_chunks(set(_item[perimeter_key] for _item in assignments)):
+                query = session.query(perimeter_column, model.category_id, model.data_id)
+                data_ids.update(query.filter(model.policy_id == policy_id, perimeter_column.in_(chunk)))
+            deleted_ids = {}
+            results = []
+            for item in assignments:
+                key = (item[perimeter_key], item["category_id"], item["data_id"])
+                deleted = key in data_ids
+                if deleted:
+                    data_ids.remove(key)
+                    deleted_ids.setdefault(key[:2], []).append(key[2])
+                results.append({"deleted": deleted})
+            for (perimeter_id, category_id), ids in deleted_ids.items():
+                for chunk in get_chunks(ids):
+                    query = session.query(model).filter(model.policy_id == policy_id, perimeter_column == perimeter_id,
+                                                        model.category_id == category_id, model.data_id.in_(chunk))
+                    query.delete(synchronize_session=False)
+            return results
+
+    def get_subject_assignments(self, policy_id, subject_id=None, category_id=None, data_id=None,
+                                ids=None, limit=None, marker=None):
+        return self.__get_assignments(SubjectAssignment, "subject_id", policy_id, subject_id, category_id=category_id,
+                                      data_id=data_id, ids=ids, limit=limit, marker=marker)
+
+    def add_subject_assignment(self, policy_id, subject_id, category_id, data_id):
+        return self.__add_assignment(SubjectAssignment, "subject_id", policy_id, subject_id, category_id, data_id)
+
+    def delete_subject_assignment(self, policy_id, subject_id, category_id, data_id):
+        return self.__delete_assignment(SubjectAssignment, "subject_id", policy_id, subject_id, category_id, data_id)
+
+    def add_subject_assignments(self, policy_id, assignments):
+        return self.__add_assignments(SubjectAssignment, "subject_id", policy_id, assignments)
+
+    def delete_subject_assignments(self, policy_id, assignments):
+        return self.__delete_assignments(SubjectAssignment, "subject_id", policy_id, assignments)
+
+    def get_object_assignments(self, policy_id, object_id=None, category_id=None, data_id=None,
+                               ids=None, limit=None, marker=None):
+        return self.__get_assignments(ObjectAssignment, "object_id", policy_id, object_id, category_id=category_id,
+                                      data_id=data_id, ids=ids, limit=limit, marker=marker)
 
     def add_object_assignment(self, policy_id, object_id, category_id, data_id):
-        with self.get_session_for_write() as session:
-            query = session.query(ObjectAssignment)
-            query = query.filter_by(policy_id=policy_id, object_id=object_id, category_id=category_id)
-            ref = query.first()
-            if ref:
-                old_ref = copy.deepcopy(ref.to_dict())
-                assignments = old_ref["assignments"]
-                if data_id not in assignments:
-                    assignments.append(data_id)
-                    setattr(ref, "assignments", assignments)
-            else:
-                ref = ObjectAssignment.from_dict(
-                    {
-                        "id": uuid4().hex,
-                        "policy_id": policy_id,
-                        "object_id": object_id,
-                        "category_id": category_id,
-                        "assignments": [data_id, ],
-                    }
-                )
-                session.add(ref)
-            return {ref.id: ref.to_dict()}
+        return self.__add_assignment(ObjectAssignment, "object_id", policy_id, object_id, category_id, data_id)
 
     def delete_object_assignment(self, policy_id, object_id, category_id, data_id):
-        with self.get_session_for_write() as session:
-            query = session.query(ObjectAssignment)
-            query = query.filter_by(policy_id=policy_id, object_id=object_id, category_id=category_id)
-            ref = query.first()
-            if ref:
-                old_ref = copy.deepcopy(ref.to_dict())
-                assignments = old_ref["assignments"]
-                # TODO (asteroide): if data_id is None, delete all
-                if data_id in assignments:
-                    assignments.remove(data_id)
-                    # FIXME (asteroide): the setattr doesn't work here ; the assignments is not updated in the database
-                    setattr(ref, "assignments", assignments)
-                if not assignments:
-                    session.delete(ref)
-
-    def get_action_assignments(self, policy_id, action_id=None, category_id=None):
-        with self.get_session_for_write() as session:
-            query = session.query(ActionAssignment)
-            if action_id and category_id:
-                query = query.filter_by(policy_id=policy_id, action_id=action_id, category_id=category_id)
-            elif action_id:
-                query = query.filter_by(policy_id=policy_id, action_id=action_id)
-            else:
-                query = query.filter_by(policy_id=policy_id)
-            ref_list = query.all()
-            return {_ref.id: _ref.to_dict() for _ref in ref_list}
+        return self.__delete_assignment(ObjectAssignment, "object_id", policy_id, object_id, category_id, data_id)
+
+    def add_object_assignments(self, policy_id, assignments):
+        return self.__add_assignments(ObjectAssignment, "object_id", policy_id, assignments)
+
+    def delete_object_assignments(self, policy_id, assignments):
+        return self.__delete_assignments(ObjectAssignment, "object_id", policy_id, assignments)
+
+    def get_action_assignments(self, policy_id, action_id=None, category_id=None, data_id=None,
+                               ids=None, limit=None, marker=None):
+        return self.__get_assignments(ActionAssignment, "action_id", policy_id, action_id, category_id=category_id,
+                                      data_id=data_id, ids=ids, limit=limit, marker=marker)
 
     def add_action_assignment(self, policy_id, action_id, category_id, data_id):
-        with self.get_session_for_write() as session:
-            query = session.query(ActionAssignment)
-            query = query.filter_by(policy_id=policy_id, action_id=action_id, category_id=category_id)
-            ref = query.first()
-            if ref:
-                old_ref = copy.deepcopy(ref.to_dict())
-                assignments = old_ref["assignments"]
-                if data_id not in assignments:
-                    assignments.append(data_id)
-                    setattr(ref, "assignments", assignments)
-            else:
-                ref = ActionAssignment.from_dict(
-                    {
-                        "id": uuid4().hex,
-                        "policy_id": policy_id,
-                        "action_id": action_id,
-                        "category_id": category_id,
-                        "assignments": [data_id, ],
-                    }
-                )
-                session.add(ref)
-            return {ref.id: ref.to_dict()}
+        return self.__add_assignment(ActionAssignment, "action_id", policy_id, action_id, category_id, data_id)
 
     def delete_action_assignment(self, policy_id, action_id, category_id, data_id):
-        with self.get_session_for_write() as session:
-            query = session.query(ActionAssignment)
-            query = query.filter_by(policy_id=policy_id, action_id=action_id, category_id=category_id)
-            ref = query.first()
-            if ref:
-                old_ref = copy.deepcopy(ref.to_dict())
-                assignments = old_ref["assignments"]
-                # TODO (asteroide): if data_id is None, delete all
-                if data_id in assignments:
-                    assignments.remove(data_id)
-                    # FIXME (asteroide): the setattr doesn't work here ; the assignments is not updated in the database
-                    setattr(ref, "assignments", assignments)
-                if not assignments:
-                    session.delete(ref)
-
-    def get_rules(self, policy_id, rule_id=None, meta_rule_id=None):
+        return self.__delete_assignment(ActionAssignment, "action_id", policy_id, action_id, category_id, data_id)
+
+    def add_action_assignments(self, policy_id, assignments):
+        return self.__add_assignments(ActionAssignment, "action_id", policy_id, assignments)
+
+    def delete_action_assignments(self, policy_id, assignments):
+        return self.__delete_assignments(ActionAssignment, "action_id", policy_id, assignments)
+
+    def get_rules(self, policy_id, rule_id=None, meta_rule_id=None, ids=None, limit=None, marker=None):
+        table = Rule.__table__
+        query = sql.select([table]).where(table.c.policy_id == policy_id)
         with self.get_session_for_read() as session:
-            query = session.query(Rule)
             if rule_id:
-                query = query.filter_by(policy_id=policy_id, rule_id=rule_id)
-                ref = query.first()
-                return {ref.id: ref.to_dict()}
-            elif meta_rule_id:
-                query = query.filter_by(policy_id=policy_id, meta_rule_id=meta_rule_id)
-                ref_list = query.all()
-                return {
-                    "meta_rule_id": meta_rule_id,
-                    "policy_id": policy_id,
-                    "rules": list(map(lambda x: x.to_dict(), ref_list))
-                }
-            else:
-                query = query.filter_by(policy_id=policy_id)
-                ref_list = query.all()
-                return {
+                row = session.execute(query.where(table.c.id == rule_id)).first()
+                return {row.id: Rule.get_dict(row)} if row else {}
+            if meta_rule_id:
+                query = query.where(table.c.meta_rule_id == meta_rule_id)
+            if ids:
+                query = query.where(table.c.id.in_(ids))
+            if marker:
+                query = query.where(table.c.id > marker)
+            query = query.order_by(table.c.id)
+            if limit:
+                query = query.limit(limit)
+            rows = session.execute(query.execution_options(stream_results=True))
+            result = {
+                "policy_id": policy_id,
+                "rules": [Rule.get_dict(row) for row in rows]
+            }
+            if meta_rule_id:
+                result["meta_rule_id"] = meta_rule_id
+            return result
+
+    def add_rule(self, policy_id, meta_rule_id, value):
+        with self.get_session_for_write() as session:
+            rule_hash = get_rule_hash(value)
+            query = session.query(Rule.id)
+            query = query.filter_by(policy_id=policy_id, meta_rule_id=meta_rule_id, hash=rule_hash)
+            if query.first():
+                return {}
+            ref = Rule.from_dict(
+                {
+                    "id": uuid4().hex,
                     "policy_id": policy_id,
-                    "rules": list(map(lambda x: x.to_dict(), ref_list))
+                    "meta_rule_id": meta_rule_id,
+                    "rule": value,
+                    "hash": rule_hash
                 }
+            )
+            session.add(ref)
+            return {ref.id: ref.to_dict()}
 
-    def add_rule(self, policy_id, meta_rule_id, value):
+    def add_rules(self, policy_id, values):
         with self.get_session_for_write() as session:
-            query = session.query(Rule)
-            query = query.filter_by(policy_id=policy_id, meta_rule_id=meta_rule_id)
-            ref_list = query.all()
-            rules = list(map(lambda x: x.rule, ref_list))
-            if not rules or value not in rules:
-                logger.info("add_rule IN IF")
-                ref = Rule.from_dict(
-                    {
-                        "id": uuid4().hex,
-                        "policy_id": policy_id,
-                        "meta_rule_id": meta_rule_id,
-                        "rule": value
-                    }
-                )
-                session.add(ref)
-                return {ref.id: ref.to_dict()}
-            return {}
+            keys = [(value["meta_rule_id"], get_rule_hash(value)) for value in values]
+            rule_ids = {}
+            for chunk in get_chunks(set(_hash for _, _hash in keys)):
+                query = session.query(Rule.id, Rule.meta_rule_id, Rule.hash)
+                query = query.filter(Rule.policy_id == policy_id, Rule.hash.in_(chunk))
+                for rule_id, meta_rule_id, rule_hash in query:
+                    rule_ids[(meta_rule_id, rule_hash)] = rule_id
+            results = []
+            new_refs = []
+            for value, key in zip(values, keys):
+                if key in rule_ids:
+                    results.append({"id": rule_ids[key], "added": False})
+                    continue
+                rule_ids[key] = uuid4().hex
+                new_refs.append({
+                    "id": rule_ids[key],
+                    "policy_id": policy_id,
+                    "meta_rule_id": key[0],
+                    "rule": value,
+                    "hash": key[1],
+                })
+                results.append({"id": rule_ids[key], "added": True})
+            session.bulk_insert_mappings(Rule, new_refs)
+            if new_refs:
+                set_versions(session, ("rules:{}".format(policy_id), ))
+            return results
 
     def delete_rule(self, policy_id, rule_id):
         with self.get_session_for_write() as session:
@@ -1003,6 +1564,247 @@ class PolicyConnector(BaseConnector, PolicyDriver):
             if ref:
                 session.delete(ref)
 
+    def delete_rules(self, policy_id, rule_ids):
+        with self.get_session_for_write() as session:
+            count = 0
+            for chunk in get_chunks(rule_ids):
+                query = session.query(Rule).filter(Rule.policy_id == policy_id, Rule.id.in_(chunk))
+                count += query.delete(synchronize_session=False)
+            if count:
+                set_versions(session, ("rules:{}".format(policy_id), ))
+            return count
+
+    @staticmethod
+    def __get_import_perimeter(session, model, ids, names):
+        """Get the subjects, objects or actions of an import by their IDs and by their names
+
+        The names are searched in the JSON values, the rows found are checked
+        against the exact name.
+
+        :return: (dictionary ID => element, dictionary name => element)
+        """
+        refs = {}
+        for chunk in get_chunks(sorted(ids)):
+            for _ref in session.query(model).filter(model.id.in_(chunk)):
+                refs[_ref.id] = _ref
+        refs_by_name = {}
+        for chunk in get_chunks(sorted(names), size=50):
+            query = session.query(model).filter(sql.or_(
+                *[json_like(model.value, json.dumps({"name": name})[1:-1]) for name in chunk]))
+            for _ref in query.order_by(model.id):
+                refs.setdefault(_ref.id, _ref)
+                if _ref.value.get("name") in names:
+                    refs_by_name.setdefault(_ref.value["name"], refs[_ref.id])
+        return refs, refs_by_name
+
+    def import_policy(self, policy_id, value):
+        with self.get_session_for_write() as session:
+            result = {}
+            data_ids = {}
+            for genre, model in (("subject", SubjectData), ("object", ObjectData), ("action", ActionData)):
+                ids = {(_ref.category_id, _ref.value.get("name")): _ref.id
+                       for _ref in session.query(model).filter_by(policy_id=policy_id)}
+                result[genre + "_data"] = {}
+                new_refs = []
+                for category_id, items in value.get(genre + "_data", {}).items():
+                    result[genre + "_data"][category_id] = {}
+                    for name, item in items.items():
+                        if (category_id, name) not in ids:
+                            ids[(category_id, name)] = uuid4().hex
+                            _value = {"description": ""}
+                            _value.update(item)
+                            _value["name"] = name
+                            new_refs.append({
+                                "id": ids[(category_id, name)],
+                                "value": _value,
+                                "category_id": category_id,
+                                "policy_id": policy_id,
+                            })
+                        result[genre + "_data"][category_id][name] = ids[(category_id, name)]
+                session.bulk_insert_mappings(model, new_refs)
+                data_ids[genre] = ids
+
+            perimeter_ids = {}
+            for genre, model in (("subject", Subject), ("object", Object), ("action", Action)):
+                items = value.get(genre + "s", {})
+                names = set(items) | set(assignment[genre] for assignment in value.get(genre + "_assignments", []))
+                refs, refs_by_name = self.__get_import_perimeter(
+                    session, model, set(item["id"] for item in items.values() if item.get("id")), names)
+                ids = {name: _ref.id for name, _ref in refs_by_name.items()
+                       if policy_id in (_ref.value.get("policy_list") or [])}
+                result[genre + "s"] = {}
+                new_refs = []
+                for name, item in items.items():
+                    _ref = refs.get(item.get("id")) or refs_by_name.get(name)
+                    if _ref:
+                        policy_list = _ref.value.get("policy_list") or []
+                        if policy_id not in policy_list:
+                            _value = copy.deepcopy(_ref.value)
+                            _value["policy_list"] = policy_list + [policy_id, ]
+                            setattr(_ref, "value", _value)
+                        ids[name] = _ref.id
+                    else:
+                        _value = dict(item)
+                        _value["name"] = name
+                        _value["policy_list"] = [policy_id, ]
+                        ids[name] = item.get("id") or uuid4().hex
+                        new_refs.append({"id": ids[name], "value": _value})
+                    result[genre + "s"][name] = ids[name]
+                session.bulk_insert_mappings(model, new_refs)
+                set_memberships(session, model, {_ref["id"]: _ref["value"]["policy_list"] for _ref in new_refs})
+                perimeter_ids[genre] = ids
+
+            for genre, model, unknown_perimeter, unknown_data in (
+                    ("subject", SubjectAssignment, SubjectUnknown, SubjectScopeUnknown),
+                    ("object", ObjectAssignment, ObjectUnknown, ObjectScopeUnknown),
+                    ("action", ActionAssignment, ActionUnknown, ActionScopeUnknown)):
+                assignment_ids = {}
+                assignments = set()
+                for _ref in session.query(model).filter_by(policy_id=policy_id):
+                    key = (getattr(_ref, genre + "_id"), _ref.category_id)
+                    assignment_ids[key] = _ref.assignment_id
+                    assignments.add(key + (_ref.data_id, ))
+                new_refs = []
+                for assignment in value.get(genre + "_assignments", []):
+                    category_id = assignment["category_id"]
+                    if assignment[genre] not in perimeter_ids[genre]:
+                        raise unknown_perimeter("Unknown {} {}".format(genre, assignment[genre]))
+                    if (category_id, assignment["data"]) not in data_ids[genre]:
+                        raise unknown_data("Unknown {} data {}".format(genre, assignment["data"]))
+                    key = (perimeter_ids[genre][assignment[genre]], category_id)
+                    data_id = data_ids[genre][(category_id, assignment["data"])]
+                    if key + (data_id, ) in assignments:
+                        continue
+                    assignments.add(key + (data_id, ))
+                    new_refs.append({
+                        "assignment_id": assignment_ids.setdefault(key, uuid4().hex),
+                        "policy_id": policy_id,
+                        genre + "_id": key[0],
+                        "category_id": key[1],
+                        "data_id": data_id,
+                    })
+                for chunk in get_chunks(new_refs):
+                    session.bulk_insert_mappings(model, chunk)
+
+            meta_rules = {_ref.id: _ref.value for _ref in session.query(MetaRule)}
+            rules = set(session.query(Rule.meta_rule_id, Rule.hash).filter_by(policy_id=policy_id))
+            data_id_sets = {genre: set(ids.values()) for genre, ids in data_ids.items()}
+            new_refs = []
+            for rule in value.get("rules", []):
+                meta_rule_id = rule["meta_rule_id"]
+                if meta_rule_id not in meta_rules:
+                    raise MetaRuleUnknown("Unknown meta rule {}".format(meta_rule_id))
+                categories = []
+                for genre in ("subject", "object", "action"):
+                    for category_id in meta_rules[meta_rule_id].get(genre + "_categories", []):
+                        categories.append((genre, category_id))
+                if len(categories) != len(rule["rule"]):
+                    raise RuleContentError("The rule {} does not match the meta rule {}".format(
+                        rule["rule"], meta_rule_id))
+                data_list = []
+                for (genre, category_id), name in zip(categories, rule["rule"]):
+                    if (category_id, name) in data_ids[genre]:
+                        data_list.append(data_ids[genre][(category_id, name)])
+                    elif name in data_id_sets[genre]:
+                        data_list.append(name)
+                    else:
+                        raise RuleContentError("Unknown {} data {}".format(genre, name))
+                _value = {
+                    "meta_rule_id": meta_rule_id,
+                    "rule": data_list,
+                    "instructions": rule.get("instructions", ({"decision": "grant"}, )),
+                    "enabled": rule.get("enabled", True),
+                }
+                key = (meta_rule_id, get_rule_hash(_value))
+                if key in rules:
+                    continue
+                rules.add(key)
+                new_refs.append({
+                    "id": uuid4().hex,
+                    "policy_id": policy_id,
+                    "meta_rule_id": meta_rule_id,
+                    "rule": _value,
+                    "hash": key[1],
+                })
+            session.bulk_insert_mappings(Rule, new_refs)
+            if new_refs:
+                set_versions(session, ("rules:{}".format(policy_id), ))
+            result["rules"] = len(new_refs)
+            return result
+
+    def clone_policy(self, policy_id, new_policy_id, value, pdp_id=None, pdp_value=None):
+        """Copy the data, perimeter, assignments and rules of a policy in one transaction
+
+        The data rows are copied by INSERT ... SELECT joined on a temporary
+        table giving their new IDs. Rules hold data IDs in JSON lists, they
+        are rewritten with the assignments chunk by chunk and bulk inserted.
+        """
+        with self.get_session_for_write() as session:
+            session.add(Policy.from_dict({"id": new_policy_id, "value": value}))
+            if pdp_id:
+                session.add(PDP.from_dict({"id": pdp_id, "value": pdp_value}))
+            session.flush()
+            connection = session.connection()
+            id_map.create(connection, checkfirst=True)
+            data_ids = {}
+            for model in (SubjectData, ObjectData, ActionData):
+                connection.execute(id_map.delete())
+                ids = {_id: uuid4().hex for _id, in session.query(model.id).filter_by(policy_id=policy_id)}
+                if not ids:
+                    continue
+                data_ids.update(ids)
+                for chunk in get_chunks(ids.items()):
+                    connection.execute(id_map.insert(), [{"old_id": _old, "new_id": _new} for _old, _new in chunk])
+                table = model.__table__
+                select = sql.select([id_map.c.new_id, table.c.value, table.c.category_id,
+                                     sql.literal(new_policy_id, sql.String)])
+                select = select.select_from(table.join(id_map, id_map.c.old_id == table.c.id))
+                select = select.where(table.c.policy_id == policy_id)
+                connection.execute(table.insert().from_select(["id", "value", "category_id", "policy_id"], select))
+            id_map.drop(connection)
+
+            for model in (Subject, Object, Action):
+                membership = get_membership_model(model)
+                query = session.query(model).join(membership, membership.perimeter_id == model.id)
+                for ref in query.filter(membership.policy_id == policy_id):
+                    policy_list = ref.value.get("policy_list") or []
+                    if policy_id in policy_list and new_policy_id not in policy_list:
+                        _value = copy.deepcopy(ref.value)
+                        _value["policy_list"] = policy_list + [new_policy_id, ]
+                        setattr(ref, "value", _value)
+
+            for genre, model in (("subject", SubjectAssignment), ("object", ObjectAssignment),
+                                 ("action", ActionAssignment)):
+                assignment_ids = {}
+                new_refs = [{
+                    "assignment_id": assignment_ids.setdefault(_ref.assignment_id, uuid4().hex),
+                    "policy_id": new_policy_id,
+                    genre + "_id": getattr(_ref, genre + "_id"),
+                    "category_id": _ref.category_id,
+                    "data_id": data_ids.get(_ref.data_id, _ref.data_id),
+                } for _ref in session.query(model).filter_by(policy_id=policy_id)]
+                for chunk in get_chunks(new_refs):
+                    session.bulk_insert_mappings(model, chunk)
+
+            new_refs = []
+            for _ref in session.query(Rule).filter_by(policy_id=policy_id):
+                _value = dict(_ref.rule)
+                _value["rule"] = [data_ids.get(_id, _id) for _id in _ref.rule["rule"]]
+                new_refs.append({
+                    "id": uuid4().hex,
+                    "policy_id": new_policy_id,
+                    "meta_rule_id": _ref.meta_rule_id,
+                    "rule": _value,
+                    "hash": get_rule_hash(_value) if _ref.hash else None,
+                })
+            for chunk in get_chunks(new_refs):
+                session.bulk_insert_mappings(Rule, chunk)
+            set_versions(session, ("rules:{}".format(new_policy_id), ))
+            return {
+                "policies": {new_policy_id: session.query(Policy).get(new_policy_id).to_dict()},
+                "pdp": {pdp_id: session.query(PDP).get(pdp_id).to_dict()} if pdp_id else {},
+            }
+
 
 class ModelConnector(BaseConnector, ModelDriver):
 
@@ -1019,8 +1821,15 @@ class ModelConnector(BaseConnector, ModelDriver):
             return {ref.id: ref.to_dict()}
 
     def delete_model(self, model_id):
+        """Delete a model with its policies and the meta rules no other model uses"""
         with self.get_session_for_write() as session:
             ref = session.query(Model).get(model_id)
+            query = session.query(Policy).filter(json_like(Policy.value, json.dumps({"model_id": model_id})[1:-1]))
+            delete_policies(session, [_ref.id for _ref in query if _ref.value.get("model_id") == model_id])
+            used_ids = set()
+            for _ref in session.query(Model).filter(Model.id != model_id):
+                used_ids.update(get_meta_rule_ids(_ref.value))
+            delete_meta_rules(session, [_id for _id in get_meta_rule_ids(ref.value) if _id not in used_ids])
             session.delete(ref)
 
     def add_model(self, model_id=None, value=None):
@@ -1068,11 +1877,7 @@ class ModelConnector(BaseConnector, ModelDriver):
 
     def delete_meta_rule(self, meta_rule_id=None):
         with self.get_session_for_write() as session:
-            query = session.query(MetaRule)
-            query = query.filter_by(id=meta_rule_id)
-            ref = query.first()
-            if ref:
-                session.delete(ref)
+            delete_meta_rules(session, [meta_rule_id, ])
 
     def get_subject_categories(self, category_id=None):
         with self.get_session_for_read() as session:
@@ -3,6 +3,7 @@
 # license which can be found in the file 'LICENSE' in this package distribution
 # or at 'http://www.apache.org/licenses/LICENSE-2.0'.
 
+import atexit
 import logging
 from stevedore.driver import DriverManager
 from python_moonutilities import configuration
@@ -22,6 +23,18 @@ class Driver(DriverManager):
             invoke_args=(engine_name, ),
         )
 
+    def get_version(self, key):
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_versions(self, keys):
+        raise NotImplementedError()  # pragma: no cover
+
+    def dispose(self):
+        raise NotImplementedError()  # pragma: no cover
+
+    def operation(self):
+        raise NotImplementedError()  # pragma: no cover
+
 
 class ModelDriver(Driver):
 
@@ -94,7 +107,10 @@ class PolicyDriver(Driver):
     def get_policies(self, policy_id=None):
         raise NotImplementedError()  # pragma: no cover
 
-    def get_subjects(self, policy_id, perimeter_id=None):
+    def get_subjects(self, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_subjects_by_names(self, names):
         raise NotImplementedError()  # pragma: no cover
 
     def set_subject(self, policy_id, perimeter_id=None, value=None):
@@ -103,7 +119,10 @@ class PolicyDriver(Driver):
     def delete_subject(self, policy_id, perimeter_id):
         raise NotImplementedError()  # pragma: no cover
 
-    def get_objects(self, policy_id, perimeter_id=None):
+    def set_subjects(self, policy_id, values):
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_objects(self, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
         raise NotImplementedError()  # pragma: no cover
 
     def set_object(self, policy_id, perimeter_id=None, value=None):
@@ -112,7 +131,10 @@ class PolicyDriver(Driver):
     def delete_object(self, policy_id, perimeter_id):
         raise NotImplementedError()  # pragma: no cover
 
-    def get_actions(self, policy_id, perimeter_id=None):
+    def set_objects(self, policy_id, values):
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_actions(self, policy_id, perimeter_id=None, name=None, ids=None, limit=None, marker=None):
         raise NotImplementedError()  # pragma: no cover
 
     def set_action(self, policy_id, perimeter_id=None, value=None):
@@ -121,6 +143,9 @@ class PolicyDriver(Driver):
     def delete_action(self, policy_id, perimeter_id):
         raise NotImplementedError()  # pragma: no cover
 
+    def set_actions(self, policy_id, values):
+        raise NotImplementedError()  # pragma: no cover
+
     def get_subject_data(self, policy_id, data_id=None, category_id=None):
         raise NotImplementedError()  # pragma: no cover
 
@@ -130,6 +155,9 @@ class PolicyDriver(Driver):
     def delete_subject_data(self, policy_id, data_id):
         raise NotImplementedError()  # pragma: no cover
 
+    def set_subject_data_list(self, policy_id, category_id, values):
+        raise NotImplementedError()  # pragma: no cover
+
     def get_object_data(self, policy_id, data_id=None, category_id=None):
         raise NotImplementedError()  # pragma: no cover
 
@@ -139,6 +167,9 @@ class PolicyDriver(Driver):
     def delete_object_data(self, policy_id, data_id):
         raise NotImplementedError()  # pragma: no cover
 
+    def set_object_data_list(self, policy_id, category_id, values):
+        raise NotImplementedError()  # pragma: no cover
+
     def get_action_data(self, policy_id, data_id=None, category_id=None):
         raise NotImplementedError()  # pragma: no cover
 
@@ -148,7 +179,11 @@ class PolicyDriver(Driver):
     def delete_action_data(self, policy_id, data_id):
         raise NotImplementedError()  # pragma: no cover
 
-    def get_subject_assignments(self, policy_id, subject_id=None, category_id=None):
+    def set_action_data_list(self, policy_id, category_id, values):
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_subject_assignments(self, policy_id, subject_id=None, category_id=None, data_id=None,
+                                ids=None, limit=None, marker=None):
         raise NotImplementedError()  # pragma: no cover
 
     def add_subject_assignment(self, policy_id, subject_id, category_id, data_id):
@@ -157,7 +192,14 @@ class PolicyDriver(Driver):
     def delete_subject_assignment(self, policy_id, subject_id, category_id, data_id):
         raise NotImplementedError()  # pragma: no cover
 
-    def get_object_assignments(self, policy_id, assignment_id=None):
+    def add_subject_assignments(self, policy_id, assignments):
+        raise NotImplementedError()  # pragma: no cover
+
+    def delete_subject_assignments(self, policy_id, assignments):
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_object_assignments(self, policy_id, object_id=None, category_id=None, data_id=None,
+                               ids=None, limit=None, marker=None):
         raise NotImplementedError()  # pragma: no cover
 
     def add_object_assignment(self, policy_id, subject_id, category_id, data_id):
@@ -166,7 +208,14 @@ class PolicyDriver(Driver):
     def delete_object_assignment(self, policy_id, object_id, category_id, data_id):
         raise NotImplementedError()  # pragma: no cover
 
-    def get_action_assignments(self, policy_id, assignment_id=None):
+    def add_object_assignments(self, policy_id, assignments):
+        raise NotImplementedError()  # pragma: no cover
+
+    def delete_object_assignments(self, policy_id, assignments):
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_action_assignments(self, policy_id, action_id=None, category_id=None, data_id=None,
+                               ids=None, limit=None, marker=None):
         raise NotImplementedError()  # pragma: no cover
 
     def add_action_assignment(self, policy_id, action_id, category_id, data_id):
@@ -175,15 +224,33 @@ class PolicyDriver(Driver):
     def delete_action_assignment(self, policy_id, action_id, category_id, data_id):
         raise NotImplementedError()  # pragma: no cover
 
-    def get_rules(self, policy_id, rule_id=None, meta_rule_id=None):
+    def add_action_assignments(self, policy_id, assignments):
+        raise NotImplementedError()  # pragma: no cover
+
+    def delete_action_assignments(self, policy_id, assignments):
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_rules(self, policy_id, rule_id=None, meta_rule_id=None, ids=None, limit=None, marker=None):
         raise NotImplementedError()  # pragma: no cover
 
     def add_rule(self, policy_id, meta_rule_id, value):
         raise NotImplementedError()  # pragma: no cover
 
+    def add_rules(self, policy_id, values):
+        raise NotImplementedError()  # pragma: no cover
+
     def delete_rule(self, policy_id, rule_id):
         raise NotImplementedError()  # pragma: no cover
 
+    def delete_rules(self, policy_id, rule_ids):
+        raise NotImplementedError()  # pragma: no cover
+
+    def import_policy(self, policy_id, value):
+        raise NotImplementedError()  # pragma: no cover
+
+    def clone_policy(self, policy_id, new_policy_id, value, pdp_id=None, pdp_value=None):
+        raise NotImplementedError()  # pragma: no cover
+
 
 class PDPDriver(Driver):
 
@@ -202,6 +269,18 @@ class PDPDriver(Driver):
     def get_pdp(self, pdp_id=None):
         raise NotImplementedError()  # pragma: no cover
 
+    def get_jobs(self, job_id=None):
+        raise NotImplementedError()  # pragma: no cover
+
+    def add_job(self, job_id, value):
+        raise NotImplementedError()  # pragma: no cover
+
+    def update_job(self, job_id, value):
+        raise NotImplementedError()  # pragma: no cover
+
+    def delete_jobs(self, job_ids):
+        raise NotImplementedError()  # pragma: no cover
+
 
 class KeystoneDriver(Driver):
 
@@ -226,3 +305,18 @@ PolicyManager = policy.PolicyManager(
 PDPManager = pdp.PDPManager(
     PDPDriver(conf['driver'], conf['url'])
 )
+
+
+def dispose():
+    """Close the database connections of the managers and revoke the Keystone admin token
+
+    Must be called before forking worker processes, so that each worker
+    opens its own connections and gets its own token. It is also called
+    when the process exits.
+    """
+    KeystoneManager.close()
+    for manager in (KeystoneManager, ModelManager, PolicyManager, PDPManager):
+        manager.driver.dispose()
+
+
+atexit.register(dispose)
@@ -10,6 +10,7 @@ import glob
 import importlib
 import argparse
 import logging
+import sqlalchemy as sql
 from sqlalchemy import create_engine
 from python_moonutilities import configuration
 from python_moondb.migrate_repo import versions
@@ -47,13 +48,63 @@ def init_args():
     return args, logger
 
 
+def has_index(engine, table_name, index_name):
+    inspector = sql.inspect(engine)
+    return index_name in [index["name"] for index in inspector.get_indexes(table_name)]
+
+
+def create_index_online(engine, table_name, index_name, columns):
+    """Create an index without locking the writes on its table
+
+    MySQL builds it in place with LOCK=NONE and PostgreSQL concurrently
+    (outside of a transaction), other databases use a plain CREATE INDEX.
+    Nothing is done if the index already exists.
+
+    :param table_name: name of the table
+    :param index_name: name of the index
+    :param columns: list of the names of the indexed columns
+    """
+    logger = logging.getLogger("moon.db.manager")
+    if has_index(engine, table_name, index_name):
+        logger.info("Index {} already exists".format(index_name))
+        return
+    logger.info("Creating index {} on {}".format(index_name, table_name))
+    columns = ", ".join(columns)
+    if engine.dialect.name == "mysql":
+        engine.execute("ALTER TABLE {} ADD INDEX {} ({}), ALGORITHM=INPLACE, LOCK=NONE".format(
+            table_name, index_name, columns))
+    elif engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.execution_options(isolation_level="AUTOCOMMIT").execute(
+                "CREATE INDEX CONCURRENTLY {} ON {} ({})".format(index_name, table_name, columns))
+    else:
+        engine.execute("CREATE INDEX {} ON {} ({})".format(index_name, table_name, columns))
+
+
+def drop_index_online(engine, table_name, index_name):
+    """Drop an index created by create_index_online if it exists"""
+    if not has_index(engine, table_name, index_name):
+        return
+    if engine.dialect.name == "mysql":
+        engine.execute("ALTER TABLE {} DROP INDEX {}, ALGORITHM=INPLACE, LOCK=NONE".format(
+            table_name, index_name))
+    elif engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.execution_options(isolation_level="AUTOCOMMIT").execute(
+                "DROP INDEX CONCURRENTLY {}".format(index_name))
+    else:
+        engine.execute("DROP INDEX {}".format(index_name))
+
+
 def init_engine():
     db_conf = configuration.get_configuration("database")["database"]
     return create_engine(db_conf['url'])
 
 
 def main(command, logger, engine):
-    files = glob.glob(versions.__path__[0] + "/[0-9][0-9][0-9]*.py")
+    files = sorted(glob.glob(versions.__path__[0] + "/[0-9][0-9][0-9]*.py"))
+    if command in ("downgrade", "d", "down"):
+        files.reverse()
     for filename in files:
         filename = os.path.basename(filename).replace(".py", "")
         o = importlib.import_module(
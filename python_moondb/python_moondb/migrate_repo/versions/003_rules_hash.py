@@ -0,0 +1,54 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+
+import hashlib
+import json
+import sqlalchemy as sql
+
+
+def get_rule_hash(value):
+    content = {key: value.get(key) for key in ("rule", "instructions", "enabled")}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def upgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    table = sql.Table('rules', meta, autoload=True)
+    if 'hash' in table.c:
+        return
+    migrate_engine.execute("ALTER TABLE rules ADD COLUMN hash VARCHAR(64)")
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+    table = sql.Table('rules', meta, autoload=True)
+
+    # Note: the duplicated rules keep a NULL hash, they are not deleted
+    hashes = set()
+    rows = migrate_engine.execute(
+        sql.select([table.c.id, table.c.policy_id, table.c.meta_rule_id, table.c.rule])).fetchall()
+    for row in rows:
+        rule_hash = get_rule_hash(json.loads(row.rule))
+        key = (row.policy_id, row.meta_rule_id, rule_hash)
+        if key in hashes:
+            continue
+        hashes.add(key)
+        migrate_engine.execute(table.update().where(table.c.id == row.id).values(hash=rule_hash))
+
+    sql.Index('rules_hash', table.c.policy_id, table.c.meta_rule_id, table.c.hash,
+              unique=True).create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    try:
+        table = sql.Table('rules', meta, autoload=True)
+        sql.Index('rules_hash', table.c.policy_id, table.c.meta_rule_id, table.c.hash,
+                  unique=True).drop(migrate_engine)
+        migrate_engine.execute("ALTER TABLE rules DROP COLUMN hash")
+    except Exception as e:
+        print(e)
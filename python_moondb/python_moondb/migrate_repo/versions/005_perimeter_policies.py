@@ -0,0 +1,51 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+
+import json
+import sqlalchemy as sql
+
+TABLES = (("subjects", "subject_policies"),
+          ("objects", "object_policies"),
+          ("actions", "action_policies"))
+
+
+def upgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    for perimeter_name, table_name in TABLES:
+        table = sql.Table(
+            table_name,
+            meta,
+            sql.Column('perimeter_id', sql.String(64), primary_key=True),
+            sql.Column('policy_id', sql.String(64), primary_key=True),
+            sql.Index(table_name + "_policy", 'policy_id', 'perimeter_id'),
+            mysql_engine='InnoDB',
+            mysql_charset='utf8')
+        if table.exists():
+            continue
+        table.create(migrate_engine)
+
+        perimeter_table = sql.Table(perimeter_name, meta, autoload=True)
+        rows = []
+        for row in migrate_engine.execute(
+                sql.select([perimeter_table.c.id, perimeter_table.c.value])).fetchall():
+            value = json.loads(row.value) if row.value else {}
+            for policy_id in set(value.get("policy_list") or []):
+                rows.append({"perimeter_id": row.id, "policy_id": policy_id})
+        if rows:
+            migrate_engine.execute(table.insert(), rows)
+
+
+def downgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    for perimeter_name, table_name in TABLES:
+        try:
+            table = sql.Table(table_name, meta, autoload=True)
+            table.drop(migrate_engine, checkfirst=True)
+        except Exception as e:
+            print(e)
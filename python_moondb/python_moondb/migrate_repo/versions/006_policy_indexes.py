@@ -0,0 +1,33 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+
+import sqlalchemy as sql
+from python_moondb.db_manager import create_index_online, drop_index_online
+
+# Note: rules are already indexed on (policy_id, meta_rule_id) by the rules_hash index
+INDEXES = (
+    ("subject_assignments", "subject_assignments_policy", ["policy_id", "subject_id", "category_id"]),
+    ("object_assignments", "object_assignments_policy", ["policy_id", "object_id", "category_id"]),
+    ("action_assignments", "action_assignments_policy", ["policy_id", "action_id", "category_id"]),
+    ("subject_data", "subject_data_policy", ["policy_id", "category_id"]),
+    ("object_data", "object_data_policy", ["policy_id", "category_id"]),
+    ("action_data", "action_data_policy", ["policy_id", "category_id"]),
+)
+
+
+def upgrade(migrate_engine):
+    for table_name, index_name, columns in INDEXES:
+        # Note: since migration 007 the unique index of the assignments starts with these columns
+        if "data_id" in [column["name"] for column in sql.inspect(migrate_engine).get_columns(table_name)]:
+            continue
+        create_index_online(migrate_engine, table_name, index_name, columns)
+
+
+def downgrade(migrate_engine):
+    for table_name, index_name, columns in INDEXES:
+        try:
+            drop_index_online(migrate_engine, table_name, index_name)
+        except Exception as e:
+            print(e)
@@ -0,0 +1,111 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+
+import json
+import sqlalchemy as sql
+
+GENRES = ("subject", "object", "action")
+
+
+def get_chunks(items, size=500):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+def load_tables(meta, genre):
+    for table_name in ("policies", genre + "s", genre + "_categories"):
+        sql.Table(table_name, meta, autoload=True)
+
+
+def upgrade(migrate_engine):
+    for genre in GENRES:
+        meta = sql.MetaData()
+        meta.bind = migrate_engine
+        table_name = genre + "_assignments"
+        old_table = sql.Table(table_name, meta, autoload=True)
+        if 'data_id' in old_table.c:
+            continue
+        load_tables(meta, genre)
+
+        new_table = sql.Table(
+            table_name + "_new",
+            meta,
+            sql.Column('id', sql.Integer, primary_key=True, autoincrement=True),
+            sql.Column('assignment_id', sql.String(64), nullable=False),
+            sql.Column('policy_id', sql.ForeignKey("policies.id"), nullable=False),
+            sql.Column(genre + '_id', sql.ForeignKey(genre + "s.id"), nullable=False),
+            sql.Column('category_id', sql.ForeignKey(genre + "_categories.id"), nullable=False),
+            sql.Column('data_id', sql.String(64), nullable=False),
+            mysql_engine='InnoDB',
+            mysql_charset='utf8')
+        new_table.create(migrate_engine, checkfirst=True)
+
+        # Note: the rows of the same (policy, perimeter, category) are merged
+        assignment_ids = {}
+        rows = {}
+        for row in migrate_engine.execute(old_table.select()).fetchall():
+            key = (row.policy_id, row[genre + "_id"], row.category_id)
+            assignment_id = assignment_ids.setdefault(key, row.id)
+            for data_id in json.loads(row.assignments) if row.assignments else []:
+                rows.setdefault(key + (data_id, ), {
+                    "policy_id": key[0],
+                    genre + "_id": key[1],
+                    "category_id": key[2],
+                    "data_id": data_id,
+                    "assignment_id": assignment_id,
+                })
+        for chunk in get_chunks(list(rows.values())):
+            migrate_engine.execute(new_table.insert(), chunk)
+
+        old_table.drop(migrate_engine)
+        migrate_engine.execute("ALTER TABLE {}_new RENAME TO {}".format(table_name, table_name))
+        meta = sql.MetaData()
+        meta.bind = migrate_engine
+        table = sql.Table(table_name, meta, autoload=True)
+        sql.Index(table_name + "_unique", table.c.policy_id, table.c[genre + "_id"], table.c.category_id,
+                  table.c.data_id, unique=True).create(migrate_engine)
+        sql.Index(table_name + "_id", table.c.assignment_id).create(migrate_engine)
+        sql.Index(table_name + "_data", table.c.data_id).create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    for genre in GENRES:
+        meta = sql.MetaData()
+        meta.bind = migrate_engine
+        table_name = genre + "_assignments"
+        try:
+            new_table = sql.Table(table_name, meta, autoload=True)
+            if 'data_id' not in new_table.c:
+                continue
+            load_tables(meta, genre)
+            old_table = sql.Table(
+                table_name + "_old",
+                meta,
+                sql.Column('id', sql.String(64), primary_key=True),
+                sql.Column('assignments', sql.Text(), nullable=True),
+                sql.Column('policy_id', sql.ForeignKey("policies.id"), nullable=False),
+                sql.Column(genre + '_id', sql.ForeignKey(genre + "s.id"), nullable=False),
+                sql.Column('category_id', sql.ForeignKey(genre + "_categories.id"), nullable=False),
+                mysql_engine='InnoDB',
+                mysql_charset='utf8')
+            old_table.create(migrate_engine, checkfirst=True)
+
+            rows = {}
+            for row in migrate_engine.execute(new_table.select().order_by(new_table.c.id)).fetchall():
+                rows.setdefault(row.assignment_id, {
+                    "id": row.assignment_id,
+                    "policy_id": row.policy_id,
+                    genre + "_id": row[genre + "_id"],
+                    "category_id": row.category_id,
+                    "assignments": [],
+                })["assignments"].append(row.data_id)
+            rows = [dict(row, assignments=json.dumps(row["assignments"])) for row in rows.values()]
+            for chunk in get_chunks(rows):
+                migrate_engine.execute(old_table.insert(), chunk)
+
+            new_table.drop(migrate_engine)
+            migrate_engine.execute("ALTER TABLE {}_old RENAME TO {}".format(table_name, table_name))
+        except Exception as e:
+            print(e)
@@ -45,6 +45,7 @@ setup(
         "moon_db.driver":
             [
                 "sql = python_moondb.backends.sql:SQLConnector",
+                "memory = python_moondb.backends.memory:MemoryConnector",
             ],
         'console_scripts': [
             'moon_db_manager = python_moondb.db_manager:run',
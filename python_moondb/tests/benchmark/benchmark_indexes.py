@@ -0,0 +1,97 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+"""
+Time the hot queries of the assignments and data before and after the
+indexes of migration 006
+
+    python3 benchmark_indexes.py [--url sqlite:////tmp/moon_benchmark.db] [--count 100000]
+
+The database given by --url must be empty, its tables are created by
+migration 001.
+"""
+
+import argparse
+import importlib
+import json
+import random
+import time
+from uuid import uuid4
+import sqlalchemy as sql
+
+
+def init_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="sqlite://", help="URL of an empty database")
+    parser.add_argument("--count", type=int, default=100000, help="number of assignments")
+    parser.add_argument("--policies", type=int, default=100, help="number of policies")
+    parser.add_argument("--queries", type=int, default=1000, help="number of queries timed")
+    return parser.parse_args()
+
+
+def fill(engine, count, policies):
+    meta = sql.MetaData()
+    meta.bind = engine
+    assignments = sql.Table("subject_assignments", meta, autoload=True)
+    data = sql.Table("subject_data", meta, autoload=True)
+    policy_ids = ["policy_{}".format(index) for index in range(policies)]
+    category_ids = ["category_{}".format(index) for index in range(5)]
+    keys = []
+    rows = []
+    for index in range(count):
+        key = (random.choice(policy_ids), "subject_{}".format(index), random.choice(category_ids))
+        keys.append(key)
+        rows.append({"id": uuid4().hex, "policy_id": key[0], "subject_id": key[1],
+                     "category_id": key[2], "assignments": json.dumps([uuid4().hex])})
+    engine.execute(assignments.insert(), rows)
+    rows = [{"id": uuid4().hex, "policy_id": random.choice(policy_ids),
+             "category_id": random.choice(category_ids),
+             "value": json.dumps({"name": "data_{}".format(index)})}
+            for index in range(count // 10)]
+    engine.execute(data.insert(), rows)
+    return keys
+
+
+def run_queries(engine, keys, queries):
+    meta = sql.MetaData()
+    meta.bind = engine
+    assignments = sql.Table("subject_assignments", meta, autoload=True)
+    data = sql.Table("subject_data", meta, autoload=True)
+    samples = random.sample(keys, min(queries, len(keys)))
+    timings = {}
+
+    start = time.perf_counter()
+    for policy_id, subject_id, category_id in samples:
+        engine.execute(assignments.select().where(sql.and_(
+            assignments.c.policy_id == policy_id,
+            assignments.c.subject_id == subject_id,
+            assignments.c.category_id == category_id))).fetchall()
+    timings["assignments (policy_id, subject_id, category_id)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for policy_id, subject_id, category_id in samples:
+        engine.execute(data.select().where(sql.and_(
+            data.c.policy_id == policy_id,
+            data.c.category_id == category_id))).fetchall()
+    timings["data (policy_id, category_id)"] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    args = init_args()
+    engine = sql.create_engine(args.url)
+    importlib.import_module("python_moondb.migrate_repo.versions.001_moon").upgrade(engine)
+    keys = fill(engine, args.count, args.policies)
+    before = run_queries(engine, keys, args.queries)
+    start = time.perf_counter()
+    importlib.import_module("python_moondb.migrate_repo.versions.006_policy_indexes").upgrade(engine)
+    print("Indexes created in {:.2f}s".format(time.perf_counter() - start))
+    after = run_queries(engine, keys, args.queries)
+    print("{:<50} {:>12} {:>12}".format("{} queries".format(args.queries), "before (ms)", "after (ms)"))
+    for name in before:
+        print("{:<50} {:>12.1f} {:>12.1f}".format(name, before[name] * 1000, after[name] * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,10 @@ def register_keystone(m):
         'DELETE', 'http://keystone:5000/v3/auth/tokens',
         headers={'X-Subject-Token': "111111111"}
     )
+    m.register_uri(
+        'GET', 'http://keystone:5000/v3/users?domain_id=default',
+        json={"users": []}
+    )
     m.register_uri(
         'POST', 'http://keystone:5000/v3/users?name=testuser&domain_id=default',
         json={"users": {}}
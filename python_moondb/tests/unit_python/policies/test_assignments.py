@@ -1,3 +1,6 @@
+import pytest
+
+
 def get_action_assignments(policy_id, action_id=None, category_id=None):
     from python_moondb.core import PolicyManager
     return PolicyManager.get_action_assignments("", policy_id, action_id, category_id)
@@ -28,9 +31,9 @@ def delete_object_assignment(policy_id, object_id, category_id, data_id):
     PolicyManager.delete_object_assignment("", policy_id, object_id, category_id, data_id)
 
 
-def get_subject_assignments(policy_id, subject_id=None, category_id=None):
+def get_subject_assignments(policy_id, subject_id=None, category_id=None, **filters):
     from python_moondb.core import PolicyManager
-    return PolicyManager.get_subject_assignments("", policy_id, subject_id, category_id)
+    return PolicyManager.get_subject_assignments("", policy_id, subject_id, category_id, **filters)
 
 
 def add_subject_assignment(policy_id, subject_id, category_id, data_id):
@@ -43,6 +46,16 @@ def delete_subject_assignment(policy_id, subject_id, category_id, data_id):
     PolicyManager.delete_subject_assignment("", policy_id, subject_id, category_id, data_id)
 
 
+def add_subject_assignments(policy_id, assignments):
+    from python_moondb.core import PolicyManager
+    return PolicyManager.add_subject_assignments("", policy_id, assignments)
+
+
+def delete_subject_assignments(policy_id, assignments):
+    from python_moondb.core import PolicyManager
+    return PolicyManager.delete_subject_assignments("", policy_id, assignments)
+
+
 def test_get_action_assignments(db):
     policy_id = "admin"
     action_id = "action_id_1"
@@ -211,6 +224,22 @@ def test_get_subject_assignments_by_policy_id(db):
     assert len(subj_assignments) == 3
 
 
+def test_get_subject_assignments_with_filters(db):
+    policy_id = "admin"
+    for index in range(3):
+        add_subject_assignment(policy_id, "subject_id_{}".format(index), "category_id_filters", "data_id_1")
+    add_subject_assignment(policy_id, "subject_id_0", "category_id_other", "data_id_1")
+    subj_assignments = get_subject_assignments(policy_id, category_id="category_id_filters")
+    assert len(subj_assignments) == 3
+    ids = sorted(subj_assignments.keys())
+    page = get_subject_assignments(policy_id, category_id="category_id_filters", limit=2)
+    assert list(page.keys()) == ids[:2]
+    page = get_subject_assignments(policy_id, category_id="category_id_filters", limit=2, marker=ids[1])
+    assert list(page.keys()) == ids[2:]
+    page = get_subject_assignments(policy_id, ids=ids[1:2])
+    assert list(page.keys()) == ids[1:2]
+
+
 def test_add_subject_assignments(db):
     policy_id = "admin"
     subject_id = "subject_id_1"
@@ -243,3 +272,59 @@ def test_delete_subject_assignment_with_invalid_policy_id(db):
     delete_subject_assignment(policy_id, "", "", "")
     assignments = get_subject_assignments(policy_id, )
     assert len(assignments) == 0
+
+
+def test_add_subject_assignments_in_bulk(db):
+    policy_id = "admin_bulk"
+    add_subject_assignment(policy_id, "subject_id_1", "category_id_1", "data_id_1")
+    assignments = [
+        {"subject_id": "subject_id_1", "category_id": "category_id_1", "data_id": "data_id_1"},
+        {"subject_id": "subject_id_1", "category_id": "category_id_1", "data_id": "data_id_2"},
+        {"subject_id": "subject_id_2", "category_id": "category_id_1", "data_id": "data_id_1"},
+        {"subject_id": "subject_id_2", "category_id": "category_id_1", "data_id": "data_id_1"},
+    ]
+    results = add_subject_assignments(policy_id, assignments)
+    assert [result["added"] for result in results] == [False, True, True, False]
+    assert results[0]["id"] == results[1]["id"]
+    assert results[2]["id"] == results[3]["id"]
+    subject_assignments = get_subject_assignments(policy_id)
+    assert len(subject_assignments) == 2
+    assert subject_assignments[results[0]["id"]]["assignments"] == ["data_id_1", "data_id_2"]
+    assert subject_assignments[results[2]["id"]]["assignments"] == ["data_id_1"]
+
+
+def test_delete_subject_assignments_in_bulk(db):
+    policy_id = "admin_bulk_delete"
+    add_subject_assignment(policy_id, "subject_id_1", "category_id_1", "data_id_1")
+    add_subject_assignment(policy_id, "subject_id_1", "category_id_1", "data_id_2")
+    add_subject_assignment(policy_id, "subject_id_2", "category_id_1", "data_id_1")
+    results = delete_subject_assignments(policy_id, [
+        {"subject_id": "subject_id_1", "category_id": "category_id_1", "data_id": "data_id_1"},
+        {"subject_id": "subject_id_2", "category_id": "category_id_1", "data_id": "data_id_1"},
+        {"subject_id": "subject_id_3", "category_id": "category_id_1", "data_id": "data_id_1"},
+    ])
+    assert [result["deleted"] for result in results] == [True, True, False]
+    subject_assignments = get_subject_assignments(policy_id)
+    assert len(subject_assignments) == 1
+    assert list(subject_assignments.values())[0]["assignments"] == ["data_id_2"]
+
+
+def test_add_subject_assignments_without_data(db):
+    from python_moonutilities.exceptions import AdminAssignment
+    with pytest.raises(AdminAssignment):
+        add_subject_assignments("admin_bulk", [{"subject_id": "subject_id_1", "category_id": "category_id_1"}])
+
+
+def test_get_subject_assignments_by_data_id(db):
+    policy_id = "admin_reverse"
+    add_subject_assignment(policy_id, "subject_id_1", "category_id_1", "data_id_1")
+    add_subject_assignment(policy_id, "subject_id_1", "category_id_1", "data_id_2")
+    add_subject_assignment(policy_id, "subject_id_2", "category_id_1", "data_id_2")
+    add_subject_assignment(policy_id, "subject_id_3", "category_id_1", "data_id_3")
+    assignments = get_subject_assignments(policy_id, data_id="data_id_2")
+    assert sorted(_value["subject_id"] for _value in assignments.values()) == ["subject_id_1", "subject_id_2"]
+    delete_subject_assignment(policy_id, "subject_id_1", "category_id_1", "data_id_2")
+    assignments = get_subject_assignments(policy_id, data_id="data_id_2")
+    assert [_value["subject_id"] for _value in assignments.values()] == ["subject_id_2"]
+    assignments = get_subject_assignments(policy_id, "subject_id_1")
+    assert list(assignments.values())[0]["assignments"] == ["data_id_1"]
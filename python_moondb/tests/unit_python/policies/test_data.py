@@ -62,9 +62,9 @@ def delete_action(policy_id, perimeter_id):
     PolicyManager.delete_action("", policy_id, perimeter_id)
 
 
-def get_objects(policy_id, perimeter_id=None):
+def get_objects(policy_id, perimeter_id=None, **filters):
     from python_moondb.core import PolicyManager
-    return PolicyManager.get_objects("", policy_id, perimeter_id)
+    return PolicyManager.get_objects("", policy_id, perimeter_id, **filters)
 
 
 def add_object(policy_id, perimeter_id=None, value=None):
@@ -371,6 +371,30 @@ def test_get_objects(db):
     assert objects[object_id].get('policy_list')[0] == policy_id
 
 
+def test_get_objects_with_filters(db):
+    policy_id = "policy_id_filters"
+    names = ("vm_1", "vm%1", "vm1", "policy_id_filters", "vm\\1")
+    for index, name in enumerate(names):
+        add_object(policy_id=policy_id, perimeter_id="object_{}".format(index),
+                   value={"name": name, "description": "test"})
+    add_object(policy_id="policy_id_other", perimeter_id="object_other",
+               value={"name": "vm1", "description": policy_id})
+    for name in names:
+        objects = get_objects(policy_id, name=name)
+        assert [_object["name"] for _object in objects.values()] == [name]
+    objects = get_objects(policy_id, ids=["object_1", "object_3", "object_other"])
+    assert list(objects.keys()) == ["object_1", "object_3"]
+    pages = []
+    marker = None
+    while True:
+        objects = get_objects(policy_id, limit=2, marker=marker)
+        if not objects:
+            break
+        pages.append(list(objects.keys()))
+        marker = pages[-1][-1]
+    assert pages == [["object_0", "object_1"], ["object_2", "object_3"], ["object_4"]]
+
+
 def test_add_object(db):
     policy_id = "policy_id_1"
     value = {
@@ -485,6 +509,23 @@ def test_delete_subject(db):
     assert not subjects
 
 
+def test_get_subjects_of_several_policies(db):
+    value = {
+        "name": "testuser",
+        "description": "test",
+    }
+    subject = add_subject(policy_id="policy_id_1", value=value)
+    subject_id = list(subject.keys())[0]
+    add_subject("policy_id_2", subject_id, value)
+    assert list(get_subjects("policy_id_1").keys()) == [subject_id]
+    assert list(get_subjects("policy_id_2").keys()) == [subject_id]
+    delete_subject("policy_id_1", subject_id)
+    assert not get_subjects("policy_id_1")
+    assert list(get_subjects("policy_id_2").keys()) == [subject_id]
+    delete_subject("policy_id_2", subject_id)
+    assert not get_subjects("policy_id_2")
+
+
 def test_delete_subject_with_invalid_perimeter_id(db):
     policy_id = "invalid"
     perimeter_id = "invalid"
@@ -516,3 +557,46 @@ def test_get_available_metadata_with_invalid_policy_id(db):
     with pytest.raises(Exception) as exception_info:
         get_available_metadata(policy_id='invalid')
     assert '400: Policy Unknown' == str(exception_info.value)
+
+
+def test_add_objects_in_bulk(db):
+    from python_moondb.core import PolicyManager
+    add_object("policy_id_1", "object_1", {"name": "object_1", "description": "test"})
+    results = PolicyManager.add_objects("", "policy_id_2", [
+        {"id": "object_1", "name": "object_1"},
+        {"id": "object_2", "name": "object_2", "description": "test"},
+        {"name": "object_3"},
+        {"id": "object_2", "name": "object_2"},
+    ])
+    assert [result["added"] for result in results] == [False, True, True, False]
+    objects = get_objects("policy_id_2")
+    assert set(objects.keys()) == {"object_1", "object_2", results[2]["id"]}
+    assert objects["object_1"]["policy_list"] == ["policy_id_1", "policy_id_2"]
+    assert objects["object_2"]["description"] == "test"
+    assert list(get_objects("policy_id_1").keys()) == ["object_1"]
+
+
+def test_add_subject_data_in_bulk(db):
+    from python_moondb.core import PolicyManager
+    policy_id = mock_data.get_policy_id()
+    results = PolicyManager.add_subject_data_list("", policy_id, "subject_category_id1", [
+        {"id": "data_1", "name": "data_1", "description": "test"},
+        {"name": "data_2", "description": "test"},
+        {"id": "data_1", "name": "data_1", "description": "test"},
+    ])
+    assert [result["added"] for result in results] == [True, True, False]
+    data = get_subject_data(policy_id, category_id="subject_category_id1")[0]["data"]
+    assert set(data.keys()) == {"data_1", results[1]["id"]}
+    assert data["data_1"]["name"] == "data_1"
+
+
+def test_add_subjects_in_bulk(db):
+    from python_moondb.core import PolicyManager
+    results = PolicyManager.add_subjects("", "policy_id_1", [
+        {"id": "subject_1", "name": "subject_1"},
+        {"name": "testuser", "description": "test"},
+    ])
+    assert [result["added"] for result in results] == [True, True]
+    subjects = get_subjects("policy_id_1")
+    assert subjects[results[1]["id"]]["name"] == "testuser"
+    assert results[1]["id"] != "subject_1"
@@ -286,3 +286,251 @@ def test_delete_rule(db):
     delete_rule(policy_id, rule_id)
     rules = get_rules(policy_id, meta_rule_id)
     assert not rules.get('rules')
+
+
+def test_add_rules(db):
+    from python_moondb.core import PolicyManager
+    policy_id = "bulk"
+    rules = [{
+        "meta_rule_id": "1",
+        "rule": ("high", "medium", "action{}".format(index)),
+        "instructions": ({"decision": "grant"}, ),
+        "enabled": True,
+    } for index in range(3)]
+    add_rule(policy_id, "1", dict(rules[0], enabled=True))
+    result = PolicyManager.add_rules("", policy_id, rules + rules[1:2])
+    assert [_rule["added"] for _rule in result] == [False, True, True, False]
+    assert result[1]["id"] == result[3]["id"]
+    assert len(get_rules(policy_id)["rules"]) == 3
+    assert PolicyManager.delete_rules("", policy_id, [result[0]["id"], result[1]["id"], "unknown"]) == 2
+    assert len(get_rules(policy_id)["rules"]) == 1
+
+
+def test_add_rules_without_meta_rule(db):
+    from python_moondb.core import PolicyManager
+    with pytest.raises(Exception) as exception_info:
+        PolicyManager.add_rules("", "bulk", [{"rule": ("high", "medium", "vm-action")}])
+    assert str(exception_info.value) == '400: Sub Meta Rule Unknown'
+
+
+def test_rules_version(db):
+    from python_moondb.core import PolicyManager
+    policy_id = "version"
+    version = PolicyManager.get_rules_version("", policy_id)
+    get_rules(policy_id, "1")
+    assert PolicyManager.get_rules_version("", policy_id) == version
+    rules = add_rule(policy_id, "1")
+    new_version = PolicyManager.get_rules_version("", policy_id)
+    assert new_version != version
+    assert PolicyManager.get_rules_version("", "other_policy") != new_version
+    delete_rule(policy_id, list(rules.keys())[0])
+    assert PolicyManager.get_rules_version("", policy_id) != new_version
+
+
+def test_get_version_does_not_write(db):
+    from python_moondb.core import PolicyManager
+    from python_moondb.backends.sql import Version
+    version = PolicyManager.get_rules_version("", "unknown_policy")
+    assert PolicyManager.get_rules_version("", "unknown_policy") == version
+    with PolicyManager.driver.get_session_for_read() as session:
+        assert session.query(Version).get("rules:unknown_policy") is None
+
+
+def import_policy(policy_id, value):
+    from python_moondb.core import PolicyManager
+    return PolicyManager.import_policy("", policy_id, value)
+
+
+def test_import_policy(db):
+    from python_moondb.core import ModelManager
+    policy_id = mock_data.get_policy_id()
+    model_id = get_policies()[policy_id]["model_id"]
+    meta_rule_id = ModelManager.get_models("", model_id)[model_id]["meta_rules"][0]
+    value = {
+        "subject_data": {"subject_category_id1": ["admin", "dev"], "subject_category_id2": ["high"]},
+        "object_data": {"object_category_id1": ["vm1"]},
+        "action_data": {"action_category_id1": ["boot"]},
+        "subjects": ["testuser"],
+        "objects": ["vm1", "vm2"],
+        "actions": ["boot"],
+        "subject_assignments": [
+            {"subject": "testuser", "category_id": "subject_category_id1", "data": "admin"},
+            {"subject": "testuser", "category_id": "subject_category_id1", "data": "dev"},
+        ],
+        "object_assignments": [
+            {"object": "vm1", "category_id": "object_category_id1", "data": "vm1"},
+        ],
+        "action_assignments": [
+            {"action": "boot", "category_id": "action_category_id1", "data": "boot"},
+        ],
+        "rules": [
+            {"meta_rule_id": meta_rule_id, "rule": ["admin", "high", "vm1", "boot"]},
+            {"meta_rule_id": meta_rule_id, "rule": ["dev", "high", "vm1", "boot"]},
+        ]
+    }
+    result = import_policy(policy_id, value)
+    assert result["rules"] == 2
+    assert set(result["objects"].keys()) == {"vm1", "vm2"}
+    admin_id = result["subject_data"]["subject_category_id1"]["admin"]
+    dev_id = result["subject_data"]["subject_category_id1"]["dev"]
+    from python_moondb.core import PolicyManager
+    subject_id = result["subjects"]["testuser"]
+    assignments = PolicyManager.get_subject_assignments("", policy_id, subject_id, "subject_category_id1")
+    assert list(assignments.values())[0]["assignments"] == [admin_id, dev_id]
+    rules = get_rules(policy_id, meta_rule_id)["rules"]
+    assert len(rules) == 2
+    assert rules[0]["rule"][0] in (admin_id, dev_id)
+
+    # Note: importing the same document twice must not duplicate anything
+    result_2 = import_policy(policy_id, value)
+    assert result_2["rules"] == 0
+    assert result_2["subject_data"] == result["subject_data"]
+    assert result_2["objects"] == result["objects"]
+    assert len(get_rules(policy_id, meta_rule_id)["rules"]) == 2
+
+
+def test_import_policy_reads_only_its_subjects(set_consul_and_db, monkeypatch):
+    from python_moondb.core import PolicyManager
+    policy_id = mock_data.get_policy_id()
+    get_subjects = PolicyManager.driver.get_subjects
+
+    def get_policy_subjects(policy_id, *args, **kwargs):
+        assert policy_id, "the subjects of every policy are read"
+        return get_subjects(policy_id, *args, **kwargs)
+    monkeypatch.setattr(PolicyManager.driver, "get_subjects", get_policy_subjects)
+    import_policy(policy_id, {"subjects": ["import_user"]})
+    result = import_policy(policy_id, {"subjects": ["import_user", "other_import_user"]})
+    assert set(result["subjects"].keys()) == {"import_user", "other_import_user"}
+    posts = [request.json()["user"]["name"] for request in set_consul_and_db.request_history
+             if request.method == "POST" and request.path == "/v3/users/"]
+    assert posts == ["import_user", "other_import_user"]
+    assert PolicyManager.driver.get_subjects_by_names(["import_user", "unknown"]).keys() == {"import_user"}
+
+
+def test_import_policy_bad_rule(db):
+    from python_moondb.core import ModelManager
+    from python_moonutilities import exceptions
+    policy_id = mock_data.get_policy_id()
+    model_id = get_policies()[policy_id]["model_id"]
+    meta_rule_id = ModelManager.get_models("", model_id)[model_id]["meta_rules"][0]
+    value = {
+        "subject_data": {"subject_category_id1": ["admin"]},
+        "rules": [
+            {"meta_rule_id": meta_rule_id, "rule": ["admin"]},
+        ]
+    }
+    with pytest.raises(exceptions.RuleContentError):
+        import_policy(policy_id, value)
+    from python_moondb.core import PolicyManager
+    # Note: nothing is written when the import fails
+    assert not PolicyManager.get_subject_data("", policy_id, category_id="subject_category_id1")[0]["data"]
+
+
+def test_import_policy_failure_deletes_keystone_users(set_consul_and_db):
+    from python_moondb.core import ModelManager
+    from python_moonutilities import exceptions
+    set_consul_and_db.register_uri('POST', 'http://keystone:5000/v3/users/',
+                                   json={"user": {"id": "new_user_id", "name": "new_user"}})
+    set_consul_and_db.register_uri('DELETE', 'http://keystone:5000/v3/users/new_user_id', status_code=204)
+    policy_id = mock_data.get_policy_id()
+    model_id = get_policies()[policy_id]["model_id"]
+    meta_rule_id = ModelManager.get_models("", model_id)[model_id]["meta_rules"][0]
+    with pytest.raises(exceptions.RuleContentError):
+        import_policy(policy_id, {
+            "subjects": ["new_user"],
+            "rules": [{"meta_rule_id": meta_rule_id, "rule": ["admin"]}],
+        })
+    deletions = [request for request in set_consul_and_db.request_history if request.method == "DELETE"]
+    assert [request.path for request in deletions] == ["/v3/users/new_user_id"]
+
+
+def test_clone_policy(db):
+    from python_moondb.core import ModelManager, PolicyManager, PDPManager
+    policy_id = mock_data.get_policy_id()
+    model_id = get_policies()[policy_id]["model_id"]
+    meta_rule_id = ModelManager.get_models("", model_id)[model_id]["meta_rules"][0]
+    result = import_policy(policy_id, {
+        "subject_data": {"subject_category_id1": ["admin"], "subject_category_id2": ["high"]},
+        "object_data": {"object_category_id1": ["vm1"]},
+        "action_data": {"action_category_id1": ["boot"]},
+        "subjects": ["testuser"],
+        "subject_assignments": [
+            {"subject": "testuser", "category_id": "subject_category_id1", "data": "admin"},
+        ],
+        "rules": [
+            {"meta_rule_id": meta_rule_id, "rule": ["admin", "high", "vm1", "boot"]},
+        ]
+    })
+    admin_id = result["subject_data"]["subject_category_id1"]["admin"]
+    subject_id = result["subjects"]["testuser"]
+
+    clone = PolicyManager.clone_policy("", policy_id, value={"name": "clone"},
+                                       pdp_value={"name": "clone_pdp", "keystone_project_id": None})
+    new_policy_id = list(clone["policies"].keys())[0]
+    assert clone["policies"][new_policy_id]["name"] == "clone"
+    assert clone["policies"][new_policy_id]["model_id"] == model_id
+    pdp_id = list(clone["pdp"].keys())[0]
+    assert PDPManager.get_pdp("", pdp_id)[pdp_id]["security_pipeline"] == [new_policy_id]
+
+    data = PolicyManager.get_subject_data("", new_policy_id, category_id="subject_category_id1")[0]["data"]
+    assert [_data["name"] for _data in data.values()] == ["admin"]
+    new_admin_id = list(data.keys())[0]
+    assert new_admin_id != admin_id
+    assert new_policy_id in PolicyManager.get_subjects("", new_policy_id)[subject_id]["policy_list"]
+    assignments = PolicyManager.get_subject_assignments("", new_policy_id, subject_id, "subject_category_id1")
+    assert list(assignments.values())[0]["assignments"] == [new_admin_id]
+    rules = get_rules(new_policy_id, meta_rule_id)["rules"]
+    assert len(rules) == 1
+    assert rules[0]["rule"][0] == new_admin_id
+    # Note: the copied policy is left untouched
+    assert get_rules(policy_id, meta_rule_id)["rules"][0]["rule"][0] == admin_id
+
+
+def test_clone_unknown_policy(db):
+    from python_moondb.core import PolicyManager
+    from python_moonutilities import exceptions
+    with pytest.raises(exceptions.PolicyUnknown):
+        PolicyManager.clone_policy("", "unknown_policy")
+
+
+def test_delete_policy_and_model_with_dependents(db):
+    from python_moondb.core import ModelManager, PolicyManager, PDPManager
+    policy_id = mock_data.get_policy_id()
+    model_id = get_policies()[policy_id]["model_id"]
+    meta_rule_id = ModelManager.get_models("", model_id)[model_id]["meta_rules"][0]
+    result = import_policy(policy_id, {
+        "subject_data": {"subject_category_id1": ["admin"], "subject_category_id2": ["high"]},
+        "object_data": {"object_category_id1": ["vm1"]},
+        "action_data": {"action_category_id1": ["boot"]},
+        "subjects": ["testuser"],
+        "objects": ["vm1"],
+        "subject_assignments": [
+            {"subject": "testuser", "category_id": "subject_category_id1", "data": "admin"},
+        ],
+        "rules": [
+            {"meta_rule_id": meta_rule_id, "rule": ["admin", "high", "vm1", "boot"]},
+        ]
+    })
+    subject_id = result["subjects"]["testuser"]
+    object_id = result["objects"]["vm1"]
+    clone = PolicyManager.clone_policy("", policy_id, value={"name": "clone"},
+                                       pdp_value={"name": "clone_pdp", "keystone_project_id": None})
+    new_policy_id = list(clone["policies"].keys())[0]
+    pdp_id = list(clone["pdp"].keys())[0]
+    PolicyManager.delete_object("", new_policy_id, object_id)
+
+    PolicyManager.delete_policy("admin", policy_id)
+    assert policy_id not in get_policies()
+    driver = PolicyManager.driver
+    assert not driver.get_subject_data(policy_id, category_id="subject_category_id1")["data"]
+    assert not driver.get_subject_assignments(policy_id)
+    assert not driver.get_rules(policy_id)["rules"]
+    assert driver.get_subjects(new_policy_id)[subject_id]["policy_list"] == [new_policy_id]
+    # Note: the object was only in the deleted policy
+    assert object_id not in driver.get_objects(None)
+
+    ModelManager.delete_model("", model_id)
+    assert new_policy_id not in get_policies()
+    assert meta_rule_id not in ModelManager.get_meta_rules("")
+    assert PDPManager.get_pdp("", pdp_id)[pdp_id]["security_pipeline"] == []
+    assert subject_id not in driver.get_subjects(None)
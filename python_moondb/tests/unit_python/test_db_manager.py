@@ -0,0 +1,37 @@
+import importlib
+import json
+import sqlalchemy as sql
+
+
+def get_indexes(engine, table_name):
+    return [index["name"] for index in sql.inspect(engine).get_indexes(table_name)]
+
+
+def test_policy_indexes_migration():
+    engine = sql.create_engine("sqlite://")
+    importlib.import_module("python_moondb.migrate_repo.versions.001_moon").upgrade(engine)
+    migration = importlib.import_module("python_moondb.migrate_repo.versions.006_policy_indexes")
+    migration.upgrade(engine)
+    # Note: the indexes already created are skipped
+    migration.upgrade(engine)
+    assert get_indexes(engine, "subject_assignments") == ["subject_assignments_policy"]
+    assert get_indexes(engine, "action_data") == ["action_data_policy"]
+    migration.downgrade(engine)
+    assert get_indexes(engine, "subject_assignments") == []
+
+
+def test_assignment_rows_migration():
+    engine = sql.create_engine("sqlite://")
+    importlib.import_module("python_moondb.migrate_repo.versions.001_moon").upgrade(engine)
+    engine.execute("INSERT INTO subject_assignments (id, assignments, policy_id, subject_id, category_id) "
+                   "VALUES ('assignment_1', ?, 'policy_1', 'subject_1', 'category_1')",
+                   json.dumps(["data_1", "data_2"]))
+    migration = importlib.import_module("python_moondb.migrate_repo.versions.007_assignment_rows")
+    migration.upgrade(engine)
+    migration.upgrade(engine)
+    rows = engine.execute("SELECT assignment_id, data_id FROM subject_assignments ORDER BY data_id").fetchall()
+    assert [tuple(row) for row in rows] == [("assignment_1", "data_1"), ("assignment_1", "data_2")]
+    migration.downgrade(engine)
+    row = engine.execute("SELECT id, assignments FROM subject_assignments").fetchone()
+    assert row.id == "assignment_1"
+    assert json.loads(row.assignments) == ["data_1", "data_2"]
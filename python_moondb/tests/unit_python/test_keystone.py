@@ -51,3 +51,53 @@ def test_create_user():
     }
     user = create_user(subject_dict)
     assert user
+
+
+def get_requests(mocker, method, path):
+    return [_req for _req in mocker.request_history if _req.method == method and _req.path == path]
+
+
+def test_admin_token_is_reused(set_consul_and_db):
+    create_user({"name": "user_id_1"})
+    create_user({"name": "user_id_2"})
+    create_user({"name": "user_id_3"})
+    assert len(get_requests(set_consul_and_db, "POST", "/v3/auth/tokens")) <= 1
+    assert not get_requests(set_consul_and_db, "DELETE", "/v3/auth/tokens")
+
+
+def test_admin_token_is_renewed_when_refused(set_consul_and_db):
+    create_user({"name": "user_id_1"})
+    logins = len(get_requests(set_consul_and_db, "POST", "/v3/auth/tokens"))
+    set_consul_and_db.register_uri('POST', 'http://keystone:5000/v3/users/', [
+        {"status_code": 401, "json": {}},
+        {"status_code": 201, "json": {"user": {"id": "user_id_1", "name": "user_1"}}},
+    ])
+    assert create_user({"name": "user_1"})["user"]["id"] == "user_id_1"
+    assert len(get_requests(set_consul_and_db, "POST", "/v3/auth/tokens")) == logins + 1
+
+
+def test_ensure_users(set_consul_and_db):
+    from python_moondb.core import KeystoneManager
+    set_consul_and_db.register_uri('GET', 'http://keystone:5000/v3/users?domain_id=default',
+                                   json={"users": [{"id": "existing_id", "name": "existing"}]})
+    set_consul_and_db.register_uri('POST', 'http://keystone:5000/v3/users/',
+                                   json={"user": {"id": "new_id", "name": "new"}})
+    users = KeystoneManager.ensure_users([{"name": "existing"}, {"name": "new"}])
+    assert users["existing"]["id"] == "existing_id"
+    assert users["new"]["id"] == "new_id"
+    assert len(get_requests(set_consul_and_db, "GET", "/v3/users")) == 1
+    assert len(get_requests(set_consul_and_db, "POST", "/v3/users/")) == 1
+
+
+def test_admin_token_is_revoked(set_consul_and_db):
+    from python_moondb.core import KeystoneManager
+    create_user({"name": "user_id_1"})
+    revocations = len(get_requests(set_consul_and_db, "DELETE", "/v3/auth/tokens"))
+    # Note: the token has expired, it is revoked once renewed
+    KeystoneManager._KeystoneManager__headers_expiration = 0
+    create_user({"name": "user_id_2"})
+    assert len(get_requests(set_consul_and_db, "DELETE", "/v3/auth/tokens")) == revocations + 1
+    KeystoneManager.close()
+    assert len(get_requests(set_consul_and_db, "DELETE", "/v3/auth/tokens")) == revocations + 2
+    KeystoneManager.close()
+    assert len(get_requests(set_consul_and_db, "DELETE", "/v3/auth/tokens")) == revocations + 2
@@ -0,0 +1,82 @@
+import pytest
+
+
+@pytest.fixture
+def driver():
+    from python_moondb.backends.memory import MemoryConnector, Store
+    driver = MemoryConnector("memory://")
+    driver.store = Store()
+    return driver
+
+
+def test_perimeter_by_policy(driver):
+    driver.set_subject("policy_1", "subject_1", {"name": "user1"})
+    driver.set_subject("policy_2", "subject_2", {"name": "user2"})
+    driver.set_subject("policy_2", "subject_1", {"name": "user1"})
+    assert list(driver.get_subjects("policy_1").keys()) == ["subject_1"]
+    assert list(driver.get_subjects("policy_2").keys()) == ["subject_1", "subject_2"]
+    assert list(driver.get_subjects("policy_2", name="user2").keys()) == ["subject_2"]
+    driver.delete_subject("policy_2", "subject_1")
+    assert list(driver.get_subjects("policy_2").keys()) == ["subject_2"]
+    assert driver.get_subjects_by_names(["user2", "user3"])["user2"]["id"] == "subject_2"
+    assert "user3" not in driver.get_subjects_by_names(["user2", "user3"])
+    assert driver.get_subjects(None)["subject_1"]["policy_list"] == ["policy_1"]
+
+
+def test_assignments_and_rules(driver):
+    driver.add_subject_assignment("policy_1", "subject_1", "category_1", "data_1")
+    result = driver.add_subject_assignments("policy_1", [
+        {"subject_id": "subject_1", "category_id": "category_1", "data_id": "data_2"},
+        {"subject_id": "subject_1", "category_id": "category_1", "data_id": "data_1"},
+    ])
+    assert [item["added"] for item in result] == [True, False]
+    assignments = driver.get_subject_assignments("policy_1", data_id="data_2")
+    assert list(assignments.values())[0]["assignments"] == ["data_1", "data_2"]
+    rule = {"meta_rule_id": "meta_rule_1", "rule": ["data_1"], "instructions": ({"decision": "grant"}, ),
+            "enabled": True}
+    assert driver.add_rules("policy_1", [rule, rule])[1]["added"] is False
+    rules = driver.get_rules("policy_1")["rules"]
+    assert len(rules) == 1
+    assert rules[0]["instructions"] == [{"decision": "grant"}]
+
+
+def test_operation_rolls_back_on_error(driver):
+    version = driver.get_version("policies")
+    with pytest.raises(ValueError):
+        with driver.operation():
+            driver.add_policy("policy_rollback", {"name": "policy_rollback"})
+            assert driver.get_version("policies") != version
+            raise ValueError
+    assert driver.get_policies() == {}
+    assert driver.get_version("policies") == version
+
+
+def test_snapshot(driver, tmpdir):
+    from python_moondb.backends.memory import Store
+    driver.store.path = str(tmpdir.join("moon.json"))
+    driver.add_policy("policy_1", {"name": "policy_1"})
+    driver.add_subject_assignment("policy_1", "subject_1", "category_1", "data_1")
+    driver.snapshot()
+    store = Store(driver.store.path)
+    assert list(store.tables["policies"].keys()) == ["policy_1"]
+    assert store.find("subject_assignments", "perimeter", ("policy_1", "subject_1", "category_1"))
+
+
+def test_import_policy(driver):
+    driver.set_meta_rule("meta_rule_1", {"name": "meta_rule_1", "subject_categories": ["category_1"],
+                                         "object_categories": [], "action_categories": []})
+    driver.set_subject("policy_2", "subject_1", {"name": "user1"})
+    value = {
+        "subject_data": {"category_1": {"admin": {"name": "admin"}}},
+        "subjects": {"user1": {"name": "user1"}},
+        "subject_assignments": [{"subject": "user1", "category_id": "category_1", "data": "admin"}],
+        "rules": [{"meta_rule_id": "meta_rule_1", "rule": ["admin"]}],
+    }
+    result = driver.import_policy("policy_1", value)
+    assert result["subjects"] == {"user1": "subject_1"}
+    assert result["rules"] == 1
+    data_id = result["subject_data"]["category_1"]["admin"]
+    # Note: the rules may give the IDs of the data instead of their names
+    value["rules"] = [{"meta_rule_id": "meta_rule_1", "rule": [data_id], "enabled": False}]
+    assert driver.import_policy("policy_1", value)["rules"] == 1
+    assert driver.get_subjects("policy_1")["subject_1"]["policy_list"] == ["policy_2", "policy_1"]
@@ -0,0 +1,23 @@
+import logging
+
+
+def test_manager_statements_are_counted(db):
+    from python_moondb.core import PolicyManager
+    from python_moondb.api.metrics import metrics
+    metrics.reset()
+    PolicyManager.add_policy("", "policy_metrics", {"name": "policy_metrics", "model_id": ""})
+    PolicyManager.get_subjects("", "policy_metrics")
+    result = metrics.get()
+    assert result["PolicyManager.add_policy"]["calls"] == 1
+    assert result["PolicyManager.add_policy"]["statements"] > 0
+    assert result["PolicyManager.get_subjects"]["max_statements"] > 0
+    assert not [name for name in result if not name.startswith("PolicyManager.")]
+
+
+def test_too_many_statements_are_logged(db, monkeypatch, caplog):
+    from python_moondb.core import ModelManager
+    from python_moondb.api.metrics import metrics
+    monkeypatch.setattr(metrics, "max_statements", 1)
+    with caplog.at_level(logging.WARNING, logger="moon.db.api.metrics"):
+        ModelManager.add_model("", "model_metrics", {"name": "model_metrics", "meta_rules": []})
+    assert "ModelManager.add_model issued" in caplog.text
@@ -0,0 +1,55 @@
+import policies.mock_data as mock_data
+
+
+def test_available_metadata_is_cached(db, monkeypatch):
+    from python_moondb.core import PolicyManager, ModelManager
+    policy_id = mock_data.get_policy_id()
+    model_id = PolicyManager.get_policies("", policy_id)[policy_id]["model_id"]
+    categories = PolicyManager.get_available_metadata("", policy_id)
+    assert categories["object"] == ["object_category_id1"]
+
+    calls = []
+    get_models = ModelManager.driver.get_models
+    monkeypatch.setattr(ModelManager.driver, "get_models",
+                        lambda *args, **kwargs: calls.append(1) or get_models(*args, **kwargs))
+    assert PolicyManager.get_available_metadata("", policy_id) == categories
+    assert not calls
+
+    # Note: a write through the managers gives a new version to the collection
+    meta_rule_id = ModelManager.get_models("", model_id)[model_id]["meta_rules"][0]
+    ModelManager.update_model("", model_id, {"meta_rules": []})
+    assert PolicyManager.get_available_metadata("", policy_id)["object"] == []
+    assert calls
+    ModelManager.update_model("", model_id, {"meta_rules": [meta_rule_id]})
+    assert PolicyManager.get_available_metadata("", policy_id) == categories
+
+
+def test_cache_sees_writes_of_other_processes(db):
+    from python_moondb.core import PolicyManager
+    policy_id = mock_data.get_policy_id()
+    PolicyManager.get_available_metadata("", policy_id)
+    # Note: another process writes the database without touching this cache
+    PolicyManager.driver.update_policy(policy_id, {"model_id": "unknown_model"})
+    assert PolicyManager.get_available_metadata("", policy_id) == {"subject": [], "object": [], "action": []}
+
+
+def test_cache_returns_copies(db):
+    from python_moondb.api.cache import QueryCache
+    from python_moondb.core import PolicyManager
+    policy_id = mock_data.get_policy_id()
+    query_cache = QueryCache()
+    loaders = {"policies": PolicyManager.driver.get_policies}
+    policies = query_cache.get(PolicyManager.driver, loaders)["policies"]
+    policies[policy_id]["name"] = "changed by the caller"
+    policies.clear()
+    assert query_cache.get(PolicyManager.driver, loaders)["policies"][policy_id]["name"] != "changed by the caller"
+
+
+def test_invalidate_keeps_the_method_names():
+    from python_moondb.api.cache import invalidate
+
+    @invalidate("policies")
+    def delete_policy():
+        """Delete a policy"""
+    assert delete_policy.__name__ == "delete_policy"
+    assert delete_policy.__doc__ == "Delete a policy"
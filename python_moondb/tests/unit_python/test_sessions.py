@@ -0,0 +1,62 @@
+import pytest
+
+
+def test_managers_share_one_engine(db):
+    from python_moondb.core import PolicyManager, ModelManager, PDPManager
+    assert PolicyManager.driver.engine is ModelManager.driver.engine
+    assert PolicyManager.driver.engine is PDPManager.driver.engine
+
+
+def test_operation_reuses_one_session(db, monkeypatch):
+    from python_moondb.core import PolicyManager
+    from python_moondb.backends import sql
+    sessions = []
+    session_factory = sql.session_factory
+    monkeypatch.setattr(sql, "session_factory",
+                        lambda *args, **kwargs: sessions.append(1) or session_factory(*args, **kwargs))
+    PolicyManager.add_policy("", "policy_operation", {"name": "policy_operation", "model_id": ""})
+    assert len(sessions) == 1
+    PolicyManager.driver.get_policies()
+    assert len(sessions) == 2
+
+
+def test_operation_rolls_back_on_error(db):
+    from python_moondb.core import PolicyManager
+    with pytest.raises(ValueError):
+        with PolicyManager.driver.operation():
+            PolicyManager.driver.add_policy("policy_rollback", {"name": "policy_rollback"})
+            assert "policy_rollback" in PolicyManager.driver.get_policies()
+            raise ValueError
+    assert "policy_rollback" not in PolicyManager.driver.get_policies()
+
+
+def test_reads_use_the_read_replicas(db, monkeypatch):
+    from python_moondb.core import PolicyManager
+    from python_moondb.backends import sql
+    PolicyManager.driver.add_policy("policy_primary", {"name": "policy_primary"})
+    replica = sql.get_engine("sqlite://")
+    sql.Base.metadata.create_all(replica)
+    monkeypatch.setattr(PolicyManager.driver, "read_engines", [replica])
+    assert PolicyManager.driver.get_policies() == {}
+    PolicyManager.driver.add_policy("policy_written", {"name": "policy_written"})
+    with PolicyManager.driver.operation():
+        assert "policy_written" in PolicyManager.driver.get_policies()
+    assert PolicyManager.driver.get_policies() == {}
+
+
+def test_reads_fall_back_to_the_primary(db, monkeypatch):
+    from python_moondb.core import PolicyManager
+    from python_moondb.backends import sql
+    PolicyManager.driver.add_policy("policy_primary", {"name": "policy_primary"})
+    replica = sql.get_engine("sqlite:////nonexistent/replica.db")
+    monkeypatch.setattr(PolicyManager.driver, "read_engines", [replica])
+    assert "policy_primary" in PolicyManager.driver.get_policies()
+
+
+def test_json_codec_falls_back_to_json(monkeypatch):
+    import json
+    from python_moonutilities import configuration
+    from python_moondb.backends import sql
+    monkeypatch.setattr(configuration, "get_configuration",
+                        lambda key: {"database": {"json_codec": "unknown_json_codec"}})
+    assert sql.get_json_loads() is json.loads
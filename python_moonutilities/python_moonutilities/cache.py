@@ -1,5 +1,7 @@
 import logging
+import threading
 import time
+from concurrent import futures
 import python_moonutilities.request_wrapper as requests
 from uuid import uuid4
 from python_moonutilities import configuration, exceptions
@@ -55,44 +57,117 @@ class Cache(object):
 
     __AUTHZ_REQUESTS = {}
 
+    __READY = threading.Event()
+
     def __init__(self):
-        self.manager_url = "{}://{}:{}".format(
-            configuration.get_components()['manager'].get('protocol', 'http'),
-            configuration.get_components()['manager']['hostname'],
-            configuration.get_components()['manager']['port']
+        self.__manager_url = None
+        self.__orchestrator_url = None
+        # Note: the ETags of the collections held by this instance, another instance may not hold them
+        self.__etags = {}
+
+    def __update_urls(self):
+        components = configuration.get_components()
+        self.__manager_url = "{}://{}:{}".format(
+            components['manager'].get('protocol', 'http'),
+            components['manager']['hostname'],
+            components['manager']['port']
         )
-        self.orchestrator_url = "{}://{}:{}".format(
-            configuration.get_components()['orchestrator'].get('protocol', 'http'),
-            configuration.get_components()['orchestrator']['hostname'],
-            configuration.get_components()['orchestrator']['port']
+        self.__orchestrator_url = "{}://{}:{}".format(
+            components['orchestrator'].get('protocol', 'http'),
+            components['orchestrator']['hostname'],
+            components['orchestrator']['port']
         )
 
+    @property
+    def manager_url(self):
+        """URL of the Manager (read from Consul on first use)"""
+        if not self.__manager_url:
+            self.__update_urls()
+        return self.__manager_url
+
+    @property
+    def orchestrator_url(self):
+        """URL of the Orchestrator (read from Consul on first use)"""
+        if not self.__orchestrator_url:
+            self.__update_urls()
+        return self.__orchestrator_url
+
     def update(self):
-        self.__update_container()
-        self.__update_pdp()
-        self.__update_policies()
-        self.__update_models()
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            jobs = [executor.submit(func) for func in (
+                self.__update_container,
+                self.__update_pdp,
+                self.__update_policies,
+                self.__update_models)]
+        for job in jobs:
+            job.result()
         for key, value in self.__PDP.items():
             # LOG.info("Updating container_chaining with {}".format(value["keystone_project_id"]))
             if "keystone_project_id" in value:
                 self.__update_container_chaining(value["keystone_project_id"])
             else:
                 logger.warning("no 'keystone_project_id' found while Updating container_chaining")
+        self.__READY.set()
+
+    def warm_up(self):
+        """Update the cache in background, retrying until it succeeds
+
+        :return: the thread running the update
+        """
+        def _warm_up():
+            while not self.__READY.is_set():
+                try:
+                    self.update()
+                except Exception as e:
+                    logger.warning("Cannot warm up the cache ({}), retrying".format(e))
+                    time.sleep(1)
+        thread = threading.Thread(target=_warm_up, daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def ready(self):
+        """True when the cache has been updated at least once"""
+        return self.__READY.is_set()
 
     @property
     def authz_requests(self):
         return self.__AUTHZ_REQUESTS
 
+    def __get_if_modified(self, url, cached=True):
+        """Get a collection of the manager unless it has not changed
+
+        :param url: URL of the collection
+        :param cached: False if the previous response is no more in the cache
+        :return: the response or None if the collection has not changed
+        """
+        headers = None
+        if cached and url in self.__etags:
+            headers = {"If-None-Match": self.__etags[url]}
+        response = requests.get(url, headers=headers)
+        if response.status_code == 304:
+            return None
+        if "ETag" in response.headers:
+            self.__etags[url] = response.headers["ETag"]
+        else:
+            self.__etags.pop(url, None)
+        return response
+
     # perimeter functions
 
     @property
     def subjects(self):
         return self.__SUBJECTS
 
-    def __update_subjects(self, policy_id):
-        response = requests.get("{}/policies/{}/subjects".format(self.manager_url, policy_id))
+    def __update_subjects(self, policy_id, name=None):
+        params = {"name": name} if name else None
+        response = requests.get("{}/policies/{}/subjects".format(self.manager_url, policy_id),
+                                params=params)
         if 'subjects' in response.json():
-            self.__SUBJECTS[policy_id] = response.json()['subjects']
+            if name:
+                self.__SUBJECTS.setdefault(policy_id, {}).update(response.json()['subjects'])
+            else:
+                self.__SUBJECTS[policy_id] = response.json()['subjects']
         else:
             raise exceptions.SubjectUnknown("Cannot find subject within policy_id {}".format(policy_id))
 
@@ -105,12 +180,12 @@ class Cache(object):
                 if "name" in _subject_dict and _subject_dict["name"] == name:
                     return _subject_id
 
-        self.__update_subjects(policy_id)
+        # Note: only ask the manager for that name instead of every subject
+        self.__update_subjects(policy_id, name=name)
 
-        if policy_id in self.subjects:
-            for _subject_id, _subject_dict in self.__SUBJECTS[policy_id].items():
-                if "name" in _subject_dict and _subject_dict["name"] == name:
-                    return _subject_id
+        for _subject_id, _subject_dict in self.__SUBJECTS[policy_id].items():
+            if "name" in _subject_dict and _subject_dict["name"] == name:
+                return _subject_id
 
         raise exceptions.SubjectUnknown("Cannot find subject {}".format(name))
 
@@ -118,10 +193,15 @@ class Cache(object):
     def objects(self):
         return self.__OBJECTS
 
-    def __update_objects(self, policy_id):
-        response = requests.get("{}/policies/{}/objects".format(self.manager_url, policy_id))
+    def __update_objects(self, policy_id, name=None):
+        params = {"name": name} if name else None
+        response = requests.get("{}/policies/{}/objects".format(self.manager_url, policy_id),
+                                params=params)
         if 'objects' in response.json():
-            self.__OBJECTS[policy_id] = response.json()['objects']
+            if name:
+                self.__OBJECTS.setdefault(policy_id, {}).update(response.json()['objects'])
+            else:
+                self.__OBJECTS[policy_id] = response.json()['objects']
         else:
             raise exceptions.ObjectUnknown("Cannot find object within policy_id {}".format(policy_id))
 
@@ -134,12 +214,12 @@ class Cache(object):
                 if "name" in _object_dict and _object_dict["name"] == name:
                     return _object_id
 
-        self.__update_objects(policy_id)
+        # Note: only ask the manager for that name instead of every object
+        self.__update_objects(policy_id, name=name)
 
-        if policy_id in self.objects:
-            for _object_id, _object_dict in self.__OBJECTS[policy_id].items():
-                if "name" in _object_dict and _object_dict["name"] == name:
-                    return _object_id
+        for _object_id, _object_dict in self.__OBJECTS[policy_id].items():
+            if "name" in _object_dict and _object_dict["name"] == name:
+                return _object_id
 
         raise exceptions.ObjectUnknown("Cannot find object {}".format(name))
 
@@ -147,11 +227,15 @@ class Cache(object):
     def actions(self):
         return self.__ACTIONS
 
-    def __update_actions(self, policy_id):
-        response = requests.get("{}/policies/{}/actions".format(self.manager_url, policy_id))
-
+    def __update_actions(self, policy_id, name=None):
+        params = {"name": name} if name else None
+        response = requests.get("{}/policies/{}/actions".format(self.manager_url, policy_id),
+                                params=params)
         if 'actions' in response.json():
-            self.__ACTIONS[policy_id] = response.json()['actions']
+            if name:
+                self.__ACTIONS.setdefault(policy_id, {}).update(response.json()['actions'])
+            else:
+                self.__ACTIONS[policy_id] = response.json()['actions']
         else:
             raise exceptions.ActionUnknown("Cannot find action within policy_id {}".format(policy_id))
 
@@ -164,7 +248,8 @@ class Cache(object):
                 if "name" in _action_dict and _action_dict["name"] == name:
                     return _action_id
 
-        self.__update_actions(policy_id)
+        # Note: only ask the manager for that name instead of every action
+        self.__update_actions(policy_id, name=name)
 
         for _action_id, _action_dict in self.__ACTIONS[policy_id].items():
             if "name" in _action_dict and _action_dict["name"] == name:
@@ -184,7 +269,9 @@ class Cache(object):
         return self.__META_RULES
 
     def __update_meta_rules(self):
-        response = requests.get("{}/meta_rules".format(self.manager_url))
+        response = self.__get_if_modified("{}/meta_rules".format(self.manager_url))
+        if response is None:
+            return
 
         if 'meta_rules' in response.json():
             self.__META_RULES = response.json()['meta_rules']
@@ -207,8 +294,10 @@ class Cache(object):
             logger.debug("Get {}".format("{}/policies/{}/rules".format(
                 self.manager_url, policy_id)))
 
-            response = requests.get("{}/policies/{}/rules".format(
-                self.manager_url, policy_id))
+            response = self.__get_if_modified("{}/policies/{}/rules".format(
+                self.manager_url, policy_id), cached=policy_id in self.__RULES)
+            if response is None:
+                continue
             if 'rules' in response.json():
                 self.__RULES[policy_id] = response.json()['rules']
             else:
@@ -386,7 +475,9 @@ class Cache(object):
     # PDP functions
 
     def __update_pdp(self):
-        response = requests.get("{}/pdp".format(self.manager_url))
+        response = self.__get_if_modified("{}/pdp".format(self.manager_url))
+        if response is None:
+            return
         pdp = response.json()
         if 'pdps' in pdp:
             for _pdp in pdp["pdps"].values():
@@ -426,7 +517,9 @@ class Cache(object):
 
     # policy functions
     def __update_policies(self):
-        response = requests.get("{}/policies".format(self.manager_url))
+        response = self.__get_if_modified("{}/policies".format(self.manager_url))
+        if response is None:
+            return
         policies = response.json()
 
         if 'policies' in policies:
@@ -447,7 +540,9 @@ class Cache(object):
     # model functions
 
     def __update_models(self):
-        response = requests.get("{}/models".format(self.manager_url))
+        response = self.__get_if_modified("{}/models".format(self.manager_url))
+        if response is None:
+            return
         models = response.json()
         if 'models' in models:
             for key, value in models["models"].items():
@@ -618,6 +713,17 @@ class Cache(object):
                     "genre": "genre",
                     "policy_id": "policy_id",
                     "meta_rule_id": "meta_rule_id",
+                    "hostname": "hostname",
+                    "hostip": "hostip",
+                    "port": "port",
+                    "replicas": [
+                        {
+                            "container_id": "container_id",
+                            "hostname": "hostname",
+                            "hostip": "hostip",
+                            "port": "port",
+                        }
+                    ]
                 }
             ]
         }
@@ -648,23 +754,31 @@ class Cache(object):
                             model_id = self.policies[policy_id]['model_id']
                             if model_id in self.models and "meta_rules" in self.models[model_id]:
                                 for meta_rule_id in self.models[model_id]["meta_rules"]:
+                                    chaining = None
                                     for container_id, container_value in self.get_containers_from_keystone_project_id(
                                             keystone_project_id,
                                             meta_rule_id
                                     ):
                                         if "name" in container_value:
                                             if all(k in container_value for k in ("genre", "port")):
-                                                container_ids.append(
-                                                    {
-                                                        "container_id": container_value["name"],
+                                                replica = {
+                                                    "container_id": container_value["name"],
+                                                    "hostname": container_value["name"],
+                                                    "hostip": "127.0.0.1",
+                                                    "port": container_value["port"],
+                                                }
+                                                # Note: the first replica is kept at the top level
+                                                # for components unaware of the replicas list
+                                                if not chaining:
+                                                    chaining = dict(replica)
+                                                    chaining.update({
                                                         "genre": container_value["genre"],
                                                         "policy_id": policy_id,
                                                         "meta_rule_id": meta_rule_id,
-                                                        "hostname": container_value["name"],
-                                                        "hostip": "127.0.0.1",
-                                                        "port": container_value["port"],
-                                                    }
-                                                )
+                                                        "replicas": [],
+                                                    })
+                                                    container_ids.append(chaining)
+                                                chaining["replicas"].append(replica)
                                             else:
                                                 logger.warning("Container content keys not found {}", container_value)
                                         else:
@@ -677,4 +791,3 @@ class Cache(object):
                                                            "and may not contains 'model_id' key".format(policy_id))
 
         self.__CONTAINER_CHAINING[keystone_project_id] = container_ids
-
@@ -116,6 +116,3 @@ def get_components():
             item["Key"].replace("components/", ""): json.loads(base64.b64decode(item["Value"]).decode("utf-8"))
             for item in data
         }
-
-
-init_logging()
@@ -457,6 +457,13 @@ class RuleUnknown(AdminRule):
     logger = "ERROR"
 
 
+class RuleContentError(AdminRule):
+    description = _("The rule does not match its meta rule.")
+    code = 400
+    title = 'Rule Content Error'
+    logger = "ERROR"
+
+
 # Keystone exceptions
 
 
@@ -2,9 +2,9 @@ import sys
 import requests
 from python_moonutilities import exceptions
 
-def get(url):
+def get(url, params=None, headers=None):
     try:
-        response = requests.get(url)
+        response = requests.get(url, params=params, headers=headers)
     except requests.exceptions.RequestException as e:
         raise exceptions.ConsulError("request failure ",e)
     except:
@@ -0,0 +1,30 @@
+# Copyright 2015 Open Platform for NFV Project, Inc. and its contributors
+# This software is distributed under the terms and conditions of the 'Apache-2.0'
+# license which can be found in the file 'LICENSE' in this package distribution
+# or at 'http://www.apache.org/licenses/LICENSE-2.0'.
+"""
+Those API are shared by the Moon components which serve a cache.
+"""
+
+from flask_restful import Resource
+
+
+class Ready(Resource):
+    """
+    Endpoint for readiness requests
+    """
+
+    __urls__ = ("/ready", "/ready/")
+
+    def __init__(self, **kwargs):
+        self.CACHE = kwargs.get("cache")
+
+    def get(self):
+        """Check if the component has warmed its cache up
+
+        :return: {"result": True, "ready": True} with the HTTP code 200
+          or {"result": False, "ready": False} with the HTTP code 503
+        """
+        if self.CACHE.ready:
+            return {"result": True, "ready": True}
+        return {"result": False, "ready": False}, 503
@@ -16,9 +16,17 @@ from python_moonutilities import exceptions, configuration
 
 logger = logging.getLogger("moon.utilities." + __name__)
 
-keystone_config = configuration.get_configuration("openstack/keystone")["openstack/keystone"]
 TOKENS = {}
 __targets = {}
+__keystone_config = {}
+
+
+def get_keystone_config():
+    """Get the Keystone configuration, Consul is only requested on first use"""
+    if not __keystone_config:
+        __keystone_config.update(
+            configuration.get_configuration("openstack/keystone")["openstack/keystone"])
+    return __keystone_config
 
 
 def filter_input(func_or_str):
@@ -95,6 +103,7 @@ def enforce(action_names, object_name, **extra):
 
 
 def login(user=None, password=None, domain=None, project=None, url=None):
+    keystone_config = get_keystone_config()
     start_time = time.time()
     if not user:
         user = keystone_config['user']
@@ -152,6 +161,7 @@ def login(user=None, password=None, domain=None, project=None, url=None):
 
 
 def logout(headers, url=None):
+    keystone_config = get_keystone_config()
     if not url:
         url = keystone_config['url']
     headers['X-Subject-Token'] = headers['X-Auth-Token']
@@ -163,6 +173,7 @@ def logout(headers, url=None):
 
 
 def check_token(token, url=None):
+    keystone_config = get_keystone_config()
     _verify = False
     if keystone_config['certificate']:
         _verify = keystone_config['certificate']
@@ -19,6 +19,15 @@ def test_get_subject_success():
     subject_id = cache_obj.get_subject(data_mock.shared_ids["policy"]["policy_id_1"], name)
     assert subject_id is not None
 
+def test_get_subject_by_name(no_requests):
+    from python_moonutilities import cache
+    cache_obj = cache.Cache()
+    name = 'unknown_subject_name'
+    with pytest.raises(Exception) as exception_info:
+        cache_obj.get_subject(data_mock.shared_ids["policy"]["policy_id_1"], name)
+    assert str(exception_info.value) == '400: Subject Unknown'
+    assert no_requests.last_request.qs == {"name": [name]}
+
 def test_get_subject_no_policy():
     from python_moonutilities import cache
     cache_obj = cache.Cache()
@@ -450,3 +459,44 @@ def test_cache_manager():
     assert cache_obj.policies is not None
     assert len(cache_obj.policies) == 1
     assert cache_obj.models is not None
+
+
+# tests for the components urls in cache
+# ================================================
+def test_components_urls():
+    from python_moonutilities import cache
+    cache_obj = cache.Cache()
+    assert cache_obj.manager_url == "http://manager:8082"
+    assert cache_obj.orchestrator_url == "http://interface:8083"
+
+
+# tests for the conditional requests of the cache
+# ================================================
+def test_update_meta_rules_not_modified(no_requests):
+    from python_moonutilities import cache
+    cache_obj = cache.Cache()
+    url = "{}/meta_rules".format(cache_obj.manager_url)
+    no_requests.register_uri('GET', url, [
+        {"json": {"meta_rules": data_mock.meta_rules_mock}, "headers": {"ETag": '"version1"'}},
+        {"status_code": 304, "headers": {"ETag": '"version1"'}},
+    ])
+    cache_obj._Cache__update_meta_rules()
+    assert "If-None-Match" not in no_requests.last_request.headers
+    cache_obj._Cache__update_meta_rules()
+    assert no_requests.last_request.headers["If-None-Match"] == '"version1"'
+    assert len(cache_obj.meta_rules) == 2
+
+
+def test_update_meta_rules_other_instance(no_requests):
+    from python_moonutilities import cache
+    cache_obj = cache.Cache()
+    url = "{}/meta_rules".format(cache_obj.manager_url)
+    no_requests.register_uri('GET', url, [
+        {"json": {"meta_rules": data_mock.meta_rules_mock}, "headers": {"ETag": '"version1"'}},
+        {"json": {"meta_rules": data_mock.meta_rules_mock}, "headers": {"ETag": '"version1"'}},
+    ])
+    cache_obj._Cache__update_meta_rules()
+    other_cache_obj = cache.Cache()
+    other_cache_obj._Cache__update_meta_rules()
+    assert "If-None-Match" not in no_requests.last_request.headers
+    assert len(other_cache_obj._Cache__META_RULES) == 2
@@ -0,0 +1,23 @@
+import json
+from flask import Flask
+from flask_restful import Api
+
+
+class FakeCache:
+
+    ready = False
+
+
+def test_ready():
+    from python_moonutilities.resources import Ready
+    cache = FakeCache()
+    app = Flask(__name__)
+    Api(app).add_resource(Ready, *Ready.__urls__, resource_class_kwargs={"cache": cache})
+    client = app.test_client()
+    req = client.get("/ready")
+    assert req.status_code == 503
+    assert json.loads(req.data.decode("utf-8"))["ready"] is False
+    cache.ready = True
+    req = client.get("/ready")
+    assert req.status_code == 200
+    assert json.loads(req.data.decode("utf-8"))["ready"] is True